@@ -1,6 +1,21 @@
 """
 The 'app' package handles the core logic of the calculator's REPL and plugin management.
 """
-from .app import App
+import importlib
 
-__all__ = ["App"]
+# Public names are imported on first access, so importing a single submodule
+# (as batch and server runs do) does not load the REPL or the embedding API.
+_EXPORTS = {
+    "App": "app.app",
+    "CalculationResult": "app.calculator",
+    "Calculator": "app.calculator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'app' has no attribute '{name}'")
+    return getattr(importlib.import_module(module_name), name)
@@ -1,10 +1,15 @@
 """
-app.py: Defines the main application REPL, which delegates to the plugin manager
+app.py: Defines the main application REPL, which delegates to the dispatcher
 to find the appropriate command to run.
 """
 import sys
 import logging
+from app import history, scheduler
 from app.commands.plugin_manager import PluginManager
+from app.dispatcher import Dispatcher, UNKNOWN_COMMAND_MESSAGE
+from app.encoders import DEFAULT_FORMAT, ResultWriter, get_encoder
+from app.session import Session, activate
+from app.variables import Workspace
 
 logger = logging.getLogger(__name__)
 
@@ -12,58 +17,87 @@ logger = logging.getLogger(__name__)
 class App:
     """Main application class responsible for the REPL loop."""
     @staticmethod
-    def start() -> None:
+    def start(output_format: str = DEFAULT_FORMAT) -> None:
         """
         Starts the REPL (Read-Eval-Print Loop).
-        Commands are discovered via the PluginManager.
+        Commands are discovered via the PluginManager and bound once by the Dispatcher.
+        Every executed line is recorded in the session history (see app.history), and
+        'name = ...' lines define variables for later lines (see app.variables).
+        Results are written with the 'output_format' encoder (see app.encoders).
         """
         logger.info("Calculator App has started. Enter commands or type 'exit' to quit.")
         print("Welcome to the Interactive Calculator. Type 'exit' to exit.")
-        plugin_manager = PluginManager()
+        # Flushed per line: the user is waiting for each result
+        writer = ResultWriter(sys.stdout, get_encoder(output_format), flush=True)
+        dispatcher = Dispatcher(PluginManager.shared())
+        workspace = Workspace(dispatcher.plugin_manager, dispatcher)
+        # main.py may already have enabled it with a persistent log. Not 'or':
+        # a History with no entries yet is falsy (it has a length)
+        recorder = history.active()
+        if recorder is None:
+            recorder = history.enable()
+        # Plugins declared as thread/process-bound run off this loop, with deadlines.
+        # main.py starts the scheduler with its settings; otherwise it lives as long as the loop
+        own_scheduler = scheduler.active() is None
+        if own_scheduler:
+            scheduler.enable()
 
-        while True:
-            # Display REPL prompt
-            user_input = input(">>> ").strip()
-            if not user_input:
-                # Just ignore empty lines
-                continue
+        try:
+            # Commands that act on the session ('history', 'replay') find it via session.current()
+            with activate(Session(workspace, recorder)):
+                while True:
+                    # Display REPL prompt
+                    user_input = input(">>> ").strip()
+                    if not user_input:
+                        # Just ignore empty lines
+                        continue
 
-            # If user types 'exit', we terminate
-            if user_input.lower() == "exit":
-                logger.info("User requested exit.")
-                print("Exiting the interactive calculator...")
-                break
+                    # If user types 'exit', we terminate
+                    if user_input.lower() == "exit":
+                        logger.info("User requested exit.")
+                        print("Exiting the interactive calculator...")
+                        break
 
-            # Parse command name and arguments
-            parts = user_input.split()
-            cmd_name = parts[0].lower()
-            args = parts[1:]
+                    # Parse the line and look up its bound callable: a command, the
+                    # expression engine for nested/infix input such as '1 + 2*3', or a
+                    # variable assignment/lookup
+                    handler, cmd_name, args = workspace.resolve_line(user_input)
 
-            # Lookup command from plugin manager
-            command_class = plugin_manager.get_command(cmd_name)
+                    if handler is None:
+                        logger.warning("Unknown command encountered: %s", cmd_name)
+                        print(UNKNOWN_COMMAND_MESSAGE)
+                        recorder.record(user_input, UNKNOWN_COMMAND_MESSAGE, ok=False)
+                        continue
 
-            if command_class is None:
-                logger.warning("Unknown command encountered: %s", cmd_name)
-                print(
-                    "Unknown command. Type 'menu' to see available commands, or 'exit' to quit."
-                )
-                continue
-
-            # Create an instance of the command and execute
-            command_instance = command_class()
-            try:
-                output = command_instance.execute(args)
-                if output is not None:
-                    logger.info("Command '%s' executed successfully with args: %s", cmd_name, args)
-                    print(output)
-            except ValueError as exc:
-                # Command-specific usage errors or numeric conversion errors
-                logger.error("Command '%s' raised ValueError: %s", cmd_name, exc)
-                print(f"Error: {exc}")
-            except ZeroDivisionError:
-                logger.error("Command '%s' caused ZeroDivisionError with args: %s", cmd_name, args)
-                print("Error: Cannot divide by zero.")
-            except Exception as exc:  # pylint: disable=broad-except
-                # Catch any other unexpected errors
-                logger.exception("Command '%s' caused an unexpected error", cmd_name)
-                print(f"Unexpected error: {exc}", file=sys.stderr)
+                    try:
+                        output = handler(args)
+                        if output is not None:
+                            # 'command' lets the optional log sampler aggregate hot commands
+                            logger.info(
+                                "Command '%s' executed successfully with args: %s", cmd_name, args,
+                                extra={"command": cmd_name},
+                            )
+                            writer.write(output)
+                        recorder.record(user_input, output)
+                    except ValueError as exc:
+                        # Command-specific usage errors or numeric conversion errors
+                        logger.error("Command '%s' raised ValueError: %s", cmd_name, exc)
+                        print(f"Error: {exc}")
+                        recorder.record(user_input, f"Error: {exc}", ok=False)
+                    except ZeroDivisionError:
+                        logger.error("Command '%s' caused ZeroDivisionError with args: %s", cmd_name, args)
+                        print("Error: Cannot divide by zero.")
+                        recorder.record(user_input, "Error: Cannot divide by zero.", ok=False)
+                    except TimeoutError as exc:
+                        # A slow plugin missed its deadline (see app.scheduler); the session carries on
+                        logger.error("Command '%s' timed out with args: %s", cmd_name, args)
+                        print(f"Error: {exc}")
+                        recorder.record(user_input, f"Error: {exc}", ok=False)
+                    except Exception as exc:  # pylint: disable=broad-except
+                        # Catch any other unexpected errors
+                        logger.exception("Command '%s' caused an unexpected error", cmd_name)
+                        print(f"Unexpected error: {exc}", file=sys.stderr)
+                        recorder.record(user_input, f"Unexpected error: {exc}", ok=False)
+        finally:
+            if own_scheduler:
+                scheduler.disable()
@@ -0,0 +1,141 @@
+"""
+batch.py: Defines the non-interactive batch runner, which streams command lines
+from a file or stdin through the same PluginManager dispatch as the REPL.
+
+Lines are consumed lazily from a generator and results are written to a single
+writer in chunks, so memory stays constant no matter how large the input is.
+"""
+import logging
+from typing import Iterable, Iterator, NamedTuple, Optional, TextIO
+
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import Dispatcher, error_message
+from app.encoders import ResultWriter, TextEncoder
+from app.results import Output
+
+logger = logging.getLogger(__name__)
+
+# Error policies understood by BatchRunner
+ON_ERROR_STOP = "stop"      # abort the run at the first failing line
+ON_ERROR_SKIP = "skip"      # silently drop failing lines
+ON_ERROR_REPORT = "report"  # write failing lines to the error stream and keep going
+ERROR_POLICIES = (ON_ERROR_STOP, ON_ERROR_SKIP, ON_ERROR_REPORT)
+
+class BatchLineError(Exception):
+    """Raised when a single batch line fails; carries the user-facing message."""
+
+
+class BatchStats(NamedTuple):
+    """Summary of a finished batch run."""
+    processed: int
+    succeeded: int
+    failed: int
+    stopped: bool
+
+
+def iter_command_lines(stream: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """
+    Yields (line_number, command_line) pairs from a text stream.
+    Blank lines are skipped; iteration ends early on an 'exit' line,
+    mirroring the REPL.
+    """
+    for lineno, raw in enumerate(stream, start=1):
+        line = raw.strip()
+        if not line:
+            continue
+        if line.lower() == "exit":
+            return
+        yield lineno, line
+
+
+class BatchRunner:
+    """
+    Executes command lines without a prompt or banner and writes each result
+    as one line of output, encoded by 'encoder' (text by default; see app.encoders).
+    """
+
+    def __init__(
+        self,
+        plugin_manager: Optional[PluginManager] = None,
+        on_error: str = ON_ERROR_REPORT,
+        flush_every: int = 1024,
+        encoder=None,
+    ):
+        if on_error not in ERROR_POLICIES:
+            raise ValueError(f"Unknown error policy '{on_error}'. Expected one of: {', '.join(ERROR_POLICIES)}.")
+        self.dispatcher = Dispatcher(plugin_manager or PluginManager.shared())
+        self.on_error = on_error
+        self.flush_every = flush_every
+        self.encoder = encoder or TextEncoder()
+
+    def execute_line(self, line: str) -> Optional[Output]:
+        """
+        Dispatches a single command line and returns its output.
+        Raises BatchLineError with the REPL-style message if the line fails.
+        """
+        try:
+            return self.dispatcher.dispatch(line)
+        except Exception as exc:  # pylint: disable=broad-except
+            raise BatchLineError(error_message(exc)) from exc
+
+    def execute_lines(self, lines: Iterable[tuple[int, str]]) -> Iterator[tuple[int, Optional[Output], Optional[str]]]:
+        """
+        Executes numbered command lines lazily, yielding (line_number, output, error)
+        per line; exactly one of output and error is set unless the command returned None.
+        The error policy is left to the caller.
+        """
+        for lineno, line in lines:
+            try:
+                yield lineno, self.execute_line(line), None
+            except BatchLineError as exc:
+                yield lineno, None, str(exc)
+
+    def run(self, stream: Iterable[str], out: TextIO, err: Optional[TextIO] = None) -> BatchStats:
+        """
+        Streams every command line from 'stream' and writes results to 'out'.
+        Failing lines are handled according to the configured error policy;
+        with the 'report' policy they are written to 'err' prefixed by their line number.
+        """
+        # Outputs are only formatted here, a chunk at a time, as they are written
+        writer = ResultWriter(out, self.encoder)
+        writer.write_header()
+        pending: list[Output] = []
+        processed = succeeded = failed = 0
+        stopped = False
+
+        for lineno, output, error in self.execute_lines(iter_command_lines(stream)):
+            processed += 1
+            if error is not None:
+                failed += 1
+                if self.on_error == ON_ERROR_SKIP:
+                    continue
+                if err is not None:
+                    # Keep result and error streams in order when they share a file
+                    self._flush(pending, writer)
+                    err.write(f"line {lineno}: {error}\n")
+                if self.on_error == ON_ERROR_STOP:
+                    stopped = True
+                    break
+                continue
+
+            succeeded += 1
+            if output is not None:
+                pending.append(output)
+                if len(pending) >= self.flush_every:
+                    self._flush(pending, writer)
+
+        self._flush(pending, writer)
+        out.flush()
+        stats = BatchStats(processed, succeeded, failed, stopped)
+        logger.info(
+            "Batch run finished: %d processed, %d succeeded, %d failed%s.",
+            processed, succeeded, failed, " (stopped on first error)" if stopped else "",
+        )
+        return stats
+
+    @staticmethod
+    def _flush(pending: list[Output], writer: ResultWriter) -> None:
+        """Encodes and writes buffered results in one call and clears the buffer."""
+        if pending:
+            writer.write_many(pending)
+            pending.clear()
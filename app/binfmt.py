@@ -0,0 +1,216 @@
+"""
+binfmt.py: Compact binary operand format for bulk jobs.
+
+A file holds one command applied to packed float64 columns:
+
+    offset  size  field
+    0       8     magic b"CALCBIN1"
+    8       2     format version (1)
+    10      2     length N of the command name in bytes
+    12      2     number of columns
+    14      2     reserved (0)
+    16      8     number of rows
+    24      N     command name (UTF-8), zero-padded to a multiple of 8 bytes
+    ...           the columns, one after the other, rows x float64 each
+
+All integers and floats are little-endian. run_binary() maps the input with
+mmap and hands memoryview slices of the columns, block by block, to the
+command's execute_batch(), so no Python object is created per row when NumPy is
+available. The result file uses the same layout with the same command name and
+two columns: the values and a failure mask (1.0 where the row failed, e.g. a
+division by zero, with NaN as its value). Files larger than RAM work because
+only the pages of the current block need to be resident.
+"""
+import mmap
+import os
+import struct
+import sys
+import traceback
+from array import array
+from typing import NamedTuple, Optional, Sequence
+
+from app import vectorized
+from app.commands.command_interface import CommandInterface
+from app.commands.plugin_manager import PluginManager
+
+MAGIC = b"CALCBIN1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHHHQ")
+ITEM_SIZE = 8  # float64
+DEFAULT_BLOCK_ROWS = 1 << 16
+
+
+class BinaryHeader(NamedTuple):
+    """Decoded header of a binary operand file."""
+    command: str
+    columns: int
+    rows: int
+    data_offset: int
+
+
+class BinaryStats(NamedTuple):
+    """Summary of a finished binary run."""
+    rows: int
+    failed: int
+
+
+def _check_byte_order() -> None:
+    # memoryview.cast("d") uses the native layout; the format is little-endian
+    if sys.byteorder != "little":  # pragma: no cover - no big-endian CI
+        raise ValueError("The binary operand format is only supported on little-endian machines.")
+
+
+def _data_offset(command: str) -> int:
+    name_length = len(command.encode("utf-8"))
+    return HEADER.size + -(-name_length // ITEM_SIZE) * ITEM_SIZE
+
+
+def encode_header(command: str, columns: int, rows: int) -> bytes:
+    """Returns the header bytes (including the padded command name) for a file."""
+    name = command.encode("utf-8")
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(name), columns, 0, rows) + name
+    return header.ljust(_data_offset(command), b"\0")
+
+
+def decode_header(buffer) -> BinaryHeader:
+    """Parses the header at the start of 'buffer'. Raises ValueError if it is not a valid file."""
+    if len(buffer) < HEADER.size:
+        raise ValueError("Invalid binary operand file: too short for a header.")
+    magic, version, name_length, columns, _, rows = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Invalid binary operand file: bad magic number.")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary operand format version {version}.")
+    command = bytes(buffer[HEADER.size:HEADER.size + name_length]).decode("utf-8")
+    header = BinaryHeader(command, columns, rows, _data_offset(command))
+    if len(buffer) < header.data_offset + columns * rows * ITEM_SIZE:
+        raise ValueError("Invalid binary operand file: truncated column data.")
+    return header
+
+
+def as_doubles(values: Sequence) -> memoryview:
+    """Returns a contiguous float64 memoryview of 'values', without copying when possible."""
+    try:
+        view = memoryview(values)
+        if view.format == "d" and view.c_contiguous:
+            return view
+    except TypeError:
+        pass
+    np = vectorized.load_numpy()
+    if np is not None:
+        return memoryview(np.ascontiguousarray(values, dtype=np.float64))
+    return memoryview(array("d", (float(value) for value in values)))
+
+
+def write_columns(path: str, command: str, *columns: Sequence) -> None:
+    """Writes a binary operand file for 'command' from equally long columns."""
+    _check_byte_order()
+    views = [as_doubles(column) for column in columns]
+    if len({len(view) for view in views}) > 1:
+        raise ValueError(f"Operand columns for {command} command must have the same length.")
+    rows = len(views[0]) if views else 0
+    with open(path, "wb") as stream:
+        stream.write(encode_header(command, len(views), rows))
+        for view in views:
+            stream.write(view)
+
+
+def read_columns(path: str) -> tuple[BinaryHeader, list[list[float]]]:
+    """Reads a whole binary file into lists; convenient for small files and tests."""
+    _check_byte_order()
+    with open(path, "rb") as stream:
+        data = stream.read()
+    header = decode_header(data)
+    values = memoryview(data)[header.data_offset:].cast("d")
+    return header, [values[i * header.rows:(i + 1) * header.rows].tolist() for i in range(header.columns)]
+
+
+def batch_function(command: CommandInterface):
+    """
+    Returns the callable used for blocks of rows: the plugin's own vectorized
+    execute_batch() if it has one, otherwise a row loop over its compute().
+    Raises ValueError for commands that support neither.
+    """
+    if type(command).execute_batch is not CommandInterface.execute_batch:
+        return command.execute_batch
+    if command.supports_compute():
+        return lambda *columns: _compute_rows(command.compute, columns)
+    raise ValueError(f"The '{command.name}' command does not support binary operands.")
+
+
+def _compute_rows(compute, columns: Sequence[Sequence]):
+    values = []
+    mask = []
+    for row in zip(*columns):
+        try:
+            values.append(compute(*row))
+            mask.append(False)
+        except (ValueError, ArithmeticError):
+            values.append(float("nan"))
+            mask.append(True)
+    return values, mask
+
+
+def run_binary(
+    input_path: str,
+    output_path: str,
+    plugin_manager: Optional[PluginManager] = None,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> BinaryStats:
+    """
+    Applies the command named in 'input_path' to its columns and writes the
+    values and failure mask to 'output_path'. Returns the row and failure counts.
+    """
+    _check_byte_order()
+    plugin_manager = plugin_manager or PluginManager.shared()
+    failed = 0
+    if os.path.getsize(input_path) == 0:
+        raise ValueError("Invalid binary operand file: too short for a header.")
+    with open(input_path, "rb") as source, mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as in_map:
+        header = decode_header(in_map)
+        command_class = plugin_manager.get_command(header.command.lower())
+        if command_class is None:
+            raise ValueError(f"Unknown command '{header.command}' in binary operand file.")
+        apply = batch_function(command_class())
+        rows = header.rows
+
+        out_offset = _data_offset(header.command)
+        with open(output_path, "w+b") as target:
+            target.write(encode_header(header.command, 2, rows))
+            target.truncate(out_offset + 2 * rows * ITEM_SIZE)
+            if rows == 0:
+                return BinaryStats(0, 0)
+            with mmap.mmap(target.fileno(), 0) as out_map:
+                in_view = memoryview(in_map)[header.data_offset:header.data_offset + header.columns * rows * ITEM_SIZE].cast("d")
+                out_view = memoryview(out_map)[out_offset:].cast("d")
+                columns = values = mask = mask_view = None
+                try:
+                    for start in range(0, rows, block_rows):
+                        end = min(start + block_rows, rows)
+                        columns = [in_view[i * rows + start:i * rows + end] for i in range(header.columns)]
+                        values, mask = apply(*columns)
+                        mask_view = as_doubles(mask)
+                        out_view[start:end] = as_doubles(values)
+                        out_view[rows + start:rows + end] = mask_view
+                        failed += _count_failures(mask)
+                except BaseException as exc:
+                    # The failed command's frames, kept alive by the traceback, may still
+                    # hold column slices (or arrays over them): drop their locals too
+                    traceback.clear_frames(exc.__traceback__)
+                    raise
+                finally:
+                    # Every view of the maps must be gone before they can be closed;
+                    # otherwise BufferError would replace the command's own error
+                    columns = values = mask = mask_view = None
+                    in_view.release()
+                    out_view.release()
+                out_map.flush()
+    return BinaryStats(rows, failed)
+
+
+def _count_failures(mask: Sequence) -> int:
+    np = vectorized.load_numpy()
+    if np is not None:
+        return int(np.count_nonzero(mask))
+    return sum(1 for failed in mask if failed)
+
@@ -0,0 +1,102 @@
+"""
+calculator.py: Defines the Calculator, the in-process Python API of the calculator.
+
+It calls the discovered command plugins through their numeric compute() entry
+point, so numbers go in and numbers come out: nothing is converted to a string,
+parsed back or formatted. Failures are returned as values instead of being
+raised, so a bad row in evaluate_many() does not abort the others. Under the
+decimal and fraction backends (app.numeric) the operands are converted to the
+backend's number type and computed under its context, as on the command path.
+
+    calculator = Calculator()
+    calculator.evaluate("divide", 1, 4).value        # 0.25
+    calculator.evaluate("divide", 1, 0).error        # ZeroDivisionError(...)
+"""
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from app import numeric
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import UnknownCommandError
+
+
+class CalculationResult(NamedTuple):
+    """Outcome of one calculation: either 'value' or 'error' is set."""
+    value: Optional[float] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the calculation succeeded."""
+        return self.error is None
+
+    def unwrap(self) -> float:
+        """Returns the value, or raises the stored error."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class Calculator:
+    """Evaluates registered commands on numbers, e.g. evaluate("add", 1, 2)."""
+
+    def __init__(self, plugin_manager: Optional[PluginManager] = None):
+        self.plugin_manager = plugin_manager or PluginManager.shared()
+        self._commands: dict[str, object] = {}
+        self._generation = self.plugin_manager.generation
+
+    def command(self, name: str):
+        """
+        Returns the (reused) command instance for a name or alias.
+        Raises UnknownCommandError, or ValueError if the command has no numeric form.
+        """
+        if self._generation != self.plugin_manager.generation:
+            # Plugins were hot-reloaded; drop instances of the old classes
+            self._commands.clear()
+            self._generation = self.plugin_manager.generation
+        instance = self._commands.get(name)
+        if instance is None:
+            command_class = self.plugin_manager.get_command(name.lower())
+            if command_class is None:
+                raise UnknownCommandError(name)
+            instance = command_class()
+            if not hasattr(instance, "supports_compute") or not instance.supports_compute():
+                raise ValueError(f"The '{instance.name}' command has no numeric form.")
+            self._commands[name] = instance
+        return instance
+
+    def evaluate(self, name: str, *numbers: float) -> CalculationResult:
+        """Applies the command 'name' to 'numbers' and returns the result or the error."""
+        try:
+            compute = self.command(name).compute
+        except (LookupError, ValueError) as exc:
+            return CalculationResult(error=exc)
+        return _call(name, compute, numbers)
+
+    def evaluate_many(self, name: str, rows: Iterable[Sequence[float]]) -> list[CalculationResult]:
+        """Applies the command 'name' to every row of operands; one result per row, in order."""
+        return list(self.iter_evaluate(name, rows))
+
+    def iter_evaluate(self, name: str, rows: Iterable[Sequence[float]]) -> Iterator[CalculationResult]:
+        """Lazy form of evaluate_many(), for row streams that should not be held in memory."""
+        try:
+            compute = self.command(name).compute
+        except (LookupError, ValueError) as exc:
+            for _ in rows:
+                yield CalculationResult(error=exc)
+            return
+        for row in rows:
+            yield _call(name, compute, row)
+
+
+def _call(name: str, compute, numbers: Sequence[float]) -> CalculationResult:
+    backend = numeric.active()
+    try:
+        if backend is numeric.FLOAT:
+            return CalculationResult(compute(*numbers))
+        # Operands in the backend's number type, computed under its context (precision, rounding)
+        return CalculationResult(backend.run(compute, *map(backend.convert, numbers)))
+    except TypeError as exc:
+        # Wrong operand count, or operands that are not numbers
+        return CalculationResult(error=ValueError(f"Invalid arguments for {name} command: {exc}"))
+    except (ValueError, ArithmeticError) as exc:
+        return CalculationResult(error=exc)
@@ -1,34 +1,39 @@
 """
 add_command.py: Defines the "add" command plugin.
 """
-from app.commands.command_interface import CommandInterface
+from typing import Sequence
+
+from app import numeric, vectorized
+from app.commands.command_interface import BatchResult, CommandInterface
 
 
 class AddCommand(CommandInterface):
     """
     Command to add two numbers.
     Usage: add x y
+    Vectors: add 1,2,3 10 or add [1 2 3] [4 5 6]
     """
 
+    stateless = True
+    cacheable = True
+    aliases = ("+",)
+
     @property
     def name(self) -> str:
         return "add"
 
-    def execute(self, args: list[str]) -> str:
+    # Parsing per the active numeric backend, vector operands and errors: see app.numeric
+    execute = numeric.binary_execute("add", "+")
+
+    def compute(self, x: float, y: float) -> float:
+        """Returns x + y, in the operands' number type (float, Decimal or Fraction)."""
+        return x + y
+
+    def execute_batch(self, *columns: Sequence) -> BatchResult:
         """
-        Expects exactly two numeric arguments.
-        Returns a string of the format: "x + y = result"
-        Raises ValueError if number of args is incorrect or if conversion fails.
+        Expects exactly two operand columns of equal length.
+        Returns the element-wise results, vectorized with NumPy when available.
         """
-        if len(args) != 2:
-            raise ValueError("Invalid number of arguments for add command. Usage: add <num1> <num2>.")
-
-        try:
-            x = float(args[0])
-            y = float(args[1])
-        except ValueError:
-            raise ValueError("Invalid numeric input for add command.")
-
-        result = x + y
-        # Output a nicely formatted string
-        return f"{x} + {y} = {result}"
+        if len(columns) != 2:
+            raise ValueError("Invalid number of operand columns for add command. Usage: add <num1> <num2>.")
+        return vectorized.apply_binary("add", columns[0], columns[1])
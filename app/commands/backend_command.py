@@ -0,0 +1,47 @@
+"""
+backend_command.py: Defines the "backend" command plugin, which shows or switches
+the numeric backend (float, decimal or fraction) of the arithmetic commands.
+"""
+from app import numeric, session
+from app.commands.command_interface import CommandInterface
+
+
+class BackendCommand(CommandInterface):
+    """
+    Command to show or switch the numeric backend.
+    Usage: backend [float | decimal [precision] [rounding] | fraction]
+    """
+
+    stateless = True
+
+    @property
+    def name(self) -> str:
+        return "backend"
+
+    def execute(self, args: list[str]) -> str:
+        """
+        With no arguments returns the active backend. 'backend decimal 50 half_up'
+        switches to Decimal with 50 significant digits and ROUND_HALF_UP rounding
+        (defaults: 28 digits, ROUND_HALF_EVEN); 'backend float' switches back.
+        Inside a session (the REPL, a server connection) only that session switches.
+        Raises ValueError for unknown backends and invalid settings.
+        """
+        if not args:
+            return f"Numeric backend: {numeric.active().describe()}"
+        if len(args) > 3 or (len(args) > 1 and args[0].lower() != "decimal"):
+            raise ValueError(
+                "Invalid arguments for backend command. Usage: backend [float | decimal [precision] [rounding] | fraction]."
+            )
+        precision = None
+        if len(args) > 1:
+            try:
+                precision = int(args[1])
+            except ValueError:
+                raise ValueError(f"Invalid decimal precision '{args[1]}'.") from None
+        rounding = args[2] if len(args) > 2 else None
+        current = session.current()
+        if current is None:
+            backend = numeric.configure(args[0], precision, rounding)
+        else:
+            current.backend = backend = numeric.create(args[0], precision, rounding)
+        return f"Numeric backend set to {backend.describe()}."
@@ -3,11 +3,43 @@ command_interface.py: Defines the standard interface (abstract base) that
 all command plugins must implement.
 """
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, NamedTuple, Optional, Sequence
+
+if TYPE_CHECKING:
+    from app.results import Output
+
+
+class BatchResult(NamedTuple):
+    """
+    Result of a column-at-a-time command call.
+    'values' holds one result per row; 'mask' is True for rows that failed
+    (for example a division by zero), whose value is meaningless.
+    """
+    values: Sequence
+    mask: Sequence[bool]
 
 
 class CommandInterface(ABC):
     """Abstract base class for commands in the calculator plugin system."""
 
+    # Set to True by commands that keep no per-call state, so one instance
+    # can be reused for every call instead of being created per line.
+    stateless: bool = False
+
+    # Extra names the command can be invoked by, e.g. ("+",) for add.
+    aliases: tuple[str, ...] = ()
+
+    # Set to True by pure commands whose output depends only on their numeric
+    # arguments, so the optional result cache may serve repeated calls.
+    cacheable: bool = False
+
+    # How the optional scheduler (app.scheduler) runs execute(): "inline" in the
+    # calling thread, "thread" on a worker thread (I/O-bound commands) or
+    # "process" in a worker process (CPU-bound commands), with a deadline of
+    # 'timeout' seconds (None: the scheduler's default) for the pooled modes.
+    execution: str = "inline"
+    timeout: Optional[float] = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -15,9 +47,43 @@ class CommandInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def execute(self, args: list[str]) -> str:
+    def execute(self, args: list[str]) -> "Output":
         """
         Execute the command with the given list of string arguments.
-        Returns a string result or raises a ValueError / ZeroDivisionError as needed.
+        Returns a string, or an app.results.CommandResult that is only formatted
+        when written, or raises a ValueError / ZeroDivisionError as needed.
         """
         raise NotImplementedError
+
+    def compute(self, *operands: float) -> float:
+        """
+        Optional numeric entry point: apply the command to already-parsed numbers
+        and return the raw result, without any string parsing or formatting.
+        Used by expressions; commands that do not override it cannot appear in one.
+        """
+        raise NotImplementedError(f"The '{self.name}' command has no numeric form.")
+
+    def supports_compute(self) -> bool:
+        """Returns True if this command overrides compute()."""
+        return type(self).compute is not CommandInterface.compute
+
+    def execute_batch(self, *columns: Sequence) -> BatchResult:
+        """
+        Execute the command once per row of the given operand columns.
+        Optional: this default calls execute() in a loop so that any plugin
+        supports batches; plugins with a vectorized implementation override it.
+        Rows raising ValueError / ZeroDivisionError are flagged in the mask.
+        """
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError(f"Operand columns for {self.name} command must have the same length.")
+
+        values = []
+        mask = []
+        for row in zip(*columns):
+            try:
+                values.append(self.execute([str(value) for value in row]))
+                mask.append(False)
+            except (ValueError, ZeroDivisionError):
+                values.append(None)
+                mask.append(True)
+        return BatchResult(values, mask)
@@ -0,0 +1,35 @@
+"""
+count_command.py: Defines the "count" aggregate command plugin.
+"""
+from app import reducers
+from app.commands.command_interface import CommandInterface
+from app.results import CommandResult
+
+
+class CountCommand(CommandInterface):
+    """
+    Command to count numbers.
+    Usage: count x [y ...] | @file | -
+    """
+
+    stateless = True
+    cacheable = True
+
+    @property
+    def name(self) -> str:
+        return "count"
+
+    def execute(self, args: list[str]) -> CommandResult:
+        """
+        Accepts numbers, '@path' (a file of numbers) and '-' (stdin), in one pass.
+        Returns a CommandResult, written as "count = {value}"
+        Raises ValueError on non-numeric input or unreadable files.
+        """
+        if not args:
+            raise ValueError("Invalid number of arguments for count command. Usage: count <num1> [num2 ...] | @file | -.")
+        value, _ = reducers.count(reducers.iter_operand_blocks(args, "count"))
+        return CommandResult("count", None, value, "count = %(count)d", count=value)
+
+    def compute(self, *operands: float) -> float:
+        """Returns how many operands there are."""
+        return reducers.count([reducers.as_block(operands, "count")])[0]
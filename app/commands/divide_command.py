@@ -1,37 +1,45 @@
 """
 divide_command.py: Defines the "divide" command plugin.
 """
-from app.commands.command_interface import CommandInterface
+from typing import Sequence
+
+from app import numeric, vectorized
+from app.commands.command_interface import BatchResult, CommandInterface
 
 
 class DivideCommand(CommandInterface):
     """
     Command to divide two numbers.
     Usage: divide x y
+    Vectors: divide 1,2,3 10 or divide [1 2 3] [4 5 6]
     """
 
+    stateless = True
+    cacheable = True
+    aliases = ("/",)
+
     @property
     def name(self) -> str:
         return "divide"
 
-    def execute(self, args: list[str]) -> str:
+    # Parsing per the active numeric backend, vector operands and errors: see app.numeric
+    execute = numeric.binary_execute("divide", "/")
+
+    def compute(self, x: float, y: float) -> float:
         """
-        Expects exactly two numeric arguments.
-        Returns a string: "x / y = result"
-        Raises ValueError if usage is incorrect or if numeric conversion fails,
-        ZeroDivisionError if y == 0.
+        Returns x / y, in the operands' number type (float, Decimal or Fraction).
+        Raises ZeroDivisionError if y == 0.
         """
-        if len(args) != 2:
-            raise ValueError("Invalid number of arguments for divide command. Usage: divide <num1> <num2>.")
-
-        try:
-            x = float(args[0])
-            y = float(args[1])
-        except ValueError:
-            raise ValueError("Invalid numeric input for divide command.")
-
         if y == 0:
             raise ZeroDivisionError("Attempted to divide by zero.")
+        return x / y
 
-        result = x / y
-        return f"{x} / {y} = {result}"
+    def execute_batch(self, *columns: Sequence) -> BatchResult:
+        """
+        Expects exactly two operand columns of equal length.
+        Returns the element-wise results, vectorized with NumPy when available.
+        Rows with a zero divisor are flagged in the mask instead of raising.
+        """
+        if len(columns) != 2:
+            raise ValueError("Invalid number of operand columns for divide command. Usage: divide <num1> <num2>.")
+        return vectorized.apply_binary("divide", columns[0], columns[1])
@@ -0,0 +1,44 @@
+"""
+history_command.py: Defines the "history" command plugin, which lists the
+lines executed in this and (with a history log) earlier sessions.
+"""
+from app import history
+from app.commands.command_interface import CommandInterface
+
+DEFAULT_SHOWN = 20
+
+
+class HistoryCommand(CommandInterface):
+    """
+    Command to show recently executed lines.
+    Usage: history [count]
+    """
+
+    stateless = True
+
+    @property
+    def name(self) -> str:
+        return "history"
+
+    def execute(self, args: list[str]) -> str:
+        """
+        Returns the last 'count' (default 20) entries, one "  N  line" per line;
+        failed lines are marked "(failed)". Raises ValueError on a bad count.
+        """
+        if len(args) > 1:
+            raise ValueError("Invalid number of arguments for history command. Usage: history [count].")
+        try:
+            count = int(args[0]) if args else DEFAULT_SHOWN
+        except ValueError:
+            raise ValueError("Invalid count for history command.") from None
+        if count < 1:
+            raise ValueError("Invalid count for history command.")
+
+        recorder = history.active()
+        if recorder is None:
+            raise ValueError("History is not enabled in this session.")
+        lines = [
+            f"{entry.seq:>5}  {entry.line}" + ("" if entry.ok else "  (failed)")
+            for entry in recorder.tail(count)
+        ]
+        return "\n".join(lines) if lines else "History is empty."
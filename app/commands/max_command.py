@@ -0,0 +1,35 @@
+"""
+max_command.py: Defines the "max" aggregate command plugin.
+"""
+from app import reducers
+from app.commands.command_interface import CommandInterface
+from app.results import CommandResult
+
+
+class MaxCommand(CommandInterface):
+    """
+    Command to find the largest of any number of values.
+    Usage: max x [y ...] | @file | -
+    """
+
+    stateless = True
+    cacheable = True
+
+    @property
+    def name(self) -> str:
+        return "max"
+
+    def execute(self, args: list[str]) -> CommandResult:
+        """
+        Accepts numbers, '@path' (a file of numbers) and '-' (stdin), in one pass.
+        Returns a CommandResult, written as "max of {count} values = {value}"
+        Raises ValueError on non-numeric input, unreadable files or no numbers.
+        """
+        if not args:
+            raise ValueError("Invalid number of arguments for max command. Usage: max <num1> [num2 ...] | @file | -.")
+        value, count = reducers.maximum(reducers.iter_operand_blocks(args, "max"))
+        return CommandResult("max", None, value, "max of %(count)d values = %(value)s", count=count)
+
+    def compute(self, *operands: float) -> float:
+        """Returns the largest operand."""
+        return reducers.maximum([reducers.as_block(operands, "max")])[0]
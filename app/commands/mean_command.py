@@ -0,0 +1,35 @@
+"""
+mean_command.py: Defines the "mean" aggregate command plugin.
+"""
+from app import reducers
+from app.commands.command_interface import CommandInterface
+from app.results import CommandResult
+
+
+class MeanCommand(CommandInterface):
+    """
+    Command to average any number of values.
+    Usage: mean x [y ...] | @file | -
+    """
+
+    stateless = True
+    cacheable = True
+
+    @property
+    def name(self) -> str:
+        return "mean"
+
+    def execute(self, args: list[str]) -> CommandResult:
+        """
+        Accepts numbers, '@path' (a file of numbers) and '-' (stdin), in one pass.
+        Returns a CommandResult, written as "mean of {count} values = {value}"
+        Raises ValueError on non-numeric input, unreadable files or no numbers.
+        """
+        if not args:
+            raise ValueError("Invalid number of arguments for mean command. Usage: mean <num1> [num2 ...] | @file | -.")
+        value, count = reducers.mean(reducers.iter_operand_blocks(args, "mean"))
+        return CommandResult("mean", None, value, "mean of %(count)d values = %(value)s", count=count)
+
+    def compute(self, *operands: float) -> float:
+        """Returns the arithmetic mean of the operands."""
+        return reducers.mean([reducers.as_block(operands, "mean")])[0]
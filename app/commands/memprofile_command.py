@@ -0,0 +1,52 @@
+"""
+memprofile_command.py: Defines the "memprofile" command plugin, which switches
+per-command tracemalloc measurements (app.profiling) on and off in a running session.
+"""
+from app import profiling, session
+from app.commands.command_interface import CommandInterface
+
+
+class MemprofileCommand(CommandInterface):
+    """
+    Command to measure the memory commands allocate, with tracemalloc.
+    Usage: memprofile on [directory] | off | status
+    """
+
+    stateless = True
+
+    @property
+    def name(self) -> str:
+        return "memprofile"
+
+    def execute(self, args: list[str]) -> str:
+        """
+        'memprofile on' starts tracing allocations (the snapshot goes to 'directory',
+        default PROFILE_DIR or ./profiles); 'memprofile off' stops it, writes a
+        tracemalloc snapshot and lists calls, net and peak bytes per command.
+        Raises ValueError for any other argument.
+        """
+        action = args[0].lower() if args else "status"
+        if action not in ("on", "off", "status") or len(args) > (2 if action == "on" else 1):
+            raise ValueError("Invalid arguments for memprofile command. Usage: memprofile on [directory] | off | status.")
+
+        if action == "on":
+            if len(args) > 1:
+                session.require_local("Choosing the memprofile directory")
+            profiler = profiling.start_memory(args[1] if len(args) > 1 else None)
+            return f"Memory profiling on. The snapshot will be written to {profiler.directory}."
+        if action == "status":
+            profiler = profiling.memory_active()
+            if profiler is None:
+                return "Memory profiling is off."
+            return f"Memory profiling is on ({sum(entry[0] for entry in profiler.stats.values())} command calls measured)."
+
+        if profiling.memory_active() is None:
+            raise ValueError("Memory profiling is not on.")
+        stats, path = profiling.stop_memory()
+        lines = ["Memory profiling off."]
+        lines.extend(
+            f"  {command_name}: {calls} calls, net {net:+,} bytes, peak {peak:,} bytes"
+            for command_name, (calls, net, peak) in sorted(stats.items()) if calls
+        )
+        lines.append(f"Snapshot written to {path}")
+        return "\n".join(lines)
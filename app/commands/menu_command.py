@@ -8,20 +8,29 @@ from app.commands.plugin_manager import PluginManager
 class MenuCommand(CommandInterface):
     """
     Menu command that lists all recognized commands by the PluginManager.
+    Usage: menu
     """
 
+    stateless = True
+    aliases = ("help",)
+
     @property
     def name(self) -> str:
         return "menu"
 
     def execute(self, args: list[str]) -> str:
         """
-        The 'menu' command takes no arguments and returns a list of available commands.
+        The 'menu' command takes no arguments and returns a list of available commands,
+        followed by the usage of each command that documents one.
         """
         if args:
             raise ValueError("The 'menu' command takes no arguments.")
 
-        # We re-instantiate the PluginManager to get a fresh list of commands
-        pm = PluginManager()
-        commands = sorted(pm._commands.keys())  # protected member usage for simplicity
-        return f"Available commands: {', '.join(commands)}"
+        # The shared registry caches its sorted listing, so no rescan happens here
+        commands = PluginManager.shared().list_commands()
+        lines = [f"Available commands: {', '.join(info.name for info in commands)}"]
+        lines.extend(
+            f"  {info.usage}" + (f" (aliases: {' '.join(info.aliases)})" if info.aliases else "")
+            for info in commands if info.usage
+        )
+        return "\n".join(lines)
@@ -0,0 +1,35 @@
+"""
+min_command.py: Defines the "min" aggregate command plugin.
+"""
+from app import reducers
+from app.commands.command_interface import CommandInterface
+from app.results import CommandResult
+
+
+class MinCommand(CommandInterface):
+    """
+    Command to find the smallest of any number of values.
+    Usage: min x [y ...] | @file | -
+    """
+
+    stateless = True
+    cacheable = True
+
+    @property
+    def name(self) -> str:
+        return "min"
+
+    def execute(self, args: list[str]) -> CommandResult:
+        """
+        Accepts numbers, '@path' (a file of numbers) and '-' (stdin), in one pass.
+        Returns a CommandResult, written as "min of {count} values = {value}"
+        Raises ValueError on non-numeric input, unreadable files or no numbers.
+        """
+        if not args:
+            raise ValueError("Invalid number of arguments for min command. Usage: min <num1> [num2 ...] | @file | -.")
+        value, count = reducers.minimum(reducers.iter_operand_blocks(args, "min"))
+        return CommandResult("min", None, value, "min of %(count)d values = %(value)s", count=count)
+
+    def compute(self, *operands: float) -> float:
+        """Returns the smallest operand."""
+        return reducers.minimum([reducers.as_block(operands, "min")])[0]
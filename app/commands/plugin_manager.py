@@ -1,48 +1,303 @@
 """
 plugin_manager.py: Auto-discovers command classes from the 'commands' folder
-using pkgutil, and provides a lookup method to retrieve them by name.
+and provides a lookup method to retrieve them by name.
+
+Discovery is driven by a persistent manifest (command name -> module and class)
+keyed on each module's path, mtime and size. Plugin modules are read with 'ast'
+instead of being imported, and a module is only imported the first time one of
+its commands is looked up. A stale manifest is refreshed incrementally: only
+new or modified modules are rescanned.
+
+One PluginManager is shared process-wide (see PluginManager.shared()), and it can
+optionally poll the package for edited plugins and hot-reload just those modules.
 """
-import pkgutil
-import inspect
+import ast
 import importlib
+import json
+import logging
 import os
+import sys
+import threading
+from collections.abc import Mapping
+from typing import NamedTuple, Optional
+
 from app.commands.command_interface import CommandInterface
 
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 3
+MANIFEST_FILENAME = "plugin_manifest.json"
+
+# Modules in the commands package that never contain plugins
+INTERNAL_MODULES = ("__init__", "command_interface", "plugin_manager")
+
+
+class CommandInfo(NamedTuple):
+    """Public metadata about a registered command."""
+    name: str
+    usage: Optional[str]
+    module: str
+    class_name: str
+    aliases: tuple[str, ...] = ()
+
+
+class CommandTable(Mapping):
+    """
+    Read-only mapping of command_name -> CommandClass that imports a plugin
+    module only when one of its commands is first accessed.
+    """
+
+    def __init__(self, package_name: str):
+        self._package_name = package_name
+        self._locations: dict[str, tuple[str, str]] = {}
+        self._classes: dict[str, type] = {}
+
+    def register(self, command_name: str, module_name: str, class_name: str, command_class=None) -> None:
+        """Records where a command lives, optionally with its already-imported class."""
+        self._locations[command_name] = (module_name, class_name)
+        self._classes.pop(command_name, None)
+        if command_class is not None:
+            self._classes[command_name] = command_class
+
+    def unregister(self, command_name: str) -> None:
+        """Forgets a command and its cached class."""
+        self._locations.pop(command_name, None)
+        self._classes.pop(command_name, None)
+
+    def is_loaded(self, command_name: str) -> bool:
+        """Returns True if the command's class has already been imported."""
+        return command_name in self._classes
+
+    def location(self, command_name: str) -> tuple[str, str]:
+        """Returns the (module_name, class_name) a command is defined in."""
+        return self._locations[command_name]
+
+    def __getitem__(self, command_name: str):
+        command_class = self._classes.get(command_name)
+        if command_class is None:
+            module_name, class_name = self._locations[command_name]
+            module = importlib.import_module(f"{self._package_name}.{module_name}")
+            command_class = getattr(module, class_name)
+            self._classes[command_name] = command_class
+        return command_class
+
+    def __iter__(self):
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
 
 class PluginManager:
     """
     Scans the 'app/commands' package for classes that implement CommandInterface.
-    Maintains a dict of command_name -> CommandClass.
+    Maintains a lazy mapping of command_name -> CommandClass.
     """
 
-    def __init__(self):
-        self._commands = {}
+    _shared: Optional["PluginManager"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        package_name: str = "app.commands",
+        package_path: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+    ):
+        self.package_name = package_name
+        self.package_path = package_path or os.path.dirname(__file__)
+        self.manifest_path = manifest_path or os.path.join(self.package_path, "__pycache__", MANIFEST_FILENAME)
+        self._manifest: dict[str, dict] = {}
+        self._commands = CommandTable(package_name)
+        self._listing: Optional[tuple[CommandInfo, ...]] = None
+        self._canonical: dict[str, str] = {}
+        # Bumped whenever the set of commands changes, so callers can drop cached lookups
+        self.generation = 0
+        self._lock = threading.RLock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
         self._discover_commands()
 
+    @classmethod
+    def shared(cls) -> "PluginManager":
+        """Returns the process-wide PluginManager, creating it on first use."""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        """Discards the process-wide PluginManager (mainly for tests)."""
+        with cls._shared_lock:
+            if cls._shared is not None:
+                cls._shared.stop_watcher()
+            cls._shared = None
+
     def _discover_commands(self) -> None:
         """
-        Auto-discovers all modules under 'app.commands' and finds
-        classes implementing CommandInterface.
+        Loads the discovery manifest, rescans any module whose mtime or size
+        changed since it was written, and registers every command lazily.
+        """
+        self._sync(self._load_manifest(), reload_modules=False)
+
+    def refresh(self) -> list[str]:
+        """
+        Re-checks the package for new, modified or deleted plugin modules and
+        re-registers only those. Modified modules that were already imported are
+        reloaded. Returns the names of the modules that changed.
+        """
+        with self._lock:
+            return self._sync(self._manifest, reload_modules=True)
+
+    def _sync(self, cached: dict[str, dict], reload_modules: bool) -> list[str]:
+        """Brings the command table in line with the plugin files on disk."""
+        modules = {}
+        changed = []
+
+        for module_name, stat in self._iter_plugin_files():
+            entry = cached.get(module_name)
+            if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                self._forget_module(cached.get(module_name))
+                if reload_modules:
+                    self._reload_module(module_name)
+                entry = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "commands": self._scan_module(module_name),
+                }
+                changed.append(module_name)
+            modules[module_name] = entry
+
+        removed = [name for name in cached if name not in modules]
+        for module_name in removed:
+            self._forget_module(cached[module_name])
+
+        dirty = bool(changed or removed or modules.keys() != cached.keys())
+        if dirty:
+            self._save_manifest(modules)
+
+        self._manifest = modules
+        canonical = {}
+        for module_name, entry in modules.items():
+            for command_name, meta in entry["commands"].items():
+                for registered_name in (command_name, *meta.get("aliases", ())):
+                    canonical.setdefault(registered_name, command_name)
+                    if registered_name not in self._commands:
+                        self._commands.register(registered_name, module_name, meta["class"])
+        self._canonical = canonical
+        if dirty:
+            self._listing = None
+            self.generation += 1
+
+        if reload_modules and (changed or removed):
+            logger.info("Reloaded plugin modules: %s", ", ".join(changed + removed))
+        return changed + removed
+
+    def _forget_module(self, entry: Optional[dict]) -> None:
+        """Unregisters every command a previously scanned module provided."""
+        if entry is not None:
+            for command_name, meta in entry["commands"].items():
+                for registered_name in (command_name, *meta.get("aliases", ())):
+                    self._commands.unregister(registered_name)
+
+    def _reload_module(self, module_name: str) -> None:
+        """Reloads an already-imported plugin module so lookups see the new code."""
+        module = sys.modules.get(f"{self.package_name}.{module_name}")
+        if module is None:
+            return
+        try:
+            importlib.reload(module)
+        except Exception:  # pylint: disable=broad-except
+            # Keep serving the other commands; the next lookup re-raises the import error
+            logger.exception("Failed to reload plugin module '%s'", module_name)
+            sys.modules.pop(module.__name__, None)
+
+    def _iter_plugin_files(self):
+        """Yields (module_name, stat_result) for every plugin source file."""
+        with os.scandir(self.package_path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if not entry.name.endswith(".py") or not entry.is_file():
+                    continue
+                module_name = entry.name[:-3]
+                if module_name in INTERNAL_MODULES:
+                    continue
+                yield module_name, entry.stat()
+
+    def _scan_module(self, module_name: str) -> dict[str, dict]:
+        """
+        Returns {command_name: {"class": ..., "usage": ..., "aliases": [...]}} for one plugin module.
+        The source is parsed statically; modules whose commands cannot be
+        determined that way (e.g. computed names or indirect subclasses)
+        are imported once and inspected as before.
         """
-        package_name = "app.commands"
-        package_path = os.path.dirname(__file__)
+        path = os.path.join(self.package_path, f"{module_name}.py")
+        try:
+            with open(path, "rb") as source:
+                commands = scan_source(source.read())
+        except (OSError, SyntaxError, ValueError):
+            commands = None
+        if commands is not None:
+            return commands
 
-        for finder, name, ispkg in pkgutil.iter_modules([package_path]):
-            # Skip __init__.py or sub-packages
-            if ispkg or name in ("__init__", "command_interface", "plugin_manager"):
-                continue
+        # Fallback only; kept out of the startup path when the manifest is current
+        import inspect  # pylint: disable=import-outside-toplevel
 
-            full_module_name = f"{package_name}.{name}"
-            module = importlib.import_module(full_module_name)
+        full_module_name = f"{self.package_name}.{module_name}"
+        module = importlib.import_module(full_module_name)
+        commands = {}
+        for _, obj in inspect.getmembers(module, inspect.isclass):
+            if (
+                issubclass(obj, CommandInterface)
+                and obj is not CommandInterface
+                and obj.__module__ == full_module_name
+            ):
+                # Register command by its 'name' property, plus any aliases
+                cmd_instance = obj()
+                aliases = list(getattr(obj, "aliases", ()))
+                commands[cmd_instance.name] = {
+                    "class": obj.__name__,
+                    "usage": _usage_from_doc(inspect.getdoc(obj)),
+                    "aliases": aliases,
+                }
+                for registered_name in (cmd_instance.name, *aliases):
+                    self._commands.register(registered_name, module_name, obj.__name__, obj)
+        return commands
 
-            for _, obj in inspect.getmembers(module, inspect.isclass):
-                if (
-                    issubclass(obj, CommandInterface)
-                    and obj is not CommandInterface
-                ):
-                    # Register command by its 'name' property
-                    cmd_instance = obj()
-                    self._commands[cmd_instance.name] = obj
+    def _load_manifest(self) -> dict[str, dict]:
+        """Returns the cached module entries, or {} if the manifest is missing or unusable."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        if (
+            data.get("version") != MANIFEST_VERSION
+            or data.get("package") != self.package_name
+            or data.get("path") != os.path.abspath(self.package_path)
+        ):
+            return {}
+        return data.get("modules", {})
+
+    def _save_manifest(self, modules: dict[str, dict]) -> None:
+        """Atomically writes the manifest; failures only cost a rescan next time."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "package": self.package_name,
+            "path": os.path.abspath(self.package_path),
+            "modules": modules,
+        }
+        import tempfile  # pylint: disable=import-outside-toplevel
+
+        directory = os.path.dirname(self.manifest_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as manifest_file:
+                json.dump(data, manifest_file)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as exc:
+            logger.debug("Could not write plugin manifest %s: %s", self.manifest_path, exc)
 
     def get_command(self, command_name: str):
         """
@@ -50,3 +305,156 @@ class PluginManager:
         If none is found, returns None.
         """
         return self._commands.get(command_name)
+
+    def canonical_name(self, command_name: str) -> Optional[str]:
+        """Returns the primary name for a command name or alias, or None if unknown."""
+        return self._canonical.get(command_name)
+
+    def list_commands(self) -> tuple[CommandInfo, ...]:
+        """
+        Returns metadata for every registered command, sorted by name.
+        The listing is cached and only rebuilt after plugins change.
+        """
+        listing = self._listing
+        if listing is None:
+            with self._lock:
+                listing = tuple(sorted(
+                    (
+                        CommandInfo(
+                            command_name, meta.get("usage"), module_name, meta["class"], tuple(meta.get("aliases", ()))
+                        )
+                        for module_name, entry in self._manifest.items()
+                        for command_name, meta in entry["commands"].items()
+                    ),
+                    key=lambda info: info.name,
+                ))
+                self._listing = listing
+        return listing
+
+    def command_names(self) -> list[str]:
+        """Returns the sorted names of all registered commands."""
+        return [info.name for info in self.list_commands()]
+
+    def start_watcher(self, interval: float = 1.0) -> None:
+        """
+        Starts a daemon thread that polls plugin mtimes every 'interval' seconds
+        and hot-reloads modules that changed. Opt-in; does nothing if already running.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watcher_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="plugin-watcher", daemon=True
+        )
+        self._watcher.start()
+        logger.info("Plugin hot reload enabled (polling every %.1fs).", interval)
+
+    def stop_watcher(self) -> None:
+        """Stops the hot-reload thread if it is running."""
+        self._watcher_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._watcher_stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Plugin hot reload failed")
+
+
+def scan_source(source: bytes) -> Optional[dict[str, dict]]:
+    """
+    Statically finds command classes in a plugin module's source.
+    Returns {command_name: {"class": ..., "usage": ..., "aliases": [...]}}, or None if the module
+    defines a class whose command name or base classes cannot be resolved
+    without importing it.
+    """
+    commands = {}
+    for node in ast.parse(source).body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        base_names = {_base_name(base) for base in node.bases} - {"object", "ABC"}
+        if not base_names:
+            continue
+        if base_names != {"CommandInterface"}:
+            return None
+        command_name = _literal_command_name(node)
+        if command_name is None:
+            return None
+        aliases = _literal_aliases(node)
+        if aliases is None:
+            return None
+        commands[command_name] = {
+            "class": node.name,
+            "usage": _usage_from_doc(ast.get_docstring(node)),
+            "aliases": aliases,
+        }
+    return commands
+
+
+def _usage_from_doc(docstring: Optional[str]) -> Optional[str]:
+    """Extracts the text after 'Usage:' from a command class docstring."""
+    for line in (docstring or "").splitlines():
+        line = line.strip()
+        if line.startswith("Usage:"):
+            return line[len("Usage:"):].strip() or None
+    return None
+
+
+def _base_name(node: ast.expr) -> Optional[str]:
+    """Returns the trailing identifier of a base class expression."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _literal_command_name(class_node: ast.ClassDef) -> Optional[str]:
+    """
+    Returns the command name if the class defines it as a string literal,
+    either as a 'name' property returning a constant or a 'name = "..."' attribute.
+    """
+    for item in class_node.body:
+        if isinstance(item, ast.FunctionDef) and item.name == "name":
+            returns = [stmt for stmt in item.body if isinstance(stmt, ast.Return)]
+            if (
+                len(returns) == 1
+                and isinstance(returns[0].value, ast.Constant)
+                and isinstance(returns[0].value.value, str)
+            ):
+                return returns[0].value.value
+            return None
+        if (
+            isinstance(item, ast.Assign)
+            and any(isinstance(target, ast.Name) and target.id == "name" for target in item.targets)
+            and isinstance(item.value, ast.Constant)
+            and isinstance(item.value.value, str)
+        ):
+            return item.value.value
+    return None
+
+
+def _literal_aliases(class_node: ast.ClassDef) -> Optional[list[str]]:
+    """
+    Returns the class-level 'aliases' tuple/list of string literals ([] if absent),
+    or None if it is defined in a way that needs the module to be imported.
+    """
+    for item in class_node.body:
+        targets = []
+        if isinstance(item, ast.Assign):
+            targets = item.targets
+        elif isinstance(item, ast.AnnAssign) and item.value is not None:
+            targets = [item.target]
+        if not any(isinstance(target, ast.Name) and target.id == "aliases" for target in targets):
+            continue
+        try:
+            aliases = ast.literal_eval(item.value)
+        except ValueError:
+            return None
+        if not isinstance(aliases, (tuple, list)) or not all(isinstance(alias, str) for alias in aliases):
+            return None
+        return list(aliases)
+    return []
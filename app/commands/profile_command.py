@@ -0,0 +1,52 @@
+"""
+profile_command.py: Defines the "profile" command plugin, which switches
+per-command cProfile profiling (app.profiling) on and off in a running session.
+"""
+from app import profiling, session
+from app.commands.command_interface import CommandInterface
+
+
+class ProfileCommand(CommandInterface):
+    """
+    Command to profile command execution with cProfile.
+    Usage: profile on [directory] | off | status
+    """
+
+    stateless = True
+
+    @property
+    def name(self) -> str:
+        return "profile"
+
+    def execute(self, args: list[str]) -> str:
+        """
+        'profile on' starts profiling every command (pstats files go to 'directory',
+        default PROFILE_DIR or ./profiles); 'profile off' stops it, writes one pstats
+        file per command and lists them. Raises ValueError for any other argument.
+        """
+        action = args[0].lower() if args else "status"
+        if action not in ("on", "off", "status") or len(args) > (2 if action == "on" else 1):
+            raise ValueError("Invalid arguments for profile command. Usage: profile on [directory] | off | status.")
+
+        if action == "on":
+            if len(args) > 1:
+                session.require_local("Choosing the profile directory")
+            profiler = profiling.start_cpu(args[1] if len(args) > 1 else None)
+            return f"CPU profiling on. Profiles will be written to {profiler.directory}."
+        if action == "status":
+            profiler = profiling.cpu_active()
+            if profiler is None:
+                return "CPU profiling is off."
+            return f"CPU profiling is on ({sum(profiler.calls.values())} command calls profiled)."
+
+        if profiling.cpu_active() is None:
+            raise ValueError("CPU profiling is not on.")
+        rows = profiling.stop_cpu()
+        lines = ["CPU profiling off."]
+        lines.extend(
+            f"  {command_name}: {calls} calls, {seconds * 1000:.3f}ms -> {path}"
+            for command_name, calls, seconds, path in rows
+        )
+        if not rows:
+            lines.append("  No commands were run while profiling.")
+        return "\n".join(lines)
@@ -0,0 +1,93 @@
+"""
+replay_command.py: Defines the "replay" command plugin, which re-executes a
+range of history entries in the current session, so replayed lines see and
+define the session's variables (see app.session).
+"""
+import re
+from typing import Optional
+
+from app import history, session
+from app.commands.command_interface import CommandInterface
+from app.dispatcher import UnknownCommandError, error_message
+
+RANGE = re.compile(r"^(\d+)(?:\.\.(\d*))?$")
+
+# Replaying these would only echo or recurse into the history itself
+NOT_REPLAYED = ("history", "replay")
+
+# Outputs shown for one replay; longer ranges still run, but the rest is summarised
+MAX_SHOWN_OUTPUTS = 100
+
+
+def parse_range(text: str) -> tuple[int, Optional[int]]:
+    """Parses "N", "N..M" or "N.." into (first, last); last is None for an open range."""
+    match = RANGE.match(text)
+    if match is None:
+        raise ValueError("Invalid range for replay command. Usage: replay N..M.")
+    first = int(match.group(1))
+    if match.group(2) is None:
+        return first, first
+    last = int(match.group(2)) if match.group(2) else None
+    if first < 1 or (last is not None and last < first):
+        raise ValueError("Invalid range for replay command. Usage: replay N..M.")
+    return first, last
+
+
+class ReplayCommand(CommandInterface):
+    """
+    Command to re-run history entries N to M.
+    Usage: replay N..M
+    """
+
+    @property
+    def name(self) -> str:
+        return "replay"
+
+    def execute(self, args: list[str]) -> str:
+        """
+        Re-executes entries N..M (also "N" or "N.."), skipping 'history' and
+        'replay' lines, and returns their outputs (the first MAX_SHOWN_OUTPUTS);
+        failing lines show their error. Lines run in the current session's
+        workspace, or in a fresh one outside a session.
+        Raises ValueError on a bad range or when no entry falls in it.
+        """
+        if len(args) != 1:
+            raise ValueError("Invalid number of arguments for replay command. Usage: replay N..M.")
+        first, last = parse_range(args[0])
+        recorder = history.active()
+        if recorder is None:
+            raise ValueError("History is not enabled in this session.")
+
+        current = session.current()
+        if current is not None and current.workspace is not None:
+            workspace = current.workspace
+        else:
+            # Imported lazily: plugin discovery should not load the variables module
+            from app.variables import Workspace  # pylint: disable=import-outside-toplevel
+            workspace = Workspace()
+        outputs = []
+        hidden = 0
+        replayed = 0
+        for entry in recorder.entries(first, last):
+            replayed += 1
+            line = entry.line
+            if line.split(maxsplit=1)[0].lower() in NOT_REPLAYED:
+                continue
+            try:
+                handler, command_name, line_args = workspace.resolve_line(line)
+                if handler is None:
+                    raise UnknownCommandError(command_name)
+                output = handler(line_args)
+            except Exception as exc:  # pylint: disable=broad-except
+                output = error_message(exc)
+            if output is None:
+                continue
+            if len(outputs) < MAX_SHOWN_OUTPUTS:
+                outputs.append(str(output))
+            else:
+                hidden += 1
+        if not replayed:
+            raise ValueError(f"No history entries in range {args[0]}.")
+        if hidden:
+            outputs.append(f"... {hidden} more outputs not shown.")
+        return "\n".join(outputs)
@@ -0,0 +1,48 @@
+"""
+stats_command.py: Defines the "stats" command plugin, which reports per-command
+call counts, error counts and latency percentiles collected by app.metrics.
+"""
+from app import metrics, result_cache
+from app.commands.command_interface import CommandInterface
+
+
+class StatsCommand(CommandInterface):
+    """
+    Command to show command execution statistics.
+    Usage: stats [prometheus|reset]
+    """
+
+    stateless = True
+
+    @property
+    def name(self) -> str:
+        return "stats"
+
+    def execute(self, args: list[str]) -> str:
+        """
+        With no arguments returns a per-command summary (calls, errors by type, p50/p95/p99).
+        'stats prometheus' returns the Prometheus text format; 'stats reset' clears the numbers.
+        Raises ValueError for any other argument.
+        """
+        if len(args) > 1 or (args and args[0] not in ("prometheus", "reset")):
+            raise ValueError("Invalid arguments for stats command. Usage: stats [prometheus|reset].")
+
+        active = metrics.active()
+        if args and args[0] == "prometheus":
+            if active is None:
+                raise ValueError("Metrics are disabled. Set METRICS_ENABLED=1 to collect them.")
+            return active.render_prometheus().rstrip("\n")
+        if args:
+            if active is not None:
+                active.reset()
+            return "Statistics reset."
+
+        lines = [active.render_text() if active is not None else "Metrics are disabled. Set METRICS_ENABLED=1 to collect them."]
+        cache = result_cache.active()
+        if cache is not None:
+            counters = cache.stats()
+            lines.append(
+                f"Result cache: size={counters['size']}/{cache.maxsize} hits={counters['hits']} "
+                f"misses={counters['misses']} evictions={counters['evictions']}"
+            )
+        return "\n".join(lines)
@@ -1,33 +1,39 @@
 """
 subtract_command.py: Defines the "subtract" command plugin.
 """
-from app.commands.command_interface import CommandInterface
+from typing import Sequence
+
+from app import numeric, vectorized
+from app.commands.command_interface import BatchResult, CommandInterface
 
 
 class SubtractCommand(CommandInterface):
     """
     Command to subtract two numbers.
     Usage: subtract x y
+    Vectors: subtract 1,2,3 10 or subtract [1 2 3] [4 5 6]
     """
 
+    stateless = True
+    cacheable = True
+    aliases = ("-",)
+
     @property
     def name(self) -> str:
         return "subtract"
 
-    def execute(self, args: list[str]) -> str:
-        """
-        Expects exactly two numeric arguments.
-        Returns a string: "x - y = result"
-        Raises ValueError if number of args is incorrect or if conversion fails.
-        """
-        if len(args) != 2:
-            raise ValueError("Invalid number of arguments for subtract command. Usage: subtract <num1> <num2>.")
+    # Parsing per the active numeric backend, vector operands and errors: see app.numeric
+    execute = numeric.binary_execute("subtract", "-")
 
-        try:
-            x = float(args[0])
-            y = float(args[1])
-        except ValueError:
-            raise ValueError("Invalid numeric input for subtract command.")
+    def compute(self, x: float, y: float) -> float:
+        """Returns x - y, in the operands' number type (float, Decimal or Fraction)."""
+        return x - y
 
-        result = x - y
-        return f"{x} - {y} = {result}"
+    def execute_batch(self, *columns: Sequence) -> BatchResult:
+        """
+        Expects exactly two operand columns of equal length.
+        Returns the element-wise results, vectorized with NumPy when available.
+        """
+        if len(columns) != 2:
+            raise ValueError("Invalid number of operand columns for subtract command. Usage: subtract <num1> <num2>.")
+        return vectorized.apply_binary("subtract", columns[0], columns[1])
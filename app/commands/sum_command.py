@@ -0,0 +1,35 @@
+"""
+sum_command.py: Defines the "sum" aggregate command plugin.
+"""
+from app import reducers
+from app.commands.command_interface import CommandInterface
+from app.results import CommandResult
+
+
+class SumCommand(CommandInterface):
+    """
+    Command to add up any number of values.
+    Usage: sum x [y ...] | @file | -
+    """
+
+    stateless = True
+    cacheable = True
+
+    @property
+    def name(self) -> str:
+        return "sum"
+
+    def execute(self, args: list[str]) -> CommandResult:
+        """
+        Accepts numbers, '@path' (a file of numbers) and '-' (stdin), in one pass.
+        Returns a CommandResult, written as "sum of {count} values = {value}"
+        Raises ValueError on non-numeric input, unreadable files or no numbers.
+        """
+        if not args:
+            raise ValueError("Invalid number of arguments for sum command. Usage: sum <num1> [num2 ...] | @file | -.")
+        value, count = reducers.total(reducers.iter_operand_blocks(args, "sum"))
+        return CommandResult("sum", None, value, "sum of %(count)d values = %(value)s", count=count)
+
+    def compute(self, *operands: float) -> float:
+        """Returns the compensated sum of the operands."""
+        return reducers.total([reducers.as_block(operands, "sum")])[0]
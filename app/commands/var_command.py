@@ -0,0 +1,35 @@
+"""
+var_command.py: Defines the "var" aggregate command plugin.
+"""
+from app import reducers
+from app.commands.command_interface import CommandInterface
+from app.results import CommandResult
+
+
+class VarCommand(CommandInterface):
+    """
+    Command to compute the sample variance of any number of values.
+    Usage: var x [y ...] | @file | -
+    """
+
+    stateless = True
+    cacheable = True
+
+    @property
+    def name(self) -> str:
+        return "var"
+
+    def execute(self, args: list[str]) -> CommandResult:
+        """
+        Accepts numbers, '@path' (a file of numbers) and '-' (stdin), in one pass.
+        Returns a CommandResult, written as "var of {count} values = {value}"
+        Raises ValueError on non-numeric input, unreadable files or fewer than two numbers.
+        """
+        if not args:
+            raise ValueError("Invalid number of arguments for var command. Usage: var <num1> [num2 ...] | @file | -.")
+        value, count = reducers.variance(reducers.iter_operand_blocks(args, "var"))
+        return CommandResult("var", None, value, "var of %(count)d values = %(value)s", count=count)
+
+    def compute(self, *operands: float) -> float:
+        """Returns the sample variance (n - 1 denominator) of the operands."""
+        return reducers.variance([reducers.as_block(operands, "var")])[0]
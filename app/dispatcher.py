@@ -0,0 +1,218 @@
+"""
+dispatcher.py: Defines the Dispatcher, which turns a command name into a bound
+callable once and reuses it for every following call.
+
+The REPL, batch runs and embedded callers all dispatch through this class, so
+they share the same lookup rules (case folding and aliases) and the same error
+messages. Commands that declare themselves stateless are instantiated once;
+all others still get a fresh instance per call.
+
+Optional features (metrics, caching, ...) hook in as middleware: functions that
+wrap a command's handler when it is bound. With no middleware registered the
+bound handler is the plain execute() method, so disabled features cost nothing.
+"""
+import re
+from typing import Callable, Optional
+
+from app.commands.plugin_manager import PluginManager
+from app.results import CommandResult, Output
+
+Handler = Callable[[list[str]], Optional[Output]]
+
+# middleware(command_name, command_class, handler) -> wrapped handler
+Middleware = Callable[[str, type, Handler], Handler]
+
+# Lines starting like arithmetic (a number, sign or '(') are expressions, not commands
+EXPRESSION_START = re.compile(r"^\s*[-+]?\s*[\d.(]")
+
+UNKNOWN_COMMAND_MESSAGE = "Unknown command. Type 'menu' to see available commands, or 'exit' to quit."
+
+
+class UnknownCommandError(LookupError):
+    """Raised when a line names a command that is not registered."""
+
+    def __init__(self, command_name: str):
+        super().__init__(command_name)
+        self.command_name = command_name
+
+
+def error_message(exc: BaseException) -> str:
+    """Returns the user-facing message the REPL prints for a failed command."""
+    if isinstance(exc, UnknownCommandError):
+        return UNKNOWN_COMMAND_MESSAGE
+    if isinstance(exc, ValueError):
+        return f"Error: {exc}"
+    if isinstance(exc, ZeroDivisionError):
+        return "Error: Cannot divide by zero."
+    if isinstance(exc, TimeoutError):
+        # A pooled command missed its deadline (app.scheduler)
+        return f"Error: {exc}"
+    return f"Unexpected error: {exc}"
+
+
+class MiddlewareRegistry:
+    """
+    Process-wide, ordered list of handler middleware. Lower 'order' wraps
+    further out. 'version' changes on every update so dispatchers can rebind.
+    """
+
+    def __init__(self):
+        self._entries: list[tuple[int, Middleware]] = []
+        self.version = 0
+
+    def register(self, wrapper: Middleware, order: int = 0) -> None:
+        """Adds a middleware (no-op if already registered)."""
+        if wrapper not in self:
+            self._entries.append((order, wrapper))
+            self._entries.sort(key=lambda entry: entry[0])
+            self.version += 1
+
+    def unregister(self, wrapper: Middleware) -> None:
+        """Removes a middleware if it is registered."""
+        entries = [entry for entry in self._entries if entry[1] != wrapper]
+        if len(entries) != len(self._entries):
+            self._entries = entries
+            self.version += 1
+
+    def apply(self, command_name: str, command_class: type, handler: Handler) -> Handler:
+        """Wraps 'handler' in every registered middleware, the highest 'order' innermost."""
+        for _, wrapper in reversed(self._entries):
+            handler = wrapper(command_name, command_class, handler)
+        return handler
+
+    def __contains__(self, wrapper) -> bool:
+        return any(entry[1] == wrapper for entry in self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+middleware = MiddlewareRegistry()
+
+
+class Dispatcher:
+    """
+    Maintains a table of command name -> bound callable.
+    Entries are bound on first use, so plugins stay lazily imported, and the
+    table is dropped whenever the PluginManager's set of commands changes.
+    """
+
+    def __init__(self, plugin_manager: Optional[PluginManager] = None):
+        self.plugin_manager = plugin_manager or PluginManager.shared()
+        self._table: dict[str, Handler] = {}
+        # One handler per command class, so aliases share the same instance
+        self._by_class: dict[type, Handler] = {}
+        self._generation = (self.plugin_manager.generation, middleware.version)
+        self._engine = None
+        self._pipeline = None
+
+    def resolve(self, command_name: str) -> Optional[Handler]:
+        """
+        Returns the callable for a command name or alias (case-insensitive),
+        or None if no such command is registered.
+        """
+        if self._generation != (self.plugin_manager.generation, middleware.version):
+            # Plugins were hot-reloaded or middleware changed; rebind everything lazily
+            self._table.clear()
+            self._by_class.clear()
+            self._generation = (self.plugin_manager.generation, middleware.version)
+
+        handler = self._table.get(command_name)
+        if handler is None:
+            handler = self._bind(command_name)
+        return handler
+
+    def _bind(self, command_name: str) -> Optional[Handler]:
+        folded = command_name.lower()
+        handler = self._table.get(folded)
+        if handler is None:
+            command_class = self.plugin_manager.get_command(folded)
+            if command_class is None:
+                return None
+            handler = self._by_class.get(command_class)
+            if handler is None:
+                handler = _make_handler(command_class)
+                if len(middleware):
+                    canonical = self.plugin_manager.canonical_name(folded) or folded
+                    handler = middleware.apply(canonical, command_class, handler)
+                self._by_class[command_class] = handler
+            self._table[folded] = handler
+        # Remember the exact spelling too, so repeated mixed-case input skips lower()
+        self._table[command_name] = handler
+        return handler
+
+    def execute(self, command_name: str, args: list[str]) -> Optional[Output]:
+        """
+        Executes a command by name with string arguments and returns its output.
+        Raises UnknownCommandError, or whatever the command itself raises.
+        """
+        handler = self.resolve(command_name)
+        if handler is None:
+            raise UnknownCommandError(command_name)
+        return handler(args)
+
+    def expression(self, args: list[str], variables: Optional[dict] = None) -> CommandResult:
+        """
+        Handler for nested/infix expression lines such as 'add 1 (multiply 2 3)'
+        or '1 + 2*3'; 'args' holds the line's tokens and 'variables' the values of
+        names used in them (see app.variables). Returns "expression = result".
+        """
+        if self._engine is None:
+            # Imported lazily so plain command sessions never load the parser
+            from app.expression import ExpressionEngine  # pylint: disable=import-outside-toplevel
+            self._engine = ExpressionEngine(self.plugin_manager)
+        source = " ".join(args)
+        return format_expression(source, self._engine.evaluate(source, variables))
+
+    def pipeline(self, args: list[str]) -> CommandResult:
+        """
+        Handler for '|' lines such as 'multiply 3 4 | add 1 | divide _ 2'; 'args'
+        holds the line's tokens. Returns "pipeline = result".
+        """
+        if self._pipeline is None:
+            # Imported lazily, like the expression engine
+            from app.pipeline import PipelineEngine  # pylint: disable=import-outside-toplevel
+            self._pipeline = PipelineEngine(self.plugin_manager)
+        source = " ".join(args)
+        return format_expression(source, self._pipeline.evaluate(source), "pipeline")
+
+    def resolve_line(self, line: str, parts: Optional[list[str]] = None) -> tuple[Optional[Handler], str, list[str]]:
+        """
+        Splits a line (unless the caller already did: 'parts') and picks its handler:
+        the pipeline engine for '|' lines, the expression engine for nested or infix
+        input, otherwise the named command.
+        Returns (handler, command_name, args); handler is None for an unknown command.
+        """
+        if parts is None:
+            parts = line.split()
+        if "|" in line:
+            return self.pipeline, "pipeline", parts
+        handler = self.resolve(parts[0])
+        if "(" in line or (handler is None and EXPRESSION_START.match(line)):
+            return self.expression, "expression", parts
+        return handler, parts[0].lower(), parts[1:]
+
+    def dispatch(self, line: str) -> Optional[Output]:
+        """Parses a 'cmd arg1 arg2 ...' (or expression) line and executes it."""
+        if not line.strip():
+            return None
+        handler, command_name, args = self.resolve_line(line)
+        if handler is None:
+            raise UnknownCommandError(command_name)
+        return handler(args)
+
+
+def _make_handler(command_class) -> Handler:
+    """Binds a stateless command's execute() to a single instance, or wraps a stateful one."""
+    if getattr(command_class, "stateless", False):
+        return command_class().execute
+
+    def handler(args: list[str]) -> Optional[Output]:
+        return command_class().execute(args)
+    return handler
+
+
+def format_expression(source: str, value: float, command_name: str = "expression") -> CommandResult:
+    """Wraps an evaluated expression (or pipeline) in a result that prints as "source = value"."""
+    template = source.replace("%", "%%") + " = %s"
+    return CommandResult(command_name, (), value, template)
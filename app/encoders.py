@@ -0,0 +1,154 @@
+"""
+encoders.py: Output encoders that turn command outputs into lines of text.
+
+    text   the REPL's human-readable form ("3.0 + 4.0 = 7.0")
+    jsonl  one JSON object per line: {"command", "operands" | "count", "value"};
+           Decimal and Fraction numbers are exact strings ("0.30", "1/3")
+    csv    command,value,operands... rows after a header line
+    raw    just the value ("7.0")
+
+Vector results (see VectorResult) are compact in text form; the other formats
+keep every element.
+
+Outputs are CommandResult objects or plain strings (from plugins that format
+their own output, such as 'menu'); strings pass through as text, become
+{"output": ...} in JSON Lines and a single quoted field in CSV.
+
+ResultWriter puts an encoder in front of a buffered text stream; formatting
+happens there, when a line is actually written.
+"""
+import json
+from typing import Iterable, Optional, TextIO
+
+from app.results import CommandResult, Output
+
+DEFAULT_FORMAT = "text"
+
+
+class TextEncoder:
+    """Human-readable text, exactly what the REPL prints."""
+
+    name = "text"
+    header: Optional[str] = None
+
+    def encode(self, output: Output) -> str:
+        return str(output)
+
+
+class RawEncoder:
+    """The bare value of a result; other outputs as text."""
+
+    name = "raw"
+    header: Optional[str] = None
+
+    def encode(self, output: Output) -> str:
+        if isinstance(output, CommandResult):
+            return output.value_text()
+        return str(output)
+
+
+class JsonLinesEncoder:
+    """One JSON object per output."""
+
+    name = "jsonl"
+    header: Optional[str] = None
+
+    def encode(self, output: Output) -> str:
+        if isinstance(output, CommandResult):
+            return json.dumps(output.as_dict())
+        return json.dumps({"output": str(output)})
+
+
+class CsvEncoder:
+    """command,value,operand1,operand2,... rows; text outputs as a single quoted field."""
+
+    name = "csv"
+    header: Optional[str] = "command,value,operands"
+
+    def encode(self, output: Output) -> str:
+        if isinstance(output, CommandResult):
+            fields = [_csv_field(output.command), output.value_text()]
+            fields.extend(output.operand_texts())
+            return ",".join(fields)
+        return _csv_field(str(output))
+
+
+def _csv_field(text: str) -> str:
+    """Quotes a field the way the csv module does for its default dialect."""
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+ENCODERS = {encoder.name: encoder for encoder in (TextEncoder, JsonLinesEncoder, CsvEncoder, RawEncoder)}
+FORMATS = tuple(ENCODERS)
+
+
+def get_encoder(name: str = DEFAULT_FORMAT):
+    """Returns an encoder instance for a format name. Raises ValueError for unknown formats."""
+    encoder_class = ENCODERS.get(name.lower())
+    if encoder_class is None:
+        raise ValueError(f"Unknown output format '{name}'. Expected one of: {', '.join(FORMATS)}.")
+    return encoder_class()
+
+
+def encode(output: Output, name: str = DEFAULT_FORMAT) -> str:
+    """Encodes a single output; convenient for embedded callers."""
+    return get_encoder(name).encode(output)
+
+
+class ResultWriter:
+    """
+    Writes encoded outputs, one per line, to a text stream. The header (CSV)
+    is written before the first line. With 'flush' set, the stream is flushed
+    after every write, as the interactive REPL needs.
+    """
+
+    def __init__(self, stream: TextIO, encoder=None, flush: bool = False):
+        self.stream = stream
+        self.encoder = encoder or TextEncoder()
+        self.flush_each = flush
+        self._header_pending = self.encoder.header is not None
+        self._text = type(self.encoder) is TextEncoder  # pylint: disable=unidiomatic-typecheck
+
+    def write_header(self) -> None:
+        """Writes the header now if it is still due (e.g. for an empty CSV file)."""
+        if self._header_pending:
+            self._header_pending = False
+            self.stream.write(self.encoder.header + "\n")
+
+    def write(self, output: Output) -> None:
+        """Encodes and writes one output."""
+        if self._header_pending:
+            self.write_header()
+        if self._text and output.__class__ is CommandResult and output.template and output.operands is not None:
+            # The REPL's case, inlined as in write_many()
+            line = output.template % (*output.operands, output.value)
+        else:
+            line = self.encoder.encode(output)
+        self.stream.write(line + "\n")
+        if self.flush_each:
+            self.stream.flush()
+
+    def write_many(self, outputs: Iterable[Output]) -> None:
+        """Encodes several outputs and writes them in a single call."""
+        self.write_header()
+        if self._text:
+            # The common case, with CommandResult.__str__'s main branch inlined:
+            # a Python-level __str__ call per line costs more than the formatting itself
+            lines = [
+                output.template % (*output.operands, output.value)
+                if output.__class__ is CommandResult and output.template and output.operands is not None
+                else str(output)
+                for output in outputs
+            ]
+        else:
+            lines = list(map(self.encoder.encode, outputs))
+        if lines:
+            lines.append("")
+            self.stream.write("\n".join(lines))
+        if self.flush_each:
+            self.stream.flush()
+
+    def flush(self) -> None:
+        self.stream.flush()
@@ -0,0 +1,267 @@
+"""
+expression.py: Nested expression front end for the calculator.
+
+Accepts prefix command calls with parenthesised sub-expressions, e.g.
+    add 1 (multiply 2 (divide 9 3))
+and infix arithmetic with the usual precedence, e.g.
+    1 + 2*3
+or any mix of both. Expressions are parsed into a small AST whose calls map onto
+the registered CommandInterface plugins (infix operators map to add, subtract,
+multiply and divide). Compilation folds every call to a pure (cacheable) command
+whose operands are constants, and the resulting plans are cached per expression
+string. Evaluation passes raw numbers between nodes through each plugin's
+compute() method; nothing is formatted until the final result. Literals are
+parsed, and plans run, with the active numeric backend (app.numeric).
+
+REPL variables (app.variables) are passed in as values, not pasted into the
+text: a name found in 'variables' is a constant operand, so values such as
+1/3 (fraction backend), inf or nan need no literal syntax.
+"""
+import inspect
+import re
+from typing import Callable, Mapping, NamedTuple, Optional, Union
+
+from app import numeric
+from app.commands.plugin_manager import PluginManager
+from app.result_cache import ResultCache
+
+TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<op>[-+*/()]))"
+)
+
+# Infix operator -> command it is evaluated with
+INFIX_COMMANDS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide"}
+
+class Number(NamedTuple):
+    """A numeric literal (or a folded constant)."""
+    value: float
+
+
+class Call(NamedTuple):
+    """A call of a command plugin on operand sub-expressions."""
+    command: str
+    operands: tuple
+
+
+Node = Union[Number, Call]
+Plan = Callable[[], float]
+
+
+def tokenize(source: str) -> list[tuple[str, str]]:
+    """Splits an expression into (kind, text) tokens. Raises ValueError on stray characters."""
+    tokens = []
+    position = 0
+    source = source.rstrip()
+    while position < len(source):
+        match = TOKEN_PATTERN.match(source, position)
+        if match is None:
+            raise ValueError(f"Invalid expression: unexpected '{source[position:].strip()[:1]}' at position {position + 1}.")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """
+    Recursive-descent parser for:
+        line    := call | infix
+        call    := NAME operand*
+        operand := NUMBER | VARIABLE | '-' operand | '(' inner ')'
+        inner   := call | infix
+        infix   := term (('+' | '-') term)*
+        term    := factor (('*' | '/') factor)*
+        factor  := ('-' | '+') factor | NUMBER | VARIABLE | '(' inner ')'
+    where VARIABLE is a NAME in 'variables' (name -> value).
+    """
+
+    def __init__(self, source: str, variables: Optional[Mapping[str, float]] = None):
+        self.tokens = tokenize(source)
+        self.position = 0
+        self.variables = variables or {}
+
+    def parse(self) -> Node:
+        """Parses the whole source into an AST."""
+        if not self.tokens:
+            raise ValueError("Invalid expression: nothing to evaluate.")
+        node = self._inner()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Invalid expression: unexpected '{self.tokens[self.position][1]}'.")
+        return node
+
+    def _peek(self) -> Optional[tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self) -> tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise ValueError("Invalid expression: unexpected end of input.")
+        self.position += 1
+        return token
+
+    def _expect(self, text: str) -> None:
+        kind, value = self._take()
+        if kind != "op" or value != text:
+            raise ValueError(f"Invalid expression: expected '{text}' but found '{value}'.")
+
+    def _inner(self) -> Node:
+        token = self._peek()
+        if token is not None and token[0] == "name" and token[1] not in self.variables:
+            return self._call()
+        return self._infix()
+
+    def _call(self) -> Node:
+        _, command = self._take()
+        operands = []
+        while True:
+            token = self._peek()
+            if token is None or token == ("op", ")"):
+                break
+            operands.append(self._operand())
+        return Call(command.lower(), tuple(operands))
+
+    def _operand(self) -> Node:
+        kind, value = self._take()
+        if kind == "number":
+            return Number(numeric.parse(value))
+        if kind == "name" and value in self.variables:
+            return Number(self.variables[value])
+        if (kind, value) == ("op", "-"):
+            return _negate(self._operand())
+        if (kind, value) == ("op", "("):
+            node = self._inner()
+            self._expect(")")
+            return node
+        raise ValueError(f"Invalid expression: unexpected '{value}'.")
+
+    def _infix(self) -> Node:
+        node = self._term()
+        while self._peek() in (("op", "+"), ("op", "-")):
+            _, op = self._take()
+            node = Call(INFIX_COMMANDS[op], (node, self._term()))
+        return node
+
+    def _term(self) -> Node:
+        node = self._factor()
+        while self._peek() in (("op", "*"), ("op", "/")):
+            _, op = self._take()
+            node = Call(INFIX_COMMANDS[op], (node, self._factor()))
+        return node
+
+    def _factor(self) -> Node:
+        kind, value = self._take()
+        if kind == "number":
+            return Number(numeric.parse(value))
+        if kind == "name" and value in self.variables:
+            return Number(self.variables[value])
+        if (kind, value) == ("op", "-"):
+            return _negate(self._factor())
+        if (kind, value) == ("op", "+"):
+            return self._factor()
+        if (kind, value) == ("op", "("):
+            node = self._inner()
+            self._expect(")")
+            return node
+        raise ValueError(f"Invalid expression: unexpected '{value}'.")
+
+
+def _negate(node: Node) -> Node:
+    if isinstance(node, Number):
+        return Number(-node.value)
+    return Call("subtract", (Number(numeric.parse("0")), node))
+
+
+def parse(source: str, variables: Optional[Mapping[str, float]] = None) -> Node:
+    """Parses an expression string into an AST; 'variables' maps names to values."""
+    return Parser(source, variables).parse()
+
+
+class ExpressionEngine:
+    """
+    Compiles expressions into cached, constant-folded plans over the
+    registered command plugins and evaluates them.
+    """
+
+    def __init__(self, plugin_manager: Optional[PluginManager] = None, plan_cache_size: int = 512):
+        self.plugin_manager = plugin_manager or PluginManager.shared()
+        self._plans = ResultCache(maxsize=plan_cache_size)
+        self._commands: dict[str, object] = {}
+        self._generation = self.plugin_manager.generation
+
+    def _check_generation(self) -> None:
+        generation = self.plugin_manager.generation
+        if self._generation != generation:
+            # Plugins changed (hot reload): compiled plans may reference stale code
+            self._plans.clear()
+            self._commands.clear()
+            self._generation = generation
+
+    def command(self, name: str):
+        """Returns a (reused) command instance that supports compute()."""
+        instance = self._commands.get(name)
+        if instance is None:
+            command_class = self.plugin_manager.get_command(name)
+            if command_class is None:
+                raise ValueError(f"Unknown command '{name}' in expression.")
+            instance = command_class()
+            if not hasattr(instance, "supports_compute") or not instance.supports_compute():
+                raise ValueError(f"The '{name}' command cannot be used inside an expression.")
+            self._commands[name] = instance
+        return instance
+
+    def compile(self, source: str, variables: Optional[Mapping[str, float]] = None) -> Plan:
+        """
+        Returns the evaluation plan for 'source' under the active numeric backend,
+        compiling it on first use. Plans hold parsed constants, so each backend
+        (sessions may use different ones) and each set of variable values has its own.
+        """
+        self._check_generation()
+        key = (numeric.active(), source, tuple(sorted(variables.items())) if variables else None)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._build(numeric.run(self.fold, parse(source, variables)))
+            self._plans.put(key, plan)
+        return plan
+
+    def evaluate(self, source: str, variables: Optional[Mapping[str, float]] = None) -> float:
+        """Parses (or reuses the cached plan for) 'source' and returns its numeric value."""
+        plan = self.compile(source, variables)
+        return plan() if numeric.active() is numeric.FLOAT else numeric.run(plan)
+
+    def fold(self, node: Node) -> Node:
+        """
+        Constant folding: evaluates calls to pure commands whose operands are all
+        constants. Calls that fail (e.g. division by zero) are left in place so
+        the error surfaces when the plan runs.
+        """
+        if isinstance(node, Number):
+            return node
+        operands = tuple(self.fold(operand) for operand in node.operands)
+        instance = self.command(node.command)
+        _check_arity(node.command, instance, len(operands))
+        if getattr(instance, "cacheable", False) and all(isinstance(operand, Number) for operand in operands):
+            try:
+                return Number(instance.compute(*(operand.value for operand in operands)))
+            except (ValueError, ArithmeticError):
+                pass
+        return Call(node.command, operands)
+
+    def _build(self, node: Node) -> Plan:
+        """Turns a folded AST into nested closures that pass raw floats around."""
+        if isinstance(node, Number):
+            value = node.value
+            return lambda: value
+        compute = self.command(node.command).compute
+        operand_plans = [self._build(operand) for operand in node.operands]
+        if len(operand_plans) == 2:
+            left, right = operand_plans
+            return lambda: compute(left(), right())
+        return lambda: compute(*(plan() for plan in operand_plans))
+
+
+def _check_arity(name: str, instance, count: int) -> None:
+    try:
+        inspect.signature(instance.compute).bind(*([0.0] * count))
+    except TypeError:
+        raise ValueError(f"Invalid number of arguments for {name} command in expression.") from None
+
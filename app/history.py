@@ -0,0 +1,246 @@
+"""
+history.py: Session history for the REPL.
+
+Executed lines and their results are kept in a fixed-size ring buffer of
+preallocated, slotted HistoryEntry records, so a long session neither grows
+memory nor allocates a dict per line. Optionally every entry is also appended
+to a binary log file, which outlives the session:
+
+    file   := MAGIC record*
+    record := header (struct RECORD_HEADER: timestamp, line length,
+              output length, status) + UTF-8 line + UTF-8 output
+
+Entries are numbered from 1 in log order (across sessions when a log is used).
+The 'history' and 'replay N..M' commands read recent entries from the ring and
+older ones from the log. Server connections each keep their own ring (no log),
+which active() returns while one of their lines runs.
+"""
+import os
+import struct
+import time
+from typing import Iterator, Optional
+
+from app import session
+from app.results import Output
+
+MAGIC = b"CALCHST1"
+RECORD_HEADER = struct.Struct("<dIIB")  # timestamp, line bytes, output bytes, status
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_CAPACITY = 1000
+
+
+class HistoryEntry:
+    """
+    One executed line. Ring slots are reused, so copy fields out if you keep them;
+    entries() does, with 'output' as text.
+    """
+
+    __slots__ = ("seq", "timestamp", "line", "output", "ok")
+
+    def __init__(self, seq: int = 0, timestamp: float = 0.0, line: str = "", output: str = "", ok: bool = True):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.line = line
+        self.output = output
+        self.ok = ok
+
+    def __repr__(self) -> str:
+        return f"HistoryEntry(seq={self.seq}, line={self.line!r}, ok={self.ok})"
+
+
+def read_log(path: str, skip: int = 0) -> Iterator[HistoryEntry]:
+    """
+    Yields the entries of a history log in order, after skipping the first
+    'skip' records without decoding them. A record cut short by a crash ends the log.
+    Raises ValueError if 'path' is not a history log.
+    """
+    header_size = RECORD_HEADER.size
+    with open(path, "rb") as stream:
+        if stream.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a calculator history log: {path}")
+        seq = 0
+        while True:
+            header = stream.read(header_size)
+            if len(header) < header_size:
+                return
+            timestamp, line_size, output_size, status = RECORD_HEADER.unpack(header)
+            seq += 1
+            if seq <= skip:
+                stream.seek(line_size + output_size, os.SEEK_CUR)
+                continue
+            payload = stream.read(line_size + output_size)
+            if len(payload) < line_size + output_size:
+                return
+            yield HistoryEntry(
+                seq, timestamp,
+                payload[:line_size].decode("utf-8"), payload[line_size:].decode("utf-8"),
+                status == STATUS_OK,
+            )
+
+
+def count_records(path: str) -> int:
+    """Returns the number of complete records in a history log (0 if it does not exist)."""
+    return _scan(path)[0]
+
+
+def _scan(path: str) -> tuple[int, int]:
+    """
+    Returns (complete records, byte length they end at) for a history log;
+    (0, 0) if it does not exist or is too short for the magic number. Files
+    that are not history logs count as (0, their size), so they are never cut.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0, 0
+    if size < len(MAGIC):
+        return 0, 0
+    count = 0
+    position = end = len(MAGIC)
+    with open(path, "rb") as stream:
+        if stream.read(len(MAGIC)) != MAGIC:
+            return 0, size
+        while position + RECORD_HEADER.size <= size:
+            _, line_size, output_size, _ = RECORD_HEADER.unpack(stream.read(RECORD_HEADER.size))
+            position += RECORD_HEADER.size + line_size + output_size
+            if position > size:
+                break
+            count += 1
+            end = position
+            stream.seek(position)
+    return count, end
+
+
+class History:
+    """
+    Ring buffer of the last 'capacity' executed lines, optionally mirrored to an
+    append-only binary log at 'log_path'.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, log_path: Optional[str] = None, clock=time.time):
+        if capacity < 1:
+            raise ValueError("History size must be at least 1.")
+        self.capacity = capacity
+        self.log_path = log_path
+        self._clock = clock
+        self._ring = [HistoryEntry() for _ in range(capacity)]
+        self._recorded = 0             # entries recorded by this session
+        self._base: Optional[int] = None if log_path else 0  # log entries from earlier sessions
+        self._log = None
+
+    def record(self, line: str, output: Optional[Output], ok: bool = True) -> None:
+        """
+        Stores one executed line and its output (or error message). The ring keeps
+        the output as given (e.g. an unformatted CommandResult); it is turned into
+        text only when the entry is read, or written to the log.
+        """
+        timestamp = self._clock()
+        entry = self._ring[self._recorded % self.capacity]
+        self._recorded += 1
+        entry.seq = self._recorded
+        entry.timestamp = timestamp
+        entry.line = line
+        entry.output = output
+        entry.ok = ok
+        if self.log_path is not None:
+            self._append(timestamp, line, "" if output is None else str(output), ok)
+
+    def _append(self, timestamp: float, line: str, output: str, ok: bool) -> None:
+        if self._log is None:
+            count, end = _scan(self.log_path)
+            if self._base is None:
+                # Counted before this session's first record goes in
+                self._base = count
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > end:
+                # A crash left a partial record at the end; records appended after it
+                # would be unreadable, since read_log() stops at the partial one
+                os.truncate(self.log_path, end)
+            self._log = open(self.log_path, "ab")  # pylint: disable=consider-using-with
+            if self._log.tell() == 0:
+                self._log.write(MAGIC)
+        line_bytes = line.encode("utf-8")
+        output_bytes = output.encode("utf-8")
+        self._log.write(
+            RECORD_HEADER.pack(timestamp, len(line_bytes), len(output_bytes), STATUS_OK if ok else STATUS_ERROR)
+            + line_bytes + output_bytes
+        )
+        # One write per line typed; flushed so the log survives a crash
+        self._log.flush()
+
+    @property
+    def base(self) -> int:
+        """Number of log entries that precede this session."""
+        if self._base is None:
+            self._base = count_records(self.log_path)
+        return self._base
+
+    def __len__(self) -> int:
+        """Total number of entries, including earlier sessions' logged ones."""
+        return self.base + self._recorded
+
+    def entries(self, first: int = 1, last: Optional[int] = None) -> Iterator[HistoryEntry]:
+        """
+        Yields entries numbered first..last (inclusive, clamped to what exists),
+        from the ring when it still holds them and from the log otherwise.
+        """
+        total = len(self)
+        last = total if last is None else min(last, total)
+        first = max(first, 1)
+        if first > last:
+            return
+        base = self.base
+        oldest_in_ring = base + max(self._recorded - self.capacity, 0) + 1
+        if first < oldest_in_ring and self.log_path is not None:
+            for entry in read_log(self.log_path, skip=first - 1):
+                if entry.seq > last:
+                    return
+                yield entry
+            return
+        for seq in range(max(first, oldest_in_ring), last + 1):
+            entry = self._ring[(seq - base - 1) % self.capacity]
+            output = "" if entry.output is None else str(entry.output)
+            yield HistoryEntry(seq, entry.timestamp, entry.line, output, entry.ok)
+
+    def tail(self, count: int) -> Iterator[HistoryEntry]:
+        """Yields the last 'count' entries."""
+        total = len(self)
+        return self.entries(total - count + 1, total)
+
+    def close(self) -> None:
+        """Closes the log file; it is reopened if more entries are recorded."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+_active: Optional[History] = None
+
+
+def enable(capacity: int = DEFAULT_CAPACITY, log_path: Optional[str] = None) -> History:
+    """Turns session history on process-wide and returns it."""
+    global _active  # pylint: disable=global-statement
+    disable()
+    _active = History(capacity, log_path)
+    return _active
+
+
+def disable() -> None:
+    """Turns session history off, closing its log."""
+    global _active  # pylint: disable=global-statement
+    if _active is not None:
+        _active.close()
+        _active = None
+
+
+def active() -> Optional[History]:
+    """
+    Returns the History of the current session (see app.session) if it has
+    one, else the process-wide History, or None when history is off.
+    """
+    current = session.current()
+    if current is not None and current.history is not None:
+        return current.history
+    return _active
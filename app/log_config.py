@@ -0,0 +1,185 @@
+"""
+log_config.py: Applies logging.conf at startup, caching its parsed form.
+
+logging.config.fileConfig() imports logging.config and configparser and parses
+the file on every launch, which is a noticeable share of a short batch run. The
+first launch after logging.conf changes still goes through fileConfig(), and
+also stores the parsed sections as JSON in __pycache__/ next to the file, keyed
+on its modification time and size. Later launches rebuild the same formatters,
+handlers and loggers straight from that JSON. Handler 'args' and 'kwargs' are
+evaluated exactly as fileConfig() evaluates them.
+
+Configs using features outside that subset (custom formatter classes, filters,
+handler 'target's) are never cached and always use fileConfig().
+"""
+import importlib
+import json
+import logging
+import os
+from typing import Optional
+
+CACHE_VERSION = 1
+PIPELINE_SECTION = "app_logging"
+
+
+def cache_path_for(config_path: str) -> str:
+    """Returns where the parsed form of 'config_path' is cached."""
+    directory, filename = os.path.split(os.path.abspath(config_path))
+    return os.path.join(directory, "__pycache__", f"{filename}.json")
+
+
+def configure_logging(config_path: str = "logging.conf", cache_path: Optional[str] = None) -> Optional[dict[str, str]]:
+    """
+    Configures logging from 'config_path', from the cache when it is current.
+    Returns the raw [app_logging] settings (possibly empty), or None when
+    'config_path' does not exist and nothing was configured.
+    """
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    key = [CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+    cache_path = cache_path or cache_path_for(config_path)
+
+    cached = _load_cache(cache_path)
+    if cached is not None and cached.get("key") == key:
+        apply_spec(cached["spec"])
+        return cached["pipeline"]
+
+    import logging.config  # pylint: disable=import-outside-toplevel
+    logging.config.fileConfig(config_path, disable_existing_loggers=False)
+    spec, pipeline = parse_config(config_path)
+    if spec is not None:
+        _save_cache(cache_path, {"key": key, "spec": spec, "pipeline": pipeline})
+    return pipeline
+
+
+def parse_config(config_path: str) -> tuple[Optional[dict], dict[str, str]]:
+    """
+    Reads a fileConfig-format file into a JSON-serializable spec, plus its raw
+    [app_logging] settings. The spec is None if the file uses features the
+    cached path does not reproduce.
+    """
+    import configparser  # pylint: disable=import-outside-toplevel
+    parser = configparser.ConfigParser()
+    parser.read(config_path)
+    pipeline = dict(parser.items(PIPELINE_SECTION)) if parser.has_section(PIPELINE_SECTION) else {}
+
+    def keys(section: str) -> list[str]:
+        value = parser.get(section, "keys", fallback="")
+        return [key.strip() for key in value.split(",") if key.strip()]
+
+    spec: dict = {"formatters": {}, "handlers": {}, "loggers": {}}
+    for name in keys("formatters"):
+        section = parser[f"formatter_{name}"]
+        if "class" in section or "validate" in section or "defaults" in section:
+            return None, pipeline
+        spec["formatters"][name] = {
+            # Read raw, like fileConfig(): '%(asctime)s' is not an interpolation
+            "format": section.get("format", raw=True),
+            "datefmt": section.get("datefmt", raw=True),
+            "style": section.get("style", "%", raw=True),
+        }
+    for name in keys("handlers"):
+        section = parser[f"handler_{name}"]
+        if "target" in section:
+            return None, pipeline
+        spec["handlers"][name] = {
+            "class": section["class"],
+            "level": section.get("level", ""),
+            "formatter": section.get("formatter", ""),
+            "args": section.get("args", "()"),
+            "kwargs": section.get("kwargs", "{}"),
+        }
+    for name in keys("loggers"):
+        section = parser["logger_root" if name == "root" else f"logger_{name}"]
+        spec["loggers"][name] = {
+            "qualname": "" if name == "root" else section["qualname"],
+            "level": section.get("level", ""),
+            "handlers": [handler.strip() for handler in section.get("handlers", "").split(",") if handler.strip()],
+            "propagate": section.getint("propagate", fallback=1),
+        }
+    return spec, pipeline
+
+
+def apply_spec(spec: dict) -> None:
+    """Builds the formatters, handlers and loggers described by a parsed spec, as fileConfig() would."""
+    formatters = {
+        name: logging.Formatter(entry["format"], entry["datefmt"], entry["style"])
+        for name, entry in spec["formatters"].items()
+    }
+    handlers = {}
+    for name, entry in spec["handlers"].items():
+        handler_class = _resolve(entry["class"])
+        # Same evaluation context as logging.config.fileConfig()
+        args = eval(entry["args"], vars(logging))  # pylint: disable=eval-used
+        kwargs = eval(entry["kwargs"], vars(logging))  # pylint: disable=eval-used
+        handler = handler_class(*args, **kwargs)
+        handler.name = name
+        if entry["level"]:
+            handler.setLevel(entry["level"])
+        if entry["formatter"]:
+            handler.setFormatter(formatters[entry["formatter"]])
+        handlers[name] = handler
+
+    for name, entry in spec["loggers"].items():
+        logger = logging.getLogger() if name == "root" else logging.getLogger(entry["qualname"])
+        for existing in list(logger.handlers):
+            # Closed as fileConfig() closes the handlers it replaces: a FileHandler keeps its file open
+            logger.removeHandler(existing)
+            existing.close()
+        if entry["level"]:
+            logger.setLevel(entry["level"])
+        for handler_name in entry["handlers"]:
+            logger.addHandler(handlers[handler_name])
+        if name != "root":
+            logger.propagate = bool(entry["propagate"])
+            logger.disabled = False
+
+
+def _resolve(class_name: str):
+    """Resolves a handler class the way fileConfig() does: a name in 'logging' or a dotted path."""
+    if "." not in class_name:
+        return getattr(logging, class_name)
+    module_name, _, attribute = class_name.rpartition(".")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _load_cache(cache_path: str) -> Optional[dict]:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as stream:
+            return json.load(stream)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache(cache_path: str, data: dict) -> None:
+    """Writes the cache atomically; a read-only location just means no cache."""
+    import tempfile  # pylint: disable=import-outside-toplevel
+    try:
+        directory = os.path.dirname(cache_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as stream:
+            json.dump(data, stream)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def pipeline_requested(settings: dict[str, str], environ) -> bool:
+    """
+    True when the [app_logging] settings or LOG_* overrides turn on the queue
+    or sampling, i.e. when app.log_pipeline has to be loaded at all.
+    """
+    if any(environ.get(name) for name in ("LOG_QUEUE", "LOG_QUEUE_SIZE", "LOG_SAMPLE_EVERY", "LOG_RATE_LIMIT", "LOG_SUMMARY_INTERVAL")):
+        return True
+    try:
+        return (
+            settings.get("queue", "false").strip().lower() in ("1", "true", "yes", "on")
+            or int(settings.get("sample_every", "1")) > 1
+            or float(settings.get("rate_limit", "0")) > 0
+        )
+    except ValueError:
+        # Let load_pipeline_config() report the bad value
+        return True
@@ -0,0 +1,252 @@
+"""
+log_pipeline.py: Optional logging pipeline for high-volume sessions.
+
+Two independent pieces, both configured by configure_log_pipeline():
+- Queue mode: the root handlers are moved behind a bounded queue and served
+  by a background QueueListener thread, so the command loop never waits on
+  disk writes or stdout flushes.
+- Sampling: per-command success messages (records carrying a 'command'
+  attribute) are thinned out per command and/or rate limited, and replaced by
+  periodic summaries such as "add executed 1.2M times". Warnings and errors
+  are never sampled and never dropped.
+
+Settings come from the [app_logging] section of logging.conf and can be
+overridden with LOG_QUEUE, LOG_QUEUE_SIZE, LOG_SAMPLE_EVERY, LOG_RATE_LIMIT
+and LOG_SUMMARY_INTERVAL.
+"""
+import atexit
+import configparser
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Mapping, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+CONFIG_SECTION = "app_logging"
+
+# Loggers that emit the per-command success messages to be sampled
+SUCCESS_LOGGERS = ("app.app", "app.server")
+
+
+class PipelineConfig(NamedTuple):
+    """Resolved logging pipeline settings."""
+    queue: bool = False
+    queue_size: int = 10_000
+    sample_every: int = 1
+    rate_limit: float = 0.0
+    summary_interval: float = 60.0
+
+
+def load_pipeline_config(config_path: Optional[str] = "logging.conf", environ: Optional[Mapping] = None) -> PipelineConfig:
+    """
+    Reads pipeline settings from the [app_logging] section of 'config_path'
+    (if present), then applies environment variable overrides.
+    """
+    environ = os.environ if environ is None else environ
+    values = {}
+    if config_path and os.path.isfile(config_path):
+        parser = configparser.ConfigParser()
+        parser.read(config_path)
+        if parser.has_section(CONFIG_SECTION):
+            values.update(parser.items(CONFIG_SECTION))
+
+    env_names = {
+        "queue": "LOG_QUEUE",
+        "queue_size": "LOG_QUEUE_SIZE",
+        "sample_every": "LOG_SAMPLE_EVERY",
+        "rate_limit": "LOG_RATE_LIMIT",
+        "summary_interval": "LOG_SUMMARY_INTERVAL",
+    }
+    for key, env_name in env_names.items():
+        if environ.get(env_name):
+            values[key] = environ[env_name]
+
+    defaults = PipelineConfig()
+    try:
+        return PipelineConfig(
+            queue=str(values.get("queue", defaults.queue)).strip().lower() in ("1", "true", "yes", "on"),
+            queue_size=int(values.get("queue_size", defaults.queue_size)),
+            sample_every=max(1, int(values.get("sample_every", defaults.sample_every))),
+            rate_limit=float(values.get("rate_limit", defaults.rate_limit)),
+            summary_interval=float(values.get("summary_interval", defaults.summary_interval)),
+        )
+    except ValueError as exc:
+        raise ValueError(f"Invalid logging pipeline setting: {exc}") from exc
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue. When the queue is full, records below
+    WARNING are dropped (and counted); warnings and errors wait for space.
+    """
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno >= logging.WARNING:
+            self.queue.put(record)
+        else:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                return
+
+        if self.dropped:
+            # Report drops once there is room again; never block for the notice itself
+            notice = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "Log queue was full; dropped %d low-priority records.", (self.dropped,), None,
+            )
+            try:
+                self.queue.put_nowait(notice)
+                self.dropped = 0
+            except queue.Full:
+                pass
+
+
+class CommandSampler(logging.Filter):
+    """
+    Samples records that carry a 'command' attribute: one in every
+    'sample_every' records is kept per command, optionally capped at
+    'rate_limit' kept records per second overall. Every 'summary_interval'
+    seconds an aggregate line per command is logged instead: from a timer
+    thread once start() has been called, so a session that goes quiet still
+    gets its last summary, otherwise when the next record comes in.
+    """
+
+    def __init__(self, sample_every: int = 1, rate_limit: float = 0.0, summary_interval: float = 60.0, clock=time.monotonic):
+        super().__init__()
+        self.sample_every = max(1, sample_every)
+        self.rate_limit = rate_limit
+        self.summary_interval = summary_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seen: dict[str, int] = {}
+        self._window_seen: dict[str, int] = {}
+        self._window_kept: dict[str, int] = {}
+        self._tokens = rate_limit
+        self._last_refill = self._window_start = clock()
+        self._stopped = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        command = getattr(record, "command", None)
+        if command is None or record.levelno >= logging.WARNING:
+            return True
+
+        with self._lock:
+            now = self._clock()
+            count = self._seen.get(command, 0) + 1
+            self._seen[command] = count
+            self._window_seen[command] = self._window_seen.get(command, 0) + 1
+
+            keep = (count - 1) % self.sample_every == 0 and self._take_token(now)
+            if keep:
+                self._window_kept[command] = self._window_kept.get(command, 0) + 1
+            summary_due = self.summary_interval > 0 and now - self._window_start >= self.summary_interval
+
+        if summary_due:
+            self.emit_summary()
+        return keep
+
+    def start(self) -> None:
+        """Starts the summary timer thread (a daemon: it never holds up exit)."""
+        if self.summary_interval > 0 and self._timer is None:
+            self._timer = threading.Thread(target=self._run_timer, name="log-summary", daemon=True)
+            self._timer.start()
+
+    def stop(self) -> None:
+        """Stops the summary timer thread; the caller emits any final summary."""
+        self._stopped.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+
+    def _run_timer(self) -> None:
+        while not self._stopped.wait(self.summary_interval):
+            self.emit_summary()
+
+    def _take_token(self, now: float) -> bool:
+        if self.rate_limit <= 0:
+            return True
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def emit_summary(self) -> None:
+        """Logs one aggregate line per command seen since the last summary."""
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._window_start
+            window_seen, self._window_seen = self._window_seen, {}
+            window_kept, self._window_kept = self._window_kept, {}
+            self._window_start = now
+
+        for command in sorted(window_seen):
+            logger.info(
+                "Command '%s' executed %s times in the last %.0fs (%s logged).",
+                command, human_count(window_seen[command]), elapsed, human_count(window_kept.get(command, 0)),
+            )
+
+
+def human_count(count: int) -> str:
+    """Formats a count compactly, e.g. 1234 -> '1.2K', 1200000 -> '1.2M'."""
+    for threshold, suffix in ((1_000_000_000, "B"), (1_000_000, "M"), (1_000, "K")):
+        if count >= threshold:
+            return f"{count / threshold:.1f}{suffix}"
+    return str(count)
+
+
+def install_queue_logging(queue_size: int, root: Optional[logging.Logger] = None) -> logging.handlers.QueueListener:
+    """
+    Moves the root logger's handlers behind a bounded queue served by a
+    background listener thread. Returns the started listener.
+    """
+    root = root or logging.getLogger()
+    handlers = list(root.handlers)
+    record_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(BoundedQueueHandler(record_queue))
+
+    listener = logging.handlers.QueueListener(record_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def configure_log_pipeline(config: PipelineConfig) -> Optional[logging.handlers.QueueListener]:
+    """
+    Applies the pipeline settings to the already-configured logging tree.
+    Returns the QueueListener when queue mode is enabled, else None.
+    Both the sampler summary and the listener are flushed at interpreter exit.
+    """
+    sampler = None
+    if config.sample_every > 1 or config.rate_limit > 0:
+        sampler = CommandSampler(config.sample_every, config.rate_limit, config.summary_interval)
+        for name in SUCCESS_LOGGERS:
+            logging.getLogger(name).addFilter(sampler)
+        sampler.start()
+
+    listener = install_queue_logging(config.queue_size) if config.queue else None
+    if sampler is not None or listener is not None:
+        atexit.register(_shutdown, sampler, listener)
+    return listener
+
+
+def _shutdown(sampler: Optional[CommandSampler], listener: Optional[logging.handlers.QueueListener]) -> None:
+    """Emits the final summary, then drains the queue so nothing is lost at exit."""
+    if sampler is not None:
+        sampler.stop()
+        sampler.emit_summary()
+    if listener is not None:
+        listener.stop()
@@ -0,0 +1,245 @@
+"""
+metrics.py: Lightweight per-command instrumentation for command dispatch.
+
+When enabled, every bound command handler is wrapped (as Dispatcher middleware)
+to record its call count, its errors by type (ValueError, ZeroDivisionError or
+unexpected) and its latency in a fixed log-scale histogram, from which p50/p95/p99
+are estimated. When disabled, no wrapper is installed and dispatch is untouched.
+
+The numbers are shown by the 'stats' command and can be dumped periodically in
+Prometheus text format with PrometheusFileExporter.
+"""
+import bisect
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from app.dispatcher import Handler, middleware
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds: 1µs * sqrt(2)^i, up to ~12s
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** (i / 2) for i in range(48))
+
+ERROR_KINDS = ("ValueError", "ZeroDivisionError", "unexpected")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is a bisect and an increment."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        # One extra bucket for samples above the last bound
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        """Adds one latency sample."""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Returns an upper-bound estimate of the q-quantile (0 < q <= 1), or 0.0 if empty."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else float("inf")
+        return float("inf")  # pragma: no cover - unreachable, the counts sum to self.count
+
+
+class CommandStats:
+    """Counters and latency histogram for one command."""
+
+    __slots__ = ("errors", "latency")
+
+    def __init__(self):
+        self.errors = dict.fromkeys(ERROR_KINDS, 0)
+        self.latency = LatencyHistogram()
+
+    @property
+    def calls(self) -> int:
+        """Number of executions, including failed ones."""
+        return self.latency.count
+
+
+class Metrics:
+    """Collects CommandStats per command name."""
+
+    def __init__(self):
+        self._stats: dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def stats_for(self, command_name: str) -> CommandStats:
+        """Returns (creating if needed) the stats record for a command."""
+        stats = self._stats.get(command_name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(command_name, CommandStats())
+        return stats
+
+    def snapshot(self) -> dict[str, CommandStats]:
+        """Returns the current stats records keyed by command name, sorted by name."""
+        with self._lock:
+            return dict(sorted(self._stats.items()))
+
+    def reset(self) -> None:
+        """Forgets all collected numbers; handlers bound afterwards start from zero."""
+        with self._lock:
+            self._stats.clear()
+            self.started = time.time()
+        # Bound handlers hold their CommandStats; make dispatchers rebind them
+        middleware.version += 1
+
+    def instrument(self, command_name: str, command_class: type, handler: Handler) -> Handler:
+        """Dispatcher middleware: wraps a handler to time it and count its errors."""
+        stats = self.stats_for(command_name)
+        record = stats.latency.record
+        errors = stats.errors
+        perf_counter = time.perf_counter
+
+        def timed(args: list[str]):
+            start = perf_counter()
+            try:
+                result = handler(args)
+            except Exception as exc:
+                record(perf_counter() - start)
+                kind = type(exc).__name__
+                errors[kind if kind in errors else "unexpected"] += 1
+                raise
+            record(perf_counter() - start)
+            return result
+        return timed
+
+    def render_text(self) -> str:
+        """Human-readable per-command summary used by the 'stats' command."""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return "No commands executed yet."
+        lines = [f"Command statistics since {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started))}:"]
+        for name, stats in snapshot.items():
+            errors = ", ".join(f"{kind}={count}" for kind, count in stats.errors.items() if count) or "none"
+            latency = stats.latency
+            lines.append(
+                f"  {name}: calls={stats.calls} errors: {errors} "
+                f"p50={format_seconds(latency.quantile(0.5))} "
+                f"p95={format_seconds(latency.quantile(0.95))} "
+                f"p99={format_seconds(latency.quantile(0.99))}"
+            )
+        return "\n".join(lines)
+
+    def render_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP calculator_command_calls_total Commands executed, including failed ones.",
+            "# TYPE calculator_command_calls_total counter",
+        ]
+        lines += [f'calculator_command_calls_total{{command="{name}"}} {stats.calls}' for name, stats in snapshot.items()]
+        lines += [
+            "# HELP calculator_command_errors_total Failed commands by error type.",
+            "# TYPE calculator_command_errors_total counter",
+        ]
+        for name, stats in snapshot.items():
+            lines += [
+                f'calculator_command_errors_total{{command="{name}",type="{kind}"}} {count}'
+                for kind, count in stats.errors.items()
+            ]
+        lines += [
+            "# HELP calculator_command_latency_seconds Command execution latency.",
+            "# TYPE calculator_command_latency_seconds histogram",
+        ]
+        for name, stats in snapshot.items():
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, stats.latency.counts):
+                cumulative += bucket_count
+                lines.append(f'calculator_command_latency_seconds_bucket{{command="{name}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'calculator_command_latency_seconds_bucket{{command="{name}",le="+Inf"}} {stats.latency.count}')
+            lines.append(f'calculator_command_latency_seconds_sum{{command="{name}"}} {stats.latency.total:.9f}')
+            lines.append(f'calculator_command_latency_seconds_count{{command="{name}"}} {stats.latency.count}')
+        return "\n".join(lines) + "\n"
+
+
+def format_seconds(seconds: float) -> str:
+    """Formats a latency with a readable unit, e.g. 0.0000012 -> '1.2µs'."""
+    if seconds == float("inf"):
+        return "inf"
+    for scale, unit in ((1.0, "s"), (1e-3, "ms"), (1e-6, "µs")):
+        if seconds >= scale:
+            return f"{seconds / scale:.1f}{unit}"
+    return f"{seconds * 1e9:.0f}ns"
+
+
+class PrometheusFileExporter:
+    """Background thread that rewrites a Prometheus text file every 'interval' seconds."""
+
+    def __init__(self, metrics: Metrics, path: str, interval: float = 15.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        """Writes the current metrics atomically, so scrapers never see a partial file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.metrics.render_prometheus())
+        os.replace(tmp_path, self.path)
+
+    def start(self) -> None:
+        """Starts the periodic dump thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the thread and writes one final dump."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Could not write metrics file %s", self.path)
+
+
+_active: Optional[Metrics] = None
+
+
+def enable() -> Metrics:
+    """Turns instrumentation on process-wide and returns the active Metrics."""
+    global _active  # pylint: disable=global-statement
+    if _active is None:
+        _active = Metrics()
+        middleware.register(_active.instrument, order=10)
+    return _active
+
+
+def disable() -> None:
+    """Turns instrumentation off; handlers are rebound without any wrapper."""
+    global _active  # pylint: disable=global-statement
+    if _active is not None:
+        middleware.unregister(_active.instrument)
+        _active = None
+
+
+def active() -> Optional[Metrics]:
+    """Returns the active Metrics, or None when instrumentation is disabled."""
+    return _active
@@ -0,0 +1,243 @@
+"""
+numeric.py: Selectable number types for the arithmetic commands.
+
+    float     IEEE doubles (the default): fastest, binary rounding ("0.1 + 0.2 = 0.30000000000000004")
+    decimal   decimal.Decimal under a configurable context (precision, rounding):
+              exact decimal input, results rounded to 'precision' significant digits
+    fraction  fractions.Fraction: exact rationals, operands such as "1/3" are accepted
+
+The process-wide backend is chosen by NUMERIC_BACKEND (with DECIMAL_PRECISION
+and DECIMAL_ROUNDING) in main.py. The 'backend' command switches the current
+session only (the REPL, or one server connection; see app.session), so one
+client cannot change another's arithmetic; outside a session it switches the
+process-wide backend. The built-in arithmetic commands parse and compute
+through the active backend (binary_execute()); so do expressions, pipelines,
+variables and the aggregates (sum, mean, ...; see app.reducers). Vector
+operands and the column paths (execute_batch, --binary) stay on float64.
+
+The float backend keeps the fast path: both operands are parsed inline with
+float(), which is also the validation, and no context is entered. The other
+backends parse with their own constructor and run the computation inside
+their context, so precision and rounding apply to every operation. The decimal
+and fractions modules are only imported when their backend is selected.
+"""
+# pylint: disable=import-outside-toplevel
+from typing import Callable, Optional
+
+from app import session, vectorized
+from app.results import CommandResult
+
+DEFAULT_BACKEND = "float"
+DEFAULT_PRECISION = 28
+DEFAULT_ROUNDING = "ROUND_HALF_EVEN"
+# The decimal module's rounding constants (they are these strings)
+ROUNDING_MODES = (
+    "ROUND_CEILING", "ROUND_DOWN", "ROUND_FLOOR", "ROUND_HALF_DOWN",
+    "ROUND_HALF_EVEN", "ROUND_HALF_UP", "ROUND_UP", "ROUND_05UP",
+)
+
+
+class FloatBackend:
+    """IEEE doubles; parse() is float()."""
+
+    name = "float"
+    parse = staticmethod(float)
+    convert = staticmethod(float)
+
+    def run(self, function: Callable, *args):
+        """Calls 'function'; floats need no context."""
+        return function(*args)
+
+    def describe(self) -> str:
+        return self.name
+
+    def spec(self) -> tuple:
+        """Arguments for configure() that recreate this backend (e.g. in worker processes)."""
+        return (self.name,)
+
+
+class DecimalBackend:
+    """decimal.Decimal operands; every operation runs under 'context'."""
+
+    name = "decimal"
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, rounding: str = DEFAULT_ROUNDING):
+        import decimal
+
+        if precision < 1:
+            raise ValueError("Decimal precision must be at least 1.")
+        rounding = rounding.upper()
+        if not rounding.startswith("ROUND_"):
+            rounding = f"ROUND_{rounding}"
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"Unknown rounding mode '{rounding}'. Expected one of: {', '.join(ROUNDING_MODES)}.")
+        self._decimal = decimal
+        self.context = decimal.Context(
+            prec=precision,
+            rounding=rounding,
+            traps=[decimal.InvalidOperation, decimal.DivisionByZero, decimal.Overflow],
+        )
+
+    def parse(self, token: str):
+        """Exact conversion to Decimal (the context applies to results, not to typed operands)."""
+        try:
+            return self._decimal.Decimal(token)
+        except self._decimal.InvalidOperation:
+            raise ValueError(f"could not convert string to Decimal: '{token}'") from None
+
+    def convert(self, value):
+        """
+        Converts a number given by a Python caller: floats by their shortest repr
+        (0.1 becomes Decimal('0.1'), not its binary expansion), strings by parse().
+        """
+        if isinstance(value, self._decimal.Decimal):
+            return value
+        if isinstance(value, (float, str)):
+            return self.parse(repr(value) if isinstance(value, float) else value)
+        return self._decimal.Decimal(value)
+
+    def run(self, function: Callable, *args):
+        """
+        Calls 'function' with this backend's context active. Trapped conditions
+        other than division by zero (overflow, invalid operations such as
+        Infinity - Infinity) are raised as ValueError.
+        """
+        with self._decimal.localcontext(self.context):
+            try:
+                return function(*args)
+            except ZeroDivisionError:
+                raise
+            except self._decimal.DecimalException as exc:
+                raise ValueError(f"Calculation failed under the decimal context ({type(exc).__name__}).") from None
+
+    def describe(self) -> str:
+        return f"decimal (precision {self.context.prec}, {self.context.rounding})"
+
+    def spec(self) -> tuple:
+        return (self.name, self.context.prec, self.context.rounding)
+
+
+class FractionBackend:
+    """fractions.Fraction operands: exact rational arithmetic."""
+
+    name = "fraction"
+
+    def __init__(self):
+        from fractions import Fraction
+
+        self._fraction = Fraction
+
+    def parse(self, token: str):
+        try:
+            return self._fraction(token)
+        except ZeroDivisionError:
+            raise ValueError(f"invalid fraction: '{token}'") from None
+
+    def convert(self, value):
+        """Like DecimalBackend.convert(): floats by their shortest repr, strings by parse()."""
+        if isinstance(value, (float, str)):
+            return self.parse(repr(value) if isinstance(value, float) else value)
+        return self._fraction(value)
+
+    def run(self, function: Callable, *args):
+        return function(*args)
+
+    def describe(self) -> str:
+        return self.name
+
+    def spec(self) -> tuple:
+        return (self.name,)
+
+
+BACKENDS = {backend.name: backend for backend in (FloatBackend, DecimalBackend, FractionBackend)}
+NAMES = tuple(BACKENDS)
+
+FLOAT = FloatBackend()
+# Process-wide; sessions that chose a backend of their own use that instead
+_active = FLOAT
+
+
+def create(name: str = DEFAULT_BACKEND, precision: Optional[int] = None, rounding: Optional[str] = None):
+    """
+    Returns a backend by name. 'precision' and 'rounding' apply to the decimal
+    backend only. Raises ValueError for unknown names and bad decimal settings.
+    """
+    backend_class = BACKENDS.get(name.lower())
+    if backend_class is None:
+        raise ValueError(f"Unknown numeric backend '{name}'. Expected one of: {', '.join(NAMES)}.")
+    if backend_class is DecimalBackend:
+        return DecimalBackend(DEFAULT_PRECISION if precision is None else precision, rounding or DEFAULT_ROUNDING)
+    if precision is not None or rounding is not None:
+        raise ValueError("Precision and rounding only apply to the decimal backend.")
+    return FLOAT if backend_class is FloatBackend else backend_class()
+
+
+def configure(name: str = DEFAULT_BACKEND, precision: Optional[int] = None, rounding: Optional[str] = None):
+    """Makes a backend (see create()) active process-wide and returns it."""
+    global _active  # pylint: disable=global-statement
+    _active = create(name, precision, rounding)
+    return _active
+
+
+def active():
+    """Returns the current session's backend if it chose one, else the process-wide one."""
+    current = session.current()
+    if current is None or current.backend is None:
+        return _active
+    return current.backend
+
+
+def parse(token: str):
+    """Parses one operand with the active backend. Raises ValueError if it is not a number."""
+    return active().parse(token)
+
+
+def run(function: Callable, *args):
+    """Calls 'function' inside the active backend's context (see DecimalBackend)."""
+    return active().run(function, *args)
+
+
+def binary_execute(command_name: str, symbol: str) -> Callable:
+    """
+    Builds the execute() method of a two-operand arithmetic command: it parses
+    both arguments with the active backend, applies the command's compute() and
+    returns "x <symbol> y = result". Vector operands ('1,2,3', '[1 2 3]') go to
+    vectorized.execute_vector(). The method raises ValueError for a wrong
+    argument count or non-numeric input, and whatever compute() raises
+    (ZeroDivisionError for divide).
+    """
+    template = f"%s {symbol} %s = %s"
+
+    def execute(self, args: list[str]) -> CommandResult:
+        if len(args) == 2:
+            backend = active()
+            if backend is FLOAT:
+                # Fast path: float() is both the parse and the validation
+                try:
+                    x = float(args[0])
+                    y = float(args[1])
+                except ValueError:
+                    pass
+                else:
+                    return CommandResult(command_name, (x, y), self.compute(x, y), template)
+            else:
+                try:
+                    x = backend.parse(args[0])
+                    y = backend.parse(args[1])
+                except ValueError:
+                    pass
+                else:
+                    return CommandResult(command_name, (x, y), backend.run(self.compute, x, y), template)
+
+        if vectorized.is_vector_args(args):
+            return vectorized.execute_vector(command_name, symbol, args)
+        if len(args) != 2:
+            raise ValueError(f"Invalid number of arguments for {command_name} command. Usage: {command_name} <num1> <num2>.")
+        raise ValueError(f"Invalid numeric input for {command_name} command.")
+
+    execute.__doc__ = (
+        f"Expects exactly two numeric arguments, parsed by the active numeric backend, or two\n"
+        f"operands of which at least one is a vector literal. Returns a CommandResult,\n"
+        f"formatted as \"x {symbol} y = result\" when written."
+    )
+    return execute
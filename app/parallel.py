@@ -0,0 +1,223 @@
+"""
+parallel.py: Defines the ParallelRunner, which spreads a large command file over
+several worker processes.
+
+The file is cut into byte ranges that end on line boundaries. Each range is
+executed by a worker in a ProcessPoolExecutor; every worker builds its own
+PluginManager and BatchRunner once, in the pool initializer. Chunk results are
+merged back in file order: only a bounded window of chunks is in flight at a
+time, so the reorder buffer (and therefore memory) stays constant however large
+the input is. Output, error messages, line numbers and the error policies are
+the same as a sequential BatchRunner run.
+"""
+import logging
+import os
+import re
+import sys
+from collections import deque
+from typing import Iterator, NamedTuple, Optional, TextIO
+
+from app.batch import (
+    BatchRunner,
+    BatchStats,
+    ERROR_POLICIES,
+    ON_ERROR_REPORT,
+    ON_ERROR_SKIP,
+    ON_ERROR_STOP,
+    iter_command_lines,
+)
+from app.commands.plugin_manager import PluginManager
+from app.encoders import DEFAULT_FORMAT, get_encoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB of input per task
+
+# An 'exit' line ends the run, exactly as in the REPL and in sequential batch mode
+EXIT_LINE = re.compile(rb"^[ \t\r\f\v]*exit[ \t\r\f\v]*$", re.MULTILINE | re.IGNORECASE)
+
+
+class ChunkResult(NamedTuple):
+    """What a worker sends back for one byte range."""
+    line_count: int
+    output: str
+    # (line number within the chunk, length of 'output' written before it, message);
+    # an offset rather than an output count, since one output may span several lines
+    errors: list[tuple[int, int, str]]
+    processed: int
+    succeeded: int
+    failed: int
+    stopped: bool
+    exited: bool
+
+
+def split_ranges(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[int, int]]:
+    """
+    Yields (start, end) byte offsets covering 'path'. Every range but the last
+    ends just after a newline, so no line is ever split between two chunks.
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1 byte.")
+    size = os.path.getsize(path)
+    with open(path, "rb") as stream:
+        start = 0
+        while start < size:
+            end = start + chunk_size
+            if end < size:
+                # Extend to the end of the line containing the byte before 'end'
+                stream.seek(end - 1)
+                stream.readline()
+                end = stream.tell()
+            else:
+                end = size
+            yield start, end
+            start = end
+
+
+_worker_runner: Optional[BatchRunner] = None
+
+
+def _init_worker(on_error: str, output_format: str = DEFAULT_FORMAT, backend: Optional[tuple] = None) -> None:
+    """
+    Pool initializer: gives this worker process its own plugin registry and
+    runner, and the parent's numeric backend ('backend' is its spec()).
+    """
+    global _worker_runner  # pylint: disable=global-statement
+    if backend is not None:
+        from app import numeric  # pylint: disable=import-outside-toplevel
+        numeric.configure(*backend)
+    _worker_runner = BatchRunner(PluginManager(), on_error=on_error, encoder=get_encoder(output_format))
+
+
+def _backend_spec() -> Optional[tuple]:
+    """The parent's numeric backend, for _init_worker(); None while app.numeric is not even loaded (float)."""
+    numeric = sys.modules.get("app.numeric")
+    return numeric.active().spec() if numeric is not None else None
+
+
+def run_chunk(path: str, start: int, end: int, runner: Optional[BatchRunner] = None) -> ChunkResult:
+    """Executes the command lines in bytes [start, end) of 'path' and returns their results."""
+    runner = runner or _worker_runner
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        data = stream.read(end - start)
+
+    exited = False
+    match = EXIT_LINE.search(data)
+    if match is not None:
+        data = data[:match.start()]
+        exited = True
+    line_count = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+
+    outputs: list[str] = []
+    written = 0
+    errors: list[tuple[int, int, str]] = []
+    processed = succeeded = failed = 0
+    stopped = False
+    lines = iter_command_lines(data.decode("utf-8").split("\n"))
+    for lineno, output, error in runner.execute_lines(lines):
+        processed += 1
+        if error is not None:
+            failed += 1
+            if runner.on_error == ON_ERROR_SKIP:
+                continue
+            errors.append((lineno, written, error))
+            if runner.on_error == ON_ERROR_STOP:
+                stopped = True
+                break
+            continue
+        succeeded += 1
+        if output is not None:
+            # Encoded in the worker, so only text crosses the process boundary
+            encoded = runner.encoder.encode(output)
+            outputs.append(encoded)
+            written += len(encoded) + 1
+
+    text = "\n".join(outputs) + "\n" if outputs else ""
+    return ChunkResult(line_count, text, errors, processed, succeeded, failed, stopped, exited)
+
+
+class ParallelRunner:
+    """
+    Runs a command file on 'workers' processes and writes the results to 'out'
+    in the original line order.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        on_error: str = ON_ERROR_REPORT,
+        max_pending: Optional[int] = None,
+        output_format: str = DEFAULT_FORMAT,
+    ):
+        if on_error not in ERROR_POLICIES:
+            raise ValueError(f"Unknown error policy '{on_error}'. Expected one of: {', '.join(ERROR_POLICIES)}.")
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers < 1:
+            raise ValueError("Worker count must be at least 1.")
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1 byte.")
+        self.chunk_size = chunk_size
+        self.on_error = on_error
+        self.encoder = get_encoder(output_format)
+        # Chunks submitted but not yet written; bounds the reorder buffer
+        self.max_pending = max_pending or 2 * self.workers
+
+    def run(self, path: str, out: TextIO, err: Optional[TextIO] = None) -> BatchStats:
+        """Executes every command line in 'path' and returns the combined statistics."""
+        if path == "-":
+            raise ValueError("Parallel mode needs a seekable input file, not stdin.")
+        # Imported here so that loading this module (e.g. for its defaults) stays cheap
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+
+        ranges = split_ranges(path, self.chunk_size)
+        window: deque = deque()
+        line_offset = processed = succeeded = failed = 0
+        stopped = False
+
+        if self.encoder.header is not None:
+            out.write(self.encoder.header + "\n")
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.on_error, self.encoder.name, _backend_spec())) as executor:
+            for start, end in ranges:
+                window.append(executor.submit(run_chunk, path, start, end))
+                if len(window) >= self.max_pending:
+                    break
+
+            while window:
+                chunk = window.popleft().result()
+                self._write_chunk(chunk, line_offset, out, err)
+                line_offset += chunk.line_count
+                processed += chunk.processed
+                succeeded += chunk.succeeded
+                failed += chunk.failed
+                if chunk.stopped or chunk.exited:
+                    stopped = chunk.stopped
+                    for future in window:
+                        future.cancel()
+                    break
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    window.append(executor.submit(run_chunk, path, *next_range))
+
+        out.flush()
+        stats = BatchStats(processed, succeeded, failed, stopped)
+        logger.info(
+            "Parallel batch run finished on %d workers: %d processed, %d succeeded, %d failed%s.",
+            self.workers, processed, succeeded, failed, " (stopped on first error)" if stopped else "",
+        )
+        return stats
+
+    @staticmethod
+    def _write_chunk(chunk: ChunkResult, line_offset: int, out: TextIO, err: Optional[TextIO]) -> None:
+        """Writes one chunk's results, interleaving its errors where they occurred."""
+        if not chunk.errors or err is None:
+            out.write(chunk.output)
+            return
+        written = 0
+        for lineno, offset, message in chunk.errors:
+            if offset > written:
+                out.write(chunk.output[written:offset])
+                written = offset
+            err.write(f"line {line_offset + lineno}: {message}\n")
+        out.write(chunk.output[written:])
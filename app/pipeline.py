@@ -0,0 +1,161 @@
+"""
+pipeline.py: The '|' operator, which chains commands on raw numbers.
+
+    multiply 3 4 | add 1 | divide _ 2      # (3 * 4 + 1) / 2 = 6.5
+
+Each stage after the first receives the previous stage's result: in place of
+every '_' operand, or as its first operand when it has no '_'. A line is
+compiled once into a plan of bound compute() calls with its constant operands
+already parsed, and plans are cached per line, so running a pipeline is one
+pass over the stages that hands numbers from one to the next; only the final
+result is formatted (by whoever writes it). Constants are parsed by the
+active numeric backend (app.numeric), and switching backends drops the plans.
+
+A failing stage raises StageError, a ValueError naming the stage, e.g.
+"Stage 3 (divide): Cannot divide by zero.", so every front end reports it
+like any other command error. Stages use the plugins' numeric form, as
+expressions do; commands without one cannot be piped.
+"""
+from typing import Callable, Optional
+
+from app import numeric
+from app.commands.plugin_manager import PluginManager
+from app.result_cache import ResultCache
+
+PIPE = "|"
+PLACEHOLDER = "_"
+
+Plan = Callable[[], float]
+# Runs one stage on the previous stage's result
+Stage = Callable[[Optional[float]], float]
+
+
+class StageError(ValueError):
+    """Raised when a pipeline stage cannot be compiled or fails while running."""
+
+    def __init__(self, index: int, command_name: str, detail: str):
+        super().__init__(f"Stage {index} ({command_name}): {detail}")
+        self.index = index
+        self.command_name = command_name
+
+
+def split_stages(source: str) -> list[list[str]]:
+    """Splits a pipeline line into the tokens of each stage. Raises ValueError for empty stages."""
+    stages = [segment.split() for segment in source.split(PIPE)]
+    for index, tokens in enumerate(stages, start=1):
+        if not tokens:
+            raise ValueError(f"Stage {index} of the pipeline is empty. Usage: command args | command args ...")
+    return stages
+
+
+class PipelineEngine:
+    """Compiles pipeline lines into cached plans over the registered command plugins."""
+
+    def __init__(self, plugin_manager: Optional[PluginManager] = None, plan_cache_size: int = 512):
+        self.plugin_manager = plugin_manager or PluginManager.shared()
+        self._plans = ResultCache(maxsize=plan_cache_size)
+        self._generation = self.plugin_manager.generation
+
+    def compile(self, source: str) -> Plan:
+        """
+        Returns the plan for 'source' under the active numeric backend, compiling
+        it on first use (one plan per backend, as plans hold parsed constants).
+        """
+        generation = self.plugin_manager.generation
+        if self._generation != generation:
+            # Plugins changed (hot reload): cached plans may reference stale code
+            self._plans.clear()
+            self._generation = generation
+        key = (numeric.active(), source)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._build(split_stages(source))
+            self._plans.put(key, plan)
+        return plan
+
+    def evaluate(self, source: str) -> float:
+        """Runs the pipeline in 'source' and returns the final stage's result."""
+        plan = self.compile(source)
+        return plan() if numeric.active() is numeric.FLOAT else numeric.run(plan)
+
+    def _build(self, stages: list[list[str]]) -> Plan:
+        compiled = [self._stage(index, tokens) for index, tokens in enumerate(stages, start=1)]
+        if len(compiled) == 2:
+            first, second = compiled
+
+            def pair() -> float:
+                return second(first(None))
+            return pair
+
+        def plan() -> float:
+            value = None
+            for stage in compiled:
+                value = stage(value)
+            return value
+        return plan
+
+    def _stage(self, index: int, tokens: list[str]) -> Stage:
+        """Compiles one stage into a function of the previous result."""
+        name = tokens[0].lower()
+        command_class = self.plugin_manager.get_command(name)
+        if command_class is None:
+            raise StageError(index, tokens[0], f"Unknown command '{tokens[0]}'.")
+        name = self.plugin_manager.canonical_name(name) or name
+        instance = command_class()
+        if not hasattr(instance, "supports_compute") or not instance.supports_compute():
+            raise StageError(index, name, f"The '{name}' command cannot be used in a pipeline.")
+
+        operands: list[Optional[float]] = []
+        for token in tokens[1:]:
+            if token == PLACEHOLDER:
+                operands.append(None)
+                continue
+            try:
+                operands.append(numeric.parse(token))
+            except ValueError:
+                raise StageError(index, name, f"Invalid numeric input '{token}'.") from None
+        slots = [position for position, operand in enumerate(operands) if operand is None]
+        if index == 1 and slots:
+            raise StageError(index, name, f"'{PLACEHOLDER}' needs a previous stage to take its value from.")
+        if index > 1 and not slots:
+            # No placeholder: the previous result is the first operand
+            operands.insert(0, None)
+            slots = [0]
+        return _bind(index, name, instance.compute, operands, slots)
+
+
+def _bind(index: int, name: str, compute, operands: list[Optional[float]], slots: list[int]) -> Stage:
+    """Closes over a stage's parsed operands; the common shapes get a direct call."""
+    if not slots:
+        constants = tuple(operands)
+
+        def call(_previous: Optional[float]) -> float:
+            return compute(*constants)
+    elif len(operands) == 2 and slots == [0]:
+        right = operands[1]
+
+        def call(previous: Optional[float]) -> float:
+            return compute(previous, right)
+    elif len(operands) == 2 and slots == [1]:
+        left = operands[0]
+
+        def call(previous: Optional[float]) -> float:
+            return compute(left, previous)
+    else:
+        def call(previous: Optional[float]) -> float:
+            values = list(operands)
+            for slot in slots:
+                values[slot] = previous
+            return compute(*values)
+
+    def stage(previous: Optional[float]) -> float:
+        try:
+            return call(previous)
+        except ZeroDivisionError as exc:
+            raise StageError(index, name, "Cannot divide by zero.") from exc
+        except TypeError:
+            # Wrong operand count for the command's compute()
+            raise StageError(index, name, f"Invalid number of arguments for {name} command.") from None
+        except (ValueError, ArithmeticError) as exc:
+            raise StageError(index, name, str(exc)) from exc
+    return stage
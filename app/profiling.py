@@ -0,0 +1,206 @@
+"""
+profiling.py: On-demand CPU (cProfile) and memory (tracemalloc) profiling of
+command dispatch, switchable inside a running session.
+
+'profile on' installs Dispatcher middleware that runs every command call under
+a per-command cProfile.Profile, so the numbers aggregate over all calls of a
+command. 'profile off' removes it and writes one pstats file per command to the
+output directory (load them with pstats or snakeviz).
+
+'memprofile on' starts tracemalloc and records, per command, the net memory
+allocated and the peak reached during its calls. 'memprofile off' writes a
+tracemalloc snapshot file and stops tracing.
+
+Nothing is wrapped and neither cProfile nor tracemalloc is imported while the
+profilers are off, so they cost nothing until switched on. PROFILE_ENABLED,
+MEMPROFILE_ENABLED and PROFILE_DIR turn them on from main.py instead. Profilers
+still on when the process exits are stopped and written out then.
+"""
+# pylint: disable=import-outside-toplevel
+import atexit
+import os
+import time
+from typing import Optional
+
+from app.dispatcher import Handler, middleware
+
+DEFAULT_DIRECTORY = "profiles"
+
+# The switches themselves are never measured (they start and stop the profilers)
+NOT_PROFILED = ("profile", "memprofile")
+
+_directory = DEFAULT_DIRECTORY
+
+
+def set_directory(directory: str) -> None:
+    """Sets where pstats and snapshot files are written (created on first write)."""
+    global _directory  # pylint: disable=global-statement
+    _directory = directory
+
+
+def output_path(directory: str, stem: str, suffix: str) -> str:
+    """Returns a new '<stem>-<timestamp><suffix>' path in 'directory', never an existing file."""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}")
+    path = f"{base}{suffix}"
+    counter = 1
+    while os.path.exists(path):
+        counter += 1
+        path = f"{base}-{counter}{suffix}"
+    return path
+
+
+class CpuProfiler:
+    """Per-command cProfile profiles, collected through Dispatcher middleware."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.profiles: dict = {}
+        self.calls: dict[str, int] = {}
+        # cProfile cannot nest; commands that dispatch others (e.g. replay) profile as one call
+        self._running = False
+
+    def instrument(self, command_name: str, command_class: type, handler: Handler) -> Handler:
+        """Dispatcher middleware: runs the handler under the command's profile."""
+        if command_name in NOT_PROFILED:
+            return handler
+        import cProfile
+
+        profile = self.profiles.get(command_name)
+        if profile is None:
+            profile = self.profiles[command_name] = cProfile.Profile()
+        calls = self.calls
+        calls.setdefault(command_name, 0)
+
+        def profiled(args: list[str]):
+            if self._running:
+                return handler(args)
+            self._running = True
+            calls[command_name] += 1
+            profile.enable()
+            try:
+                return handler(args)
+            finally:
+                profile.disable()
+                self._running = False
+        return profiled
+
+    def dump(self) -> list[tuple[str, int, float, str]]:
+        """Writes a pstats file per called command. Returns (command, calls, seconds, path) rows."""
+        import pstats
+
+        rows = []
+        for command_name, profile in sorted(self.profiles.items()):
+            if not self.calls.get(command_name):
+                continue
+            path = output_path(self.directory, f"cpu-{command_name}", ".pstats")
+            profile.dump_stats(path)
+            rows.append((command_name, self.calls[command_name], pstats.Stats(profile).total_tt, path))
+        return rows
+
+
+class MemoryProfiler:
+    """Per-command allocation aggregates from tracemalloc, plus a final snapshot."""
+
+    def __init__(self, directory: str, frames: int = 1):
+        import tracemalloc
+
+        self.directory = directory
+        # command -> [calls, net bytes allocated, highest peak above the starting level]
+        self.stats: dict[str, list[int]] = {}
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(frames)
+
+    def instrument(self, command_name: str, command_class: type, handler: Handler) -> Handler:
+        """Dispatcher middleware: measures the memory a command call allocates."""
+        if command_name in NOT_PROFILED:
+            return handler
+        import tracemalloc
+
+        entry = self.stats.setdefault(command_name, [0, 0, 0])
+        get_traced_memory = tracemalloc.get_traced_memory
+        reset_peak = tracemalloc.reset_peak
+
+        def measured(args: list[str]):
+            before = get_traced_memory()[0]
+            reset_peak()
+            try:
+                return handler(args)
+            finally:
+                current, peak = get_traced_memory()
+                entry[0] += 1
+                entry[1] += current - before
+                entry[2] = max(entry[2], peak - before)
+        return measured
+
+    def dump(self) -> str:
+        """Writes a tracemalloc snapshot file, stops tracing if we started it, and returns the path."""
+        import tracemalloc
+
+        path = output_path(self.directory, "memory", ".snapshot")
+        tracemalloc.take_snapshot().dump(path)
+        if self._started:
+            tracemalloc.stop()
+        return path
+
+
+_cpu: Optional[CpuProfiler] = None
+_memory: Optional[MemoryProfiler] = None
+
+
+def start_cpu(directory: Optional[str] = None) -> CpuProfiler:
+    """Turns CPU profiling on (restarting it if it was on) and returns the profiler."""
+    global _cpu  # pylint: disable=global-statement
+    stop_cpu()
+    _cpu = CpuProfiler(directory or _directory)
+    # Innermost (after metrics at 10 and the cache at 20): profiles the command itself
+    middleware.register(_cpu.instrument, order=30)
+    return _cpu
+
+
+def stop_cpu() -> list[tuple[str, int, float, str]]:
+    """Turns CPU profiling off and writes its pstats files; see CpuProfiler.dump()."""
+    global _cpu  # pylint: disable=global-statement
+    if _cpu is None:
+        return []
+    profiler, _cpu = _cpu, None
+    middleware.unregister(profiler.instrument)
+    return profiler.dump()
+
+
+def cpu_active() -> Optional[CpuProfiler]:
+    """Returns the running CpuProfiler, or None."""
+    return _cpu
+
+
+def start_memory(directory: Optional[str] = None) -> MemoryProfiler:
+    """Turns memory profiling on (restarting it if it was on) and returns the profiler."""
+    global _memory  # pylint: disable=global-statement
+    stop_memory()
+    _memory = MemoryProfiler(directory or _directory)
+    middleware.register(_memory.instrument, order=31)
+    return _memory
+
+
+def stop_memory() -> tuple[dict[str, list[int]], Optional[str]]:
+    """Turns memory profiling off; returns its per-command stats and the snapshot path."""
+    global _memory  # pylint: disable=global-statement
+    if _memory is None:
+        return {}, None
+    profiler, _memory = _memory, None
+    middleware.unregister(profiler.instrument)
+    return profiler.stats, profiler.dump()
+
+
+def memory_active() -> Optional[MemoryProfiler]:
+    """Returns the running MemoryProfiler, or None."""
+    return _memory
+
+
+def _stop_all() -> None:
+    stop_memory()
+    stop_cpu()
+
+
+atexit.register(_stop_all)
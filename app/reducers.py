@@ -0,0 +1,270 @@
+"""
+reducers.py: Single-pass, constant-memory reductions behind the aggregate
+commands (sum, mean, min, max, var, count).
+
+Operands are consumed as a generator of blocks: numbers given on the command
+line, '@path' for a file of whitespace-separated numbers, and '-' for stdin.
+Files and stdin are read line by line and cut into blocks of BLOCK_SIZE
+numbers, so memory stays constant however long the stream is. Over the
+network (a server session) '@path' and '-' are refused: they would read the
+server's files and stdin (see session.require_local()).
+
+Every reduction combines per-block partial results:
+- sum/mean: each block is summed (math.fsum, or NumPy's pairwise sum) and the
+  block sums are added with Neumaier compensated summation;
+- var: per-block count/mean/M2 are merged with Chan et al.'s parallel form of
+  Welford's algorithm (sample variance, n - 1 denominator);
+- min/max/count: trivially combinable.
+Large in-memory inputs (long argument lists, tuples passed to compute(), NumPy
+arrays) are reduced with NumPy when it is installed.
+
+Under the decimal and fraction backends (see app.numeric) operands are parsed
+by the backend and blocks are plain lists of its numbers: sums are exact (or
+rounded by the decimal context), the same Chan merge is done in that
+arithmetic, and every reduction runs inside the backend's context.
+"""
+import math
+import sys
+from typing import Iterable, Iterator, Optional, Sequence, TextIO
+
+from app import numeric, session, vectorized
+
+BLOCK_SIZE = 65_536
+
+# Inline inputs at least this long are converted to a NumPy array when possible
+VECTOR_THRESHOLD = 4_096
+
+STDIN_OPERAND = "-"
+FILE_PREFIX = "@"
+
+
+class NeumaierSum:
+    """Compensated running sum (Kahan-Babuska/Neumaier)."""
+
+    __slots__ = ("total", "compensation")
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, value: float) -> None:
+        """Adds one value, keeping the low-order bits lost by the float addition."""
+        total = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - total) + value
+        else:
+            self.compensation += (value - total) + self.total
+        self.total = total
+
+    @property
+    def value(self) -> float:
+        """The compensated sum."""
+        return self.total + self.compensation
+
+
+class Moments:
+    """Running count, mean and sum of squared deviations (M2), mergeable block by block."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        # int zeros: they combine with floats, Decimals and Fractions alike
+        self.count = 0
+        self.mean = 0
+        self.m2 = 0
+
+    def add_block(self, block: Sequence[float], exact: bool = False) -> None:
+        """
+        Merges the moments of one block (Chan et al. parallel update). 'exact'
+        blocks hold Decimals or Fractions and are summed without fsum().
+        """
+        count = len(block)
+        if not count:
+            return
+        np = _numpy_for(block)
+        if np is not None:
+            block_mean = float(block.mean())
+            block_m2 = float(np.square(block - block_mean).sum())
+        elif exact:
+            block_mean = sum(block) / count
+            block_m2 = sum((value - block_mean) ** 2 for value in block)
+        else:
+            block_mean = math.fsum(block) / count
+            block_m2 = math.fsum((value - block_mean) ** 2 for value in block)
+
+        total = self.count + count
+        delta = block_mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += block_m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def variance(self) -> float:
+        """Sample variance (n - 1 denominator)."""
+        return self.m2 / (self.count - 1)
+
+
+def _numpy_for(block):
+    """Returns the numpy module if 'block' is a NumPy array, else None."""
+    np = vectorized.load_numpy()
+    if np is not None and isinstance(block, np.ndarray):
+        return np
+    return None
+
+
+def as_block(values: Sequence, command_name: str = "aggregate"):
+    """
+    Turns an in-memory sequence of numbers (or numeric strings) into a block:
+    a float64 NumPy array when it is large and NumPy is installed, else a list of
+    floats; under the decimal and fraction backends, a list of their numbers.
+    """
+    backend = numeric.active()
+    if backend is not numeric.FLOAT:
+        try:
+            return [backend.convert(value) for value in values]
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid numeric input for {command_name} command.") from None
+    np = vectorized.load_numpy()
+    try:
+        if np is not None and (isinstance(values, np.ndarray) or len(values) >= VECTOR_THRESHOLD):
+            return np.asarray(values, dtype=np.float64)
+        return [float(value) for value in values]
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid numeric input for {command_name} command.") from None
+
+
+def iter_stream_blocks(stream: TextIO, command_name: str) -> Iterator[list[float]]:
+    """
+    Yields the whitespace-separated numbers of a text stream, parsed by the active
+    numeric backend, in blocks of at most BLOCK_SIZE.
+    """
+    parse = numeric.active().parse
+    block: list[float] = []
+    for line in stream:
+        try:
+            block.extend(map(parse, line.split()))
+        except ValueError:
+            raise ValueError(f"Invalid numeric input for {command_name} command.") from None
+        if len(block) >= BLOCK_SIZE:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def iter_operand_blocks(args: Iterable[str], command_name: str, stdin: Optional[TextIO] = None) -> Iterator[Sequence[float]]:
+    """
+    Yields blocks of operands from command arguments: plain numbers, '@path'
+    (a file of numbers) or '-' (stdin). Consecutive plain numbers form one block.
+    """
+    inline: list[str] = []
+    for arg in args:
+        if arg != STDIN_OPERAND and not arg.startswith(FILE_PREFIX):
+            inline.append(arg)
+            continue
+        session.require_local(f"Reading numbers for {command_name} command from '-' or '@file'")
+        if inline:
+            yield as_block(inline, command_name)
+            inline = []
+        if arg == STDIN_OPERAND:
+            yield from iter_stream_blocks(stdin or sys.stdin, command_name)
+            continue
+        path = arg[len(FILE_PREFIX):]
+        try:
+            with open(path, "r", encoding="utf-8") as stream:
+                yield from iter_stream_blocks(stream, command_name)
+        except OSError as exc:
+            raise ValueError(f"Cannot read numbers for {command_name} command from '{path}': {exc.strerror}.") from None
+    if inline:
+        yield as_block(inline, command_name)
+
+
+def _empty(command_name: str) -> ValueError:
+    return ValueError(f"The {command_name} command needs at least one number.")
+
+
+def total(blocks: Iterable[Sequence[float]], command_name: str = "sum") -> tuple[float, int]:
+    """Returns (compensated sum, count) over all blocks; exact under the decimal and fraction backends."""
+    backend = numeric.active()
+    if backend is not numeric.FLOAT:
+        return backend.run(_exact_total, blocks, command_name)
+    running = NeumaierSum()
+    count = 0
+    for block in blocks:
+        np = _numpy_for(block)
+        running.add(float(block.sum()) if np is not None else math.fsum(block))
+        count += len(block)
+    if not count:
+        raise _empty(command_name)
+    return running.value, count
+
+
+def _exact_total(blocks: Iterable[Sequence], command_name: str) -> tuple[object, int]:
+    value = 0
+    count = 0
+    for block in blocks:
+        value = sum(block, value)
+        count += len(block)
+    if not count:
+        raise _empty(command_name)
+    return value, count
+
+
+def mean(blocks: Iterable[Sequence[float]]) -> tuple[float, int]:
+    """Returns (mean, count); the sum behind it is compensated."""
+    value, count = total(blocks, "mean")
+    return numeric.run(_divide, value, count), count
+
+
+def _divide(value, count: int):
+    return value / count
+
+
+def variance(blocks: Iterable[Sequence[float]]) -> tuple[float, int]:
+    """Returns (sample variance, count)."""
+    return numeric.run(_variance, blocks)
+
+
+def _variance(blocks: Iterable[Sequence[float]]) -> tuple[float, int]:
+    exact = numeric.active() is not numeric.FLOAT
+    moments = Moments()
+    for block in blocks:
+        moments.add_block(block, exact)
+    if moments.count < 2:
+        raise ValueError("The var command needs at least two numbers.")
+    return moments.variance(), moments.count
+
+
+def minimum(blocks: Iterable[Sequence[float]]) -> tuple[float, int]:
+    """Returns (smallest value, count)."""
+    return _extremum(blocks, "min", min)
+
+
+def maximum(blocks: Iterable[Sequence[float]]) -> tuple[float, int]:
+    """Returns (largest value, count)."""
+    return _extremum(blocks, "max", max)
+
+
+def _extremum(blocks: Iterable[Sequence[float]], command_name: str, pick) -> tuple[float, int]:
+    # Decimal comparisons can signal (NaN operands), so they run in the context
+    return numeric.run(_pick_extremum, blocks, command_name, pick)
+
+
+def _pick_extremum(blocks: Iterable[Sequence[float]], command_name: str, pick) -> tuple[float, int]:
+    best: Optional[float] = None
+    count = 0
+    for block in blocks:
+        if not len(block):
+            continue
+        np = _numpy_for(block)
+        candidate = float(block.min() if pick is min else block.max()) if np is not None else pick(block)
+        best = candidate if best is None else pick(best, candidate)
+        count += len(block)
+    if best is None:
+        raise _empty(command_name)
+    return best, count
+
+
+def count(blocks: Iterable[Sequence[float]]) -> tuple[int, int]:
+    """Returns (count, count); the operands are still validated as numbers."""
+    counted = sum(len(block) for block in blocks)
+    return counted, counted
@@ -0,0 +1,130 @@
+"""
+result_cache.py: Opt-in LRU memoization of command results.
+
+Installed as Dispatcher middleware in front of commands that declare
+'cacheable = True' (pure functions of their numeric arguments). The key is the
+command name plus the arguments normalized to floats, so "add 1 2" and
+"add 1.0 2.00" share an entry. Normalized means repr(float(arg)): it keeps the
+sign of zero, so "multiply -0 5" and "multiply 0 5" (whose results print
+differently) get entries of their own. Calls with NaN or infinite operands are
+not cached: NaN never equals itself, so such entries could never be hit. Under the decimal and fraction backends
+(app.numeric), whose results keep the operands as typed, the arguments
+themselves are the key. Entries are evicted least-recently-used once
+'maxsize' is reached and optionally expire after 'ttl' seconds. Errors are never
+cached, and stateful commands such as 'menu' are never wrapped.
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app import numeric
+from app.dispatcher import Handler, middleware
+
+
+class ResultCache:
+    """Size-bounded LRU cache of command outputs with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("Result cache size must be at least 1.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value for 'key' (marking it recently used), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires = entry
+        if expires is not None and self._clock() >= expires:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        """Stores a value, evicting the least recently used entry when full."""
+        expires = self._clock() + self.ttl if self.ttl else None
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drops every entry; counters are kept."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """Returns the current counters."""
+        return {"size": len(self), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def memoize(self, command_name: str, command_class: type, handler: Handler) -> Handler:
+        """Dispatcher middleware: serves repeated calls of cacheable commands from the cache."""
+        if not getattr(command_class, "cacheable", False):
+            return handler
+
+        def cached(args: list[str]):
+            backend = numeric.active()
+            if backend is numeric.FLOAT:
+                try:
+                    values = [float(arg) for arg in args]
+                except ValueError:
+                    # Not numeric: let the command raise its own error message
+                    return handler(args)
+                if not all(map(math.isfinite, values)):
+                    return handler(args)
+                key = (command_name, tuple(map(repr, values)))
+            else:
+                try:
+                    for arg in args:
+                        backend.parse(arg)
+                except ValueError:
+                    # Not numeric, or '@file' / '-' whose contents may change
+                    return handler(args)
+                # Sessions may use different backends (and decimal contexts)
+                key = (command_name, backend.spec(), tuple(args))
+            result = self.get(key)
+            if result is None:
+                result = handler(args)
+                self.put(key, result)
+            return result
+        return cached
+
+
+_active: Optional[ResultCache] = None
+
+
+def enable(maxsize: int = 1024, ttl: Optional[float] = None) -> ResultCache:
+    """Turns result caching on process-wide and returns the active cache."""
+    global _active  # pylint: disable=global-statement
+    disable()
+    _active = ResultCache(maxsize, ttl)
+    # Inside the metrics wrapper (order 10), so cache hits are still counted and timed
+    middleware.register(_active.memoize, order=20)
+    return _active
+
+
+def disable() -> None:
+    """Turns result caching off and drops the cache."""
+    global _active  # pylint: disable=global-statement
+    if _active is not None:
+        middleware.unregister(_active.memoize)
+        _active = None
+
+
+def active() -> Optional[ResultCache]:
+    """Returns the active ResultCache, or None when caching is disabled."""
+    return _active
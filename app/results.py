@@ -0,0 +1,180 @@
+"""
+results.py: Defines CommandResult, the structured output of a calculation.
+
+Commands return a CommandResult instead of an already formatted string: the
+command name, its operands and the value, plus a format template. The text form
+("3.0 + 4.0 = 7.0") is only built when something asks for it, e.g. an output
+encoder writing a line, so callers that only want the number, or drop the
+output, never pay for float-to-string conversions. A CommandResult compares
+equal to its text form, so code that expects execute() to return a str keeps
+working; plugins that do return a str are treated the same everywhere.
+"""
+from typing import Optional, Sequence, Union
+
+
+class CommandResult:
+    """
+    Lazily formatted command output. 'template' is a printf-style pattern
+    applied to the operands followed by the value, e.g. "%s + %s = %s"
+    ('%' formatting is the cheapest way to build the line once it is needed).
+    'operands' is None when they were streamed and not kept (aggregates);
+    'count' then says how many there were, and the template is applied to the
+    mapping {"count", "value"}, e.g. "sum of %(count)d values = %(value)s".
+    """
+
+    __slots__ = ("command", "operands", "value", "template", "count")
+
+    def __init__(
+        self,
+        command: str,
+        operands: Optional[tuple],
+        value: float,
+        template: str = "",
+        count: Optional[int] = None,
+    ):
+        self.command = command
+        self.operands = operands
+        self.value = value
+        self.template = template
+        self.count = count
+
+    def __str__(self) -> str:
+        operands = self.operands
+        if operands is None:
+            return (self.template or f"{self.command} of %(count)d values = %(value)s") % {"count": self.count, "value": self.value}
+        if self.template:
+            return self.template % (*operands, self.value)
+        return f"{self.command} {' '.join(map(str, operands))} = {self.value}"
+
+    def __repr__(self) -> str:
+        return f"CommandResult({self.command!r}, {self.operands!r}, {self.value!r})"
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, str):
+            return str(self) == other
+        if isinstance(other, CommandResult):
+            return (self.command, self.operands, self.value, self.count) == (other.command, other.operands, other.value, other.count)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Equal to its text form, so it must hash like it
+        return hash(str(self))
+
+    def as_dict(self) -> dict:
+        """
+        The result as plain data: command, operands (or count) and value.
+        Decimal and Fraction numbers are given as exact strings.
+        """
+        data: dict = {"command": self.command}
+        if self.operands is not None:
+            data["operands"] = [_plain_number(operand) for operand in self.operands]
+        else:
+            data["count"] = self.count
+        data["value"] = _plain_number(self.value)
+        return data
+
+    def value_text(self) -> str:
+        """The value alone, as machine-readable text (raw and CSV output)."""
+        return str(self.value)
+
+    def operand_texts(self) -> list[str]:
+        """The operands as machine-readable text, one per operand."""
+        return [str(operand) for operand in self.operands or ()]
+
+
+def _plain_number(value):
+    """
+    A number as JSON-ready data: floats and ints as they are; Decimal and Fraction
+    values (see app.numeric) as their exact text, e.g. "0.30" or "1/3", since a
+    JSON number would be read back as a float.
+    """
+    if isinstance(value, (float, int)):
+        return value
+    return str(value)
+
+
+# Vectors longer than this are shown as their first and last few elements
+COMPACT_LIMIT = 10
+COMPACT_EDGE = 3
+
+
+def format_vector(values, errors: Sequence[int] = ()) -> str:
+    """
+    Compact text form of a vector operand or result: "[1.0, 2.0, 3.0]", or
+    "[1.0, 2.0, 3.0, ..., 98.0, 99.0, 100.0] (100 values)" for long vectors.
+    Elements at the 'errors' indices are shown as "error". Scalars are str()'d.
+    """
+    if not isinstance(values, list):
+        return str(values)
+    failed = set(errors)
+    size = len(values)
+    if size > COMPACT_LIMIT:
+        shown = [*range(COMPACT_EDGE), None, *range(size - COMPACT_EDGE, size)]
+        suffix = f" ({size} values)"
+    else:
+        shown = range(size)
+        suffix = ""
+    items = ["..." if index is None else "error" if index in failed else str(values[index]) for index in shown]
+    return f"[{', '.join(items)}]{suffix}"
+
+
+class VectorResult(CommandResult):
+    """
+    Result of an element-wise command on vector operands (see vectorized.py).
+    Operands are floats or lists of floats, the value is a list, and 'errors'
+    lists the indices of elements that failed (division by zero); their value
+    is NaN. The text form is compact for long vectors; as_dict(), value_text()
+    and operand_texts() keep every element.
+    """
+
+    __slots__ = ("errors",)
+
+    def __init__(self, command: str, operands: tuple, value: list, template: str = "", errors: Sequence[int] = ()):
+        super().__init__(command, operands, value, template)
+        self.errors = list(errors)
+
+    def __str__(self) -> str:
+        operands = [format_vector(operand) for operand in self.operands]
+        text = (self.template or f"{self.command} %s %s = %s") % (*operands, format_vector(self.value, self.errors))
+        if not self.errors:
+            return text
+        shown = ", ".join(map(str, self.errors[:COMPACT_EDGE])) + (", ..." if len(self.errors) > COMPACT_EDGE else "")
+        if len(self.errors) == 1:
+            return f"{text} (division by zero at index {shown})"
+        return f"{text} ({len(self.errors)} divisions by zero at indices {shown})"
+
+    def __repr__(self) -> str:
+        return f"VectorResult({self.command!r}, {self.operands!r}, {self.value!r}, errors={self.errors!r})"
+
+    def __float__(self) -> float:
+        raise TypeError(f"{self.command} returned a vector, not a single number")
+
+    def as_dict(self) -> dict:
+        """Full data; failed elements are None (JSON has no NaN) and listed under "errors"."""
+        failed = set(self.errors)
+        data = {
+            "command": self.command,
+            "operands": list(self.operands),
+            "value": [None if index in failed else value for index, value in enumerate(self.value)],
+        }
+        if self.errors:
+            data["errors"] = self.errors
+        return data
+
+    def value_text(self) -> str:
+        """Every element, space-separated in brackets: a vector literal the calculator reads back."""
+        return _vector_literal(self.value)
+
+    def operand_texts(self) -> list[str]:
+        return [_vector_literal(operand) if isinstance(operand, list) else str(operand) for operand in self.operands]
+
+
+def _vector_literal(values) -> str:
+    return f"[{' '.join(map(str, values))}]"
+
+
+# What a command handler may return
+Output = Union[str, CommandResult]
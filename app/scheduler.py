@@ -0,0 +1,261 @@
+"""
+scheduler.py: Runs slow plugin commands away from the calling thread, with a
+deadline per command, so a hung plugin cannot stall the REPL or a batch run.
+
+Commands say how they should run with two class markers (see CommandInterface):
+
+    execution = "inline"    the default: execute() is called directly, as before
+    execution = "thread"    I/O-bound work: run on a pooled worker thread
+    execution = "process"   CPU-bound work: run in a pooled worker process
+    timeout = 5.0           seconds to wait before giving up on a call
+
+The Scheduler is Dispatcher middleware, innermost of all. Inline commands are
+returned unwrapped, so built-ins such as 'add' pay nothing for it. A pooled call
+that misses its deadline (the command's 'timeout', else the scheduler's default)
+raises CommandTimeoutError, which is reported like any other command error:
+"Error: Command 'x' timed out after 5 seconds."
+
+Cancellation: a thread cannot be stopped from outside, so a timed-out thread
+call has its cancellation event set, which the command can poll through
+scheduler.cancelled(); worker threads are daemons, so one that never returns
+does not keep the process alive. Worker processes are terminated instead, and
+the process pool is recreated on next use. Ctrl-C while waiting cancels the
+call the same way.
+
+Scheduling applies to execute() calls made through the Dispatcher; the numeric
+compute() path (expressions, Calculator) is not affected. 'queue' and
+'multiprocessing' are only imported once a pooled command is first called.
+"""
+# pylint: disable=import-outside-toplevel
+import contextvars
+import importlib
+import threading
+from typing import Optional
+
+from app.dispatcher import Handler, middleware
+
+EXECUTION_INLINE = "inline"
+EXECUTION_THREAD = "thread"
+EXECUTION_PROCESS = "process"
+EXECUTION_MODES = (EXECUTION_INLINE, EXECUTION_THREAD, EXECUTION_PROCESS)
+
+DEFAULT_WORKERS = 4
+# Seconds; None waits as long as the command takes
+DEFAULT_TIMEOUT: Optional[float] = 30.0
+
+
+class CommandTimeoutError(TimeoutError):
+    """Raised when a pooled command call misses its deadline."""
+
+    def __init__(self, command_name: str, timeout: float):
+        super().__init__(f"Command '{command_name}' timed out after {timeout:g} seconds.")
+        self.command_name = command_name
+        self.timeout = timeout
+
+
+_local = threading.local()
+
+
+def cancelled() -> bool:
+    """
+    For commands running on a worker thread: True once the caller has given up
+    on the current call (deadline passed or Ctrl-C). Long-running commands should
+    poll it and return early. Always False elsewhere.
+    """
+    event = getattr(_local, "cancel", None)
+    return event is not None and event.is_set()
+
+
+class _Call:
+    """One handler call queued for a worker thread, with the caller's context variables (e.g. its session)."""
+
+    __slots__ = ("handler", "args", "context", "done", "cancel", "value", "error")
+
+    def __init__(self, handler: Handler, args: list[str]):
+        self.handler = handler
+        self.args = args
+        self.context = contextvars.copy_context()
+        self.done = threading.Event()
+        self.cancel = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        if self.cancel.is_set():
+            # Given up on while still queued
+            return
+        _local.cancel = self.cancel
+        try:
+            self.value = self.context.run(self.handler, self.args)
+        except BaseException as exc:  # pylint: disable=broad-except
+            self.error = exc
+        finally:
+            _local.cancel = None
+            self.done.set()
+
+
+class ThreadPool:
+    """
+    Daemon worker threads fed from a single queue. Threads are started on demand,
+    up to 'max_workers'; calls queue when they are all busy.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS):
+        import queue
+
+        self.max_workers = max_workers
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+
+    def submit(self, handler: Handler, args: list[str]) -> _Call:
+        """Queues a handler call and returns it; wait on its 'done' event."""
+        call = _Call(handler, args)
+        with self._lock:
+            if self._idle == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"command-worker-{len(self._threads) + 1}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+        self._queue.put(call)
+        return call
+
+    def shutdown(self) -> None:
+        """Asks idle workers to exit; busy ones exit after their current call."""
+        for _ in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                self._idle += 1
+            call = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+            if call is None:
+                return
+            call.run()
+
+
+def _execute_in_process(module_name: str, class_name: str, args: list[str]):
+    """Worker process side: imports the command class by name and executes it."""
+    command_class = getattr(importlib.import_module(module_name), class_name)
+    return command_class().execute(args)
+
+
+class Scheduler:
+    """Dispatcher middleware that moves 'thread' and 'process' commands onto worker pools."""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, default_timeout: Optional[float] = DEFAULT_TIMEOUT):
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        # command -> number of calls abandoned at their deadline
+        self.timeouts: dict[str, int] = {}
+        self._threads: Optional[ThreadPool] = None
+        self._processes = None
+
+    def instrument(self, command_name: str, command_class: type, handler: Handler) -> Handler:
+        """Dispatcher middleware: returns inline handlers unchanged, wraps pooled ones."""
+        mode = getattr(command_class, "execution", EXECUTION_INLINE)
+        if mode == EXECUTION_INLINE:
+            return handler
+        timeout = getattr(command_class, "timeout", None) or self.default_timeout
+
+        if mode == EXECUTION_THREAD:
+            def threaded(args: list[str]):
+                return self.run_thread(command_name, handler, args, timeout)
+            return threaded
+
+        if mode == EXECUTION_PROCESS:
+            target = (command_class.__module__, command_class.__name__)
+
+            def in_process(args: list[str]):
+                return self.run_process(command_name, target, args, timeout)
+            return in_process
+
+        def misdeclared(args: list[str]):
+            raise ValueError(
+                f"Command '{command_name}' has an unknown execution mode '{mode}'. "
+                f"Expected one of: {', '.join(EXECUTION_MODES)}."
+            )
+        return misdeclared
+
+    def run_thread(self, command_name: str, handler: Handler, args: list[str], timeout: Optional[float]):
+        """Runs a handler on a worker thread and waits up to 'timeout' seconds for it."""
+        if self._threads is None:
+            self._threads = ThreadPool(self.max_workers)
+        call = self._threads.submit(handler, args)
+        try:
+            finished = call.done.wait(timeout)
+        except BaseException:
+            call.cancel.set()
+            raise
+        if not finished:
+            call.cancel.set()
+            raise self._timed_out(command_name, timeout)
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    def run_process(self, command_name: str, target: tuple[str, str], args: list[str], timeout: Optional[float]):
+        """Runs a command class, named by (module, class), in a worker process."""
+        import multiprocessing
+
+        if self._processes is None:
+            self._processes = multiprocessing.Pool(self.max_workers)
+        pending = self._processes.apply_async(_execute_in_process, (*target, args))
+        try:
+            return pending.get(timeout)
+        except multiprocessing.TimeoutError:
+            self._stop_processes()
+            raise self._timed_out(command_name, timeout) from None
+        except KeyboardInterrupt:
+            self._stop_processes()
+            raise
+
+    def shutdown(self) -> None:
+        """Stops the worker pools (hung threads are left to die with the process)."""
+        if self._threads is not None:
+            self._threads.shutdown()
+            self._threads = None
+        self._stop_processes()
+
+    def _stop_processes(self) -> None:
+        if self._processes is not None:
+            self._processes.terminate()
+            self._processes.join()
+            self._processes = None
+
+    def _timed_out(self, command_name: str, timeout: float) -> CommandTimeoutError:
+        self.timeouts[command_name] = self.timeouts.get(command_name, 0) + 1
+        return CommandTimeoutError(command_name, timeout)
+
+
+_active: Optional[Scheduler] = None
+
+
+def enable(max_workers: int = DEFAULT_WORKERS, default_timeout: Optional[float] = DEFAULT_TIMEOUT) -> Scheduler:
+    """Turns pooled execution on process-wide (replacing any active scheduler) and returns it."""
+    global _active  # pylint: disable=global-statement
+    disable()
+    _active = Scheduler(max_workers, default_timeout)
+    # Innermost, inside metrics (10), the result cache (20) and the profilers (30, 31)
+    middleware.register(_active.instrument, order=40)
+    return _active
+
+
+def disable() -> None:
+    """Turns pooled execution off; every command runs inline again."""
+    global _active  # pylint: disable=global-statement
+    if _active is not None:
+        middleware.unregister(_active.instrument)
+        _active.shutdown()
+        _active = None
+
+
+def active() -> Optional[Scheduler]:
+    """Returns the active Scheduler, or None."""
+    return _active
@@ -0,0 +1,256 @@
+"""
+server.py: Defines the CalculatorServer, an asyncio line-protocol server that
+serves many calculator sessions from one process over TCP or a Unix socket.
+
+Each connection behaves like the REPL: one command per line, the same commands,
+aliases and expressions, the same error messages, and 'exit' ends the session.
+Every connection is a Session (see app.session) with its own variables and its
+own history ring of SESSION_HISTORY_SIZE lines for 'history' and 'replay'
+(never written to HISTORY_FILE). All sessions share one PluginManager and one
+Dispatcher. Sessions are remote (see app.session): '-' and '@path' operands and
+'profile on DIRECTORY' / 'memprofile on DIRECTORY' are refused with an error, since
+they would use the server's stdin and file system on the client's behalf.
+
+Requests run on the event loop, except lines that call a pooled command (see
+app.scheduler): those wait for their worker on an executor thread, so a slow
+plugin holds up only its own session.
+
+Clients may pipeline: a session reads ahead up to 'max_pipeline' requests while
+earlier ones are being answered. With that many unanswered the session stops
+reading, so TCP flow control pushes back on the client; replies are written
+with drain(), so a client that does not read its replies is throttled too.
+Lines longer than 'line_limit' bytes end the connection with an error.
+shutdown() stops accepting, answers the requests already received, tells each
+client the server is going away and closes the connections.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from app import history, scheduler
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import Dispatcher, UNKNOWN_COMMAND_MESSAGE, error_message
+from app.session import Session, activate
+from app.variables import Workspace
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = "127.0.0.1:7777"
+DEFAULT_MAX_PIPELINE = 128
+DEFAULT_LINE_LIMIT = 64 * 1024
+SESSION_HISTORY_SIZE = 100
+
+WELCOME_MESSAGE = "Welcome to the Interactive Calculator. Type 'exit' to exit."
+EXIT_MESSAGE = "Exiting the interactive calculator..."
+SHUTDOWN_MESSAGE = "Server is shutting down."
+
+# Queue markers for the end of a client's input and for an oversized line
+_END = None
+_TOO_LONG = object()
+
+
+def parse_address(address: str) -> tuple[str, object]:
+    """
+    Parses 'HOST:PORT', ':PORT' or 'unix:PATH' into ("tcp", (host, port))
+    or ("unix", path). Raises ValueError for anything else.
+    """
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        if not path:
+            raise ValueError("Unix socket address needs a path, e.g. unix:/tmp/calculator.sock.")
+        return "unix", path
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid server address '{address}'. Use HOST:PORT or unix:PATH.")
+    return "tcp", (host.strip("[]") or "127.0.0.1", int(port))
+
+
+class CalculatorServer:
+    """Serves REPL-style calculator sessions over a stream socket."""
+
+    def __init__(
+        self,
+        plugin_manager: Optional[PluginManager] = None,
+        max_pipeline: int = DEFAULT_MAX_PIPELINE,
+        line_limit: int = DEFAULT_LINE_LIMIT,
+    ):
+        if max_pipeline < 1:
+            raise ValueError("The pipeline limit must be at least 1.")
+        self.dispatcher = Dispatcher(plugin_manager or PluginManager.shared())
+        self.max_pipeline = max_pipeline
+        self.line_limit = line_limit
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._sessions: set[asyncio.Task] = set()
+        self._readers: set[asyncio.Task] = set()
+        self._closing = False
+        # Used by respond() calls that do not name a session
+        self._default_session: Optional[Session] = None
+
+    def new_session(self) -> Session:
+        """Returns the state of a new connection: empty variables and history."""
+        return Session(
+            Workspace(self.dispatcher.plugin_manager, self.dispatcher),
+            history.History(SESSION_HISTORY_SIZE),
+            remote=True,
+        )
+
+    async def start(self, address: str = DEFAULT_ADDRESS) -> asyncio.AbstractServer:
+        """Starts listening on 'address' (see parse_address) and returns the asyncio server."""
+        kind, target = parse_address(address)
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self._session, target, limit=self.line_limit)
+        else:
+            host, port = target
+            self._server = await asyncio.start_server(self._session, host, port, limit=self.line_limit)
+        logger.info("Calculator server listening on %s", ", ".join(str(sock.getsockname()) for sock in self._server.sockets))
+        return self._server
+
+    def respond(self, line: str, session: Optional[Session] = None) -> tuple[Optional[str], bool]:
+        """
+        Executes one request line in 'session' (by default, one session shared by
+        all such calls) and records it in the session's history. Returns
+        (reply, close): reply is None when the REPL would print nothing, and
+        close is True after 'exit'.
+        """
+        if line.lower() == "exit":
+            return EXIT_MESSAGE, True
+        if session is None:
+            if self._default_session is None:
+                self._default_session = self.new_session()
+            session = self._default_session
+        with activate(session):
+            handler, command_name, args = session.workspace.resolve_line(line)
+            if handler is None:
+                logger.warning("Unknown command encountered: %s", command_name)
+                session.history.record(line, UNKNOWN_COMMAND_MESSAGE, ok=False)
+                return UNKNOWN_COMMAND_MESSAGE, False
+            try:
+                output = handler(args)
+            except Exception as exc:  # pylint: disable=broad-except
+                if isinstance(exc, (ValueError, ZeroDivisionError, TimeoutError)):
+                    logger.error("Command line '%s' failed: %s", line, exc)
+                else:
+                    logger.exception("Command line '%s' caused an unexpected error", line)
+                reply = error_message(exc)
+                session.history.record(line, reply, ok=False)
+                return reply, False
+            session.history.record(line, output)
+        if output is None:
+            return None, False
+        # 'command' lets the optional log sampler aggregate hot commands
+        logger.info("Command '%s' executed successfully over the network", command_name, extra={"command": command_name})
+        return str(output), False
+
+    def pooled(self, line: str) -> bool:
+        """True when the line calls a command that runs on a scheduler worker pool."""
+        if scheduler.active() is None:
+            return False
+        command_class = self.dispatcher.plugin_manager.get_command(line.split(maxsplit=1)[0].lower())
+        return getattr(command_class, "execution", scheduler.EXECUTION_INLINE) != scheduler.EXECUTION_INLINE
+
+    async def _read_requests(self, reader: asyncio.StreamReader, requests: asyncio.Queue, slots: asyncio.Semaphore) -> None:
+        """
+        Feeds non-blank request lines to the session. Each line takes a slot that is
+        given back once it has been answered; with no free slot, reading stops.
+        """
+        marker = _END
+        try:
+            while True:
+                await slots.acquire()
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").strip()
+                if line:
+                    requests.put_nowait(line)
+                else:
+                    slots.release()
+        except ValueError:
+            # StreamReader limit exceeded: the line is longer than line_limit
+            marker = _TOO_LONG
+        except ConnectionError:
+            pass
+        finally:
+            # Also reached on cancellation (shutdown); never blocks
+            requests.put_nowait(marker)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Runs one client connection."""
+        task = asyncio.current_task()
+        self._sessions.add(task)
+        peer = writer.get_extra_info("peername") or "unix client"
+        logger.info("Session opened: %s", peer)
+
+        session = self.new_session()
+        requests: asyncio.Queue = asyncio.Queue()
+        slots = asyncio.Semaphore(self.max_pipeline)
+        feeder = asyncio.create_task(self._read_requests(reader, requests, slots))
+        self._readers.add(feeder)
+        try:
+            writer.write(f"{WELCOME_MESSAGE}\n".encode())
+            while True:
+                line = await requests.get()
+                if line is _END:
+                    if self._closing:
+                        writer.write(f"{SHUTDOWN_MESSAGE}\n".encode())
+                    break
+                if line is _TOO_LONG:
+                    writer.write(f"Error: Line too long (limit {self.line_limit} bytes).\n".encode())
+                    break
+                if self.pooled(line):
+                    # Waiting for the worker here would stall every other session
+                    loop = asyncio.get_running_loop()
+                    reply, close = await loop.run_in_executor(None, self.respond, line, session)
+                else:
+                    reply, close = self.respond(line, session)
+                if reply is not None:
+                    writer.write(f"{reply}\n".encode())
+                if close:
+                    break
+                slots.release()
+                # Returns at once unless the client has stopped reading its replies
+                await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            logger.info("Session %s dropped by the client", peer)
+        finally:
+            feeder.cancel()
+            self._readers.discard(feeder)
+            self._sessions.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            logger.info("Session closed: %s", peer)
+
+    async def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        Stops accepting connections, lets every session answer the requests it
+        has already read, then closes them. Sessions still busy after 'timeout'
+        seconds are cancelled.
+        """
+        if self._server is None:
+            return
+        self._closing = True
+        self._server.close()
+        for feeder in list(self._readers):
+            feeder.cancel()
+        if self._sessions:
+            _, pending = await asyncio.wait(set(self._sessions), timeout=timeout)
+            for task in pending:
+                task.cancel()
+        await self._server.wait_closed()
+        self._server = None
+        logger.info("Calculator server stopped.")
+
+
+async def serve(address: str = DEFAULT_ADDRESS, max_pipeline: int = DEFAULT_MAX_PIPELINE, stop: Optional[asyncio.Event] = None) -> None:
+    """Runs a CalculatorServer until 'stop' is set (or forever), then shuts it down gracefully."""
+    server = CalculatorServer(max_pipeline=max_pipeline)
+    await server.start(address)
+    stop = stop or asyncio.Event()
+    try:
+        await stop.wait()
+    finally:
+        await server.shutdown()
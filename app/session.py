@@ -0,0 +1,62 @@
+"""
+session.py: Defines Session, the state of one interactive session: its
+variables (a Workspace), its history and its numeric backend.
+
+The REPL has one session; the server has one per connection. A front end runs
+each line inside activate(session), and the commands that act on the session
+('history', 'replay', 'backend') find it with current(). The active session is held in a
+ContextVar, so concurrent server sessions (asyncio tasks, each with its own
+context) never see each other's state. Outside any session, current() is None
+and those commands fall back to the process-wide state (e.g. history.active(),
+numeric.active()).
+
+A server session is 'remote': its lines come from a network client, so the
+features that act on the server process's own stdin or files ('-' and '@path'
+operands, a profile directory of the client's choosing) refuse to run in it
+(see require_local()).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+
+class Session:
+    """Per-session state; any part may be None when the front end does not provide it."""
+
+    __slots__ = ("workspace", "history", "backend", "remote")
+
+    def __init__(self, workspace=None, history=None, backend=None, remote: bool = False):
+        self.workspace = workspace
+        self.history = history
+        # None: the process-wide numeric backend (see app.numeric)
+        self.backend = backend
+        # True for a network client (see require_local())
+        self.remote = remote
+
+
+_current: ContextVar[Optional[Session]] = ContextVar("calculator_session", default=None)
+
+
+# current() returns the session the current line runs in, or None. It is the
+# ContextVar's own get(): every arithmetic line asks for it (see numeric.active())
+current: Callable[[], Optional[Session]] = _current.get
+
+
+@contextmanager
+def activate(session: Session) -> Iterator[Session]:
+    """Makes 'session' the current one for the duration of the block."""
+    token = _current.set(session)
+    try:
+        yield session
+    finally:
+        _current.reset(token)
+
+
+def require_local(feature: str) -> None:
+    """
+    Raises ValueError when the current line comes from a remote session: 'feature'
+    would read or write the server's own stdin or files on the client's behalf.
+    """
+    session = _current.get()
+    if session is not None and session.remote:
+        raise ValueError(f"{feature} is not available over the network.")
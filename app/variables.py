@@ -0,0 +1,211 @@
+"""
+variables.py: Named variables for the REPL, recomputed incrementally.
+
+    rate = divide 5 100        # defines 'rate' from any command with a numeric form
+    total = multiply rate 2000 # operands may be numbers or variables
+    rate = divide 7 100        # 'total' is now stale, but not recomputed yet
+    total                      # recomputed here, on demand
+    add total 1                # variables can be used as arguments of any command
+    total * 2                  # ... and in expressions
+
+Each variable is a cell holding its command, its operands and its cached value.
+Cells form a dependency graph: reassigning a variable only marks the cells
+downstream of it stale (stopping at cells that are already stale), and a stale
+cell is recomputed the next time it is read, after its own stale inputs. Cells
+nobody reads are never recomputed. Calculations go through the plugins'
+compute() entry point via the Calculator, so any plugin with a numeric form
+(including user plugins) can define a variable.
+"""
+import re
+from typing import Optional, Union
+
+from app import numeric
+from app.calculator import Calculator
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import Dispatcher, Handler, UnknownCommandError
+
+ASSIGNMENT = re.compile(r"^\s*([A-Za-z_]\w*)\s*=\s*(.*)$")
+VARIABLE_NAME = re.compile(r"^[A-Za-z_]\w*$")
+# Names inside a token, e.g. 'rate' in '(multiply rate 2)'; not the 'e5' in '1e5'
+NAME_IN_TOKEN = re.compile(r"(?<![\w.])[A-Za-z_]\w*")
+# The name a line starts with, after any sign or bracket ("-rate * 2")
+LEADING_NAME = re.compile(r"[-+(]*([A-Za-z_]\w*)")
+
+# An operand is a constant (of the active numeric backend's type) or the name of another cell
+Operand = Union[float, str]
+
+
+class Cell:
+    """One variable: how to compute it, its cached value and who depends on it."""
+
+    __slots__ = ("name", "command", "operands", "value", "stale", "dependents")
+
+    def __init__(self, name: str, command: Optional[str], operands: tuple[Operand, ...]):
+        self.name = name
+        self.command = command      # None: the value of the single operand
+        self.operands = operands
+        self.value = 0.0
+        self.stale = True
+        self.dependents: set[str] = set()
+
+    def inputs(self) -> list[str]:
+        """Names of the variables this cell reads."""
+        return [operand for operand in self.operands if isinstance(operand, str)]
+
+
+class Workspace:
+    """The variables of one session and the dispatch of lines that use them."""
+
+    def __init__(self, plugin_manager: Optional[PluginManager] = None, dispatcher: Optional[Dispatcher] = None):
+        self.plugin_manager = plugin_manager or PluginManager.shared()
+        self.dispatcher = dispatcher or Dispatcher(self.plugin_manager)
+        self.calculator = Calculator(self.plugin_manager)
+        self._cells: dict[str, Cell] = {}
+        # Number of cell computations so far, to check that only affected cells are redone
+        self.computations = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._cells
+
+    def resolve_line(self, line: str) -> tuple[Optional[Handler], str, list[str]]:
+        """
+        Same contract as Dispatcher.resolve_line(), extended with assignments
+        ("name = ..."), bare variable names, variables used as command arguments and
+        expressions that start with a variable ("rate * 2").
+        """
+        if "=" in line:
+            match = ASSIGNMENT.match(line)
+            if match is not None:
+                name = match.group(1)
+                return (lambda args: self.assign(name, args)), "assignment", match.group(2).split()
+        parts = line.split()
+        if not self._cells:
+            return self.dispatcher.resolve_line(line, parts)
+        if len(parts) == 1 and parts[0] in self._cells:
+            return self.show, "variable", parts
+        leading = LEADING_NAME.match(parts[0])
+        if leading is not None and leading.group(1) in self._cells and "|" not in line:
+            # A line that starts with a variable, e.g. 'rate * 2', is an infix expression
+            return self.expression, "expression", parts
+        handler, command_name, args = self.dispatcher.resolve_line(line, parts)
+        if handler is not None and any(
+            name in self._cells for arg in args for name in NAME_IN_TOKEN.findall(arg)
+        ):
+            if command_name == "expression":
+                return self.expression, command_name, args
+            return (lambda args: handler(self.substitute(args))), command_name, args
+        return handler, command_name, args
+
+    def expression(self, args: list[str]):
+        """
+        Handler for expression lines that use variables. Their values are handed
+        to the expression engine as operands: pasted in as text, 1/3 (fraction
+        backend) would split into a division and inf or nan would not parse.
+        """
+        names = {name for arg in args for name in NAME_IN_TOKEN.findall(arg) if name in self._cells}
+        return self.dispatcher.expression(args, {name: self.value(name) for name in names})
+
+    def assign(self, name: str, tokens: list[str]) -> str:
+        """
+        Defines or redefines 'name' from "command operand ..." or a single operand,
+        computes it, and marks everything downstream stale. Returns "name = value".
+        Raises ValueError for bad names, unknown variables and cycles; errors from
+        the computation leave the previous definition in place.
+        """
+        if not tokens:
+            raise ValueError(f"Missing value for variable '{name}'. Usage: name = command arg1 [arg2 ...].")
+        if self.plugin_manager.get_command(name.lower()) is not None:
+            raise ValueError(f"'{name}' is a command name and cannot be used as a variable.")
+        if len(tokens) == 1 and self.plugin_manager.get_command(tokens[0].lower()) is None:
+            command, operand_tokens = None, tokens
+        else:
+            command, operand_tokens = tokens[0], tokens[1:]
+        cell = Cell(name, command, tuple(self._operand(token) for token in operand_tokens))
+        self._check_cycle(name, cell.inputs())
+
+        previous = self._cells.get(name)
+        self._compute(cell)
+        if previous is not None:
+            for source in previous.inputs():
+                self._cells[source].dependents.discard(name)
+            cell.dependents = previous.dependents
+        for source in cell.inputs():
+            self._cells[source].dependents.add(name)
+        self._cells[name] = cell
+        self._invalidate(cell.dependents)
+        return f"{name} = {cell.value}"
+
+    def show(self, args: list[str]) -> str:
+        """Handler for a bare variable name: returns "name = value", recomputing it if stale."""
+        name = args[0]
+        return f"{name} = {self.value(name)}"
+
+    def value(self, name: str) -> float:
+        """Returns the current value of a variable, recomputing it (and its stale inputs) first."""
+        cell = self._cells.get(name)
+        if cell is None:
+            raise ValueError(f"Unknown variable '{name}'.")
+        if cell.stale:
+            self._compute(cell)
+        return cell.value
+
+    def substitute(self, args: list[str]) -> list[str]:
+        """
+        Replaces variable names in command (or pipeline) arguments with their
+        current values, as text the active backend parses back ('1/3', 'inf').
+        """
+        def replace(match: re.Match) -> str:
+            name = match.group(0)
+            return str(self.value(name)) if name in self._cells else name
+        return [NAME_IN_TOKEN.sub(replace, arg) for arg in args]
+
+    def _operand(self, token: str) -> Operand:
+        try:
+            return numeric.parse(token)
+        except ValueError:
+            pass
+        if token not in self._cells:
+            if VARIABLE_NAME.match(token):
+                raise ValueError(f"Unknown variable '{token}'.")
+            raise ValueError(f"Invalid operand '{token}'.")
+        return token
+
+    def _compute(self, cell: Cell) -> None:
+        values = [self.value(operand) if isinstance(operand, str) else operand for operand in cell.operands]
+        if cell.command is None:
+            value = values[0]
+        else:
+            try:
+                value = self.calculator.evaluate(cell.command, *values).unwrap()
+            except UnknownCommandError:
+                raise ValueError(f"Unknown command '{cell.command}'.") from None
+        cell.value = value
+        cell.stale = False
+        self.computations += 1
+
+    def _check_cycle(self, name: str, inputs: list[str]) -> None:
+        """Raises ValueError if any input already depends (transitively) on 'name'."""
+        path = self._find_path(inputs, name, set())
+        if path is not None:
+            raise ValueError(f"Circular reference: {' -> '.join([name, *path])}.")
+
+    def _find_path(self, starts: list[str], target: str, seen: set[str]) -> Optional[list[str]]:
+        for start in starts:
+            if start == target:
+                return [start]
+            if start in seen:
+                continue
+            seen.add(start)
+            rest = self._find_path(self._cells[start].inputs(), target, seen)
+            if rest is not None:
+                return [start, *rest]
+        return None
+
+    def _invalidate(self, names: set[str]) -> None:
+        """Marks cells and everything downstream of them stale, without recomputing anything."""
+        pending = list(names)
+        while pending:
+            cell = self._cells[pending.pop()]
+            if not cell.stale:
+                cell.stale = True
+                pending.extend(cell.dependents)
@@ -0,0 +1,160 @@
+"""
+vectorized.py: Column-at-a-time kernels for the built-in arithmetic commands.
+
+NumPy is used when it is installed; otherwise a pure-Python fallback with the
+same semantics is used, so the batch API never depends on NumPy being present.
+NumPy is imported on first use so that plain REPL sessions never pay for it.
+
+The same kernels serve vector operands typed on a command line
+('multiply 1,2,3 10', 'add [1 2 3] [4 5 6]'), after broadcasting.
+"""
+import functools
+import operator
+import re
+from typing import Sequence
+
+from app.commands.command_interface import BatchResult
+from app.results import VectorResult
+
+# command name -> (NumPy ufunc name, pure-Python operator)
+_BINARY_OPS = {
+    "add": ("add", operator.add),
+    "subtract": ("subtract", operator.sub),
+    "multiply": ("multiply", operator.mul),
+    "divide": ("divide", operator.truediv),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_numpy():
+    """Returns the numpy module, or None when it is not installed."""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover - exercised only where NumPy is missing
+        return None
+    return numpy
+
+
+def apply_binary(command_name: str, x: Sequence, y: Sequence) -> BatchResult:
+    """
+    Applies the arithmetic operation named 'command_name' element-wise to two
+    operand columns. Elements may be numbers or numeric strings.
+    For 'divide', elements with a zero divisor are flagged in the mask and
+    their value is NaN instead of aborting the whole batch.
+    Raises ValueError if the columns differ in length or hold non-numeric input.
+    """
+    if len(x) != len(y):
+        raise ValueError(f"Operand columns for {command_name} command must have the same length.")
+
+    ufunc_name, py_op = _BINARY_OPS[command_name]
+    np = load_numpy()
+    if np is not None:
+        return _apply_numpy(np, command_name, getattr(np, ufunc_name), x, y)
+    return _apply_python(command_name, py_op, x, y)
+
+
+def _apply_numpy(np, command_name: str, ufunc, x: Sequence, y: Sequence) -> BatchResult:
+    try:
+        xs = np.asarray(x, dtype=np.float64)
+        ys = np.asarray(y, dtype=np.float64)
+    except ValueError:
+        raise ValueError(f"Invalid numeric input for {command_name} command.")
+
+    if command_name != "divide":
+        return BatchResult(ufunc(xs, ys), np.zeros(len(xs), dtype=bool))
+
+    mask = ys == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = ufunc(xs, ys)
+    values[mask] = np.nan
+    return BatchResult(values, mask)
+
+
+def _apply_python(command_name: str, py_op, x: Sequence, y: Sequence) -> BatchResult:
+    try:
+        xs = [float(v) for v in x]
+        ys = [float(v) for v in y]
+    except ValueError:
+        raise ValueError(f"Invalid numeric input for {command_name} command.")
+
+    if command_name != "divide":
+        return BatchResult([py_op(a, b) for a, b in zip(xs, ys)], [False] * len(xs))
+
+    mask = [b == 0 for b in ys]
+    values = [float("nan") if zero else py_op(a, b) for a, b, zero in zip(xs, ys, mask)]
+    return BatchResult(values, mask)
+
+
+# A bracketed vector literal ('[1 2 3]', '[1,2,3]') or any other whitespace-free token
+_OPERAND_TOKEN = re.compile(r"\[[^\[\]]*\]|[^\s\[\]]+|[\[\]]")
+
+
+def is_vector_args(args: Sequence[str]) -> bool:
+    """True if any argument is (part of) a vector literal: '1,2,3' or '[1 2 3]'."""
+    return any("," in arg or "[" in arg or "]" in arg for arg in args)
+
+
+def parse_operands(args: Sequence[str], command_name: str) -> list:
+    """
+    Parses command arguments into operands: floats for scalars, lists of
+    floats for vector literals ('1,2,3', '[1 2 3]' or '[1,2,3]').
+    Raises ValueError for malformed literals or non-numeric elements.
+    """
+    operands = []
+    for token in _OPERAND_TOKEN.findall(" ".join(args)):
+        if token.startswith("["):
+            elements = token[1:-1].replace(",", " ").split()
+        elif "," in token:
+            elements = token.split(",")
+        else:
+            elements = None
+        if token in ("[", "]") or elements == []:
+            raise ValueError(f"Invalid vector literal for {command_name} command.")
+        try:
+            operands.append(float(token) if elements is None else [float(element) for element in elements])
+        except ValueError:
+            raise ValueError(f"Invalid numeric input for {command_name} command.")
+    return operands
+
+
+def apply_broadcast(command_name: str, x, y) -> BatchResult:
+    """
+    Applies an arithmetic operation to two operands that are scalars or vectors,
+    with NumPy's broadcasting rules for one dimension: equal lengths, or one side
+    a scalar or a single element. Zero divisors are flagged per element, as in
+    apply_binary(). Raises ValueError if the lengths cannot be broadcast.
+    """
+    lengths = [len(operand) for operand in (x, y) if not isinstance(operand, float)]
+    size = max(lengths, default=1)
+    if any(length not in (1, size) for length in lengths):
+        raise ValueError(
+            f"Operands of {command_name} command could not be broadcast together (lengths {lengths[0]} and {lengths[1]})."
+        )
+    np = load_numpy()
+    if np is not None:
+        xs, ys = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+        if xs.ndim == 0:
+            xs, ys = xs.reshape(1), ys.reshape(1)
+    else:
+        xs = [x] * size if isinstance(x, float) else x * size if len(x) == 1 else x
+        ys = [y] * size if isinstance(y, float) else y * size if len(y) == 1 else y
+    return apply_binary(command_name, xs, ys)
+
+
+def execute_vector(command_name: str, symbol: str, args: Sequence[str]) -> VectorResult:
+    """
+    Runs an arithmetic command on vector operands, e.g. 'multiply 1,2,3 10'.
+    Returns a VectorResult, formatted as "[1.0, 2.0, 3.0] * 10.0 = [10.0, 20.0, 30.0]";
+    elements with a zero divisor are reported rather than failing the command.
+    Raises ValueError for bad literals, operand counts or incompatible lengths.
+    """
+    operands = parse_operands(args, command_name)
+    if len(operands) != 2:
+        raise ValueError(
+            f"Invalid number of arguments for {command_name} command. Usage: {command_name} <num1|vector> <num2|vector>."
+        )
+    x, y = operands
+    values, mask = apply_broadcast(command_name, x, y)
+    mask = [index for index, failed in enumerate(mask) if failed]
+    values = values.tolist() if hasattr(values, "tolist") else list(values)
+    return VectorResult(command_name, (x, y), values, f"%s {symbol} %s = %s", errors=mask)
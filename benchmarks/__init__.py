@@ -0,0 +1,4 @@
+"""
+The 'benchmarks' package holds standalone performance measurements for the calculator.
+They are not collected by pytest; run them with 'python -m benchmarks.<name>'.
+"""
@@ -0,0 +1,56 @@
+"""
+bench_backends.py: Compares the numeric backends (app.numeric) on the batch
+path: BatchRunner throughput for the same seeded stream of add/subtract/
+multiply/divide lines under float, decimal (default and high precision) and
+fraction. Output is formatted and written (to memory), so the cost of printing
+Decimal and Fraction values is included.
+
+Usage: python -m benchmarks.bench_backends [lines] [decimal_precision]
+"""
+import io
+import sys
+import time
+
+from app import numeric
+from app.batch import BatchRunner
+from benchmarks.workload import WorkloadGenerator
+
+ARITHMETIC_MIX = {"add": 1, "subtract": 1, "multiply": 1, "divide": 1}
+
+
+def measure(lines: int = 200_000, precision: int = 50, repeat: int = 3) -> dict[str, float]:
+    """Returns lines per second for each backend configuration (best of 'repeat' runs)."""
+    text = "\n".join(WorkloadGenerator(seed=1, mix=ARITHMETIC_MIX, invalid_ratio=0, zero_division_ratio=0).lines(lines))
+    configurations = {
+        "float": ("float",),
+        "decimal": ("decimal",),
+        f"decimal_prec{precision}": ("decimal", precision),
+        "fraction": ("fraction",),
+    }
+    results = {}
+    try:
+        for label, spec in configurations.items():
+            numeric.configure(*spec)
+            best = float("inf")
+            for _ in range(repeat):
+                runner = BatchRunner()
+                start = time.perf_counter()
+                runner.run(io.StringIO(text), io.StringIO(), io.StringIO())
+                best = min(best, time.perf_counter() - start)
+            results[label] = lines / best
+    finally:
+        numeric.configure()
+    return results
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    precision = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    results = measure(lines, precision)
+    baseline = results["float"]
+    for label, rate in results.items():
+        print(f"{label:>16}: {rate:12,.0f} lines/s  ({rate / baseline:6.1%} of float)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+bench_binary.py: Compares the text batch path with the memory-mapped binary
+operand format for "divide" over two float64 columns.
+
+The binary input is generated block by block, so it can be made much larger
+than RAM (e.g. 4_000_000_000 rows is ~64 GB of input); run_binary() only keeps
+the pages of the current block resident. The text path is timed on at most
+'text_rows' rows (its cost per row does not depend on the file size) and both
+are reported in rows per second.
+
+Usage: python -m benchmarks.bench_binary [rows] [text_rows] [directory]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+from app.batch import BatchRunner
+from app.binfmt import encode_header, run_binary
+from app.commands.plugin_manager import PluginManager
+
+BLOCK = 1 << 20
+
+
+def write_binary_workload(path: str, rows: int, seed: int = 1) -> None:
+    """Writes a 'divide' file with 'rows' random rows (some zero divisors), one block at a time."""
+    rng = random.Random(seed)
+    with open(path, "wb") as stream:
+        stream.write(encode_header("divide", 2, rows))
+        for column in range(2):
+            for start in range(0, rows, BLOCK):
+                count = min(BLOCK, rows - start)
+                low = 0 if column else 1
+                stream.write(array("d", (float(rng.randint(low, 999)) for _ in range(count))))
+
+
+def write_text_workload(path: str, rows: int, seed: int = 1) -> None:
+    """Writes the equivalent text command file."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as stream:
+        for _ in range(rows):
+            stream.write(f"divide {rng.randint(1, 999)} {rng.randint(1, 999)}\n")
+
+
+def measure(rows: int = 20_000_000, text_rows: int = 1_000_000, directory: str = None) -> dict[str, float]:
+    """Returns rows per second for both paths."""
+    plugin_manager = PluginManager()
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        text_path = os.path.join(workdir, "commands.txt")
+        write_text_workload(text_path, text_rows)
+        with open(text_path, "r", encoding="utf-8") as stream, open(os.devnull, "w", encoding="utf-8") as out:
+            start = time.perf_counter()
+            BatchRunner(plugin_manager, on_error="skip").run(stream, out)
+            text_rate = text_rows / (time.perf_counter() - start)
+        os.remove(text_path)
+
+        binary_path = os.path.join(workdir, "operands.bin")
+        output_path = os.path.join(workdir, "results.bin")
+        write_binary_workload(binary_path, rows)
+        start = time.perf_counter()
+        run_binary(binary_path, output_path, plugin_manager)
+        binary_rate = rows / (time.perf_counter() - start)
+    return {"text_rows_per_second": text_rate, "binary_rows_per_second": binary_rate, "speedup": binary_rate / text_rate}
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    text_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    directory = sys.argv[3] if len(sys.argv) > 3 else None
+    results = measure(rows, text_rows, directory)
+    print(f"{'text':>8}: {results['text_rows_per_second']:14,.0f} rows/s")
+    print(f"{'binary':>8}: {results['binary_rows_per_second']:14,.0f} rows/s ({rows * 16 / 1e9:.1f} GB input)")
+    print(f"{'speedup':>8}: {results['speedup']:14.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+bench_dispatch.py: Measures per-line dispatch overhead, i.e. the time spent
+outside the arithmetic itself, for the legacy REPL path (lookup the class and
+instantiate it on every line) versus the precompiled Dispatcher.
+
+Usage: python -m benchmarks.bench_dispatch [lines]
+"""
+import sys
+import timeit
+
+from app.commands.add_command import AddCommand
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import Dispatcher
+
+
+def measure(lines: int = 200_000) -> dict[str, float]:
+    """Returns nanoseconds per line for the raw command and both dispatch paths."""
+    plugin_manager = PluginManager()
+    dispatcher = Dispatcher(plugin_manager)
+    command = AddCommand()
+    line = "add 1 2"
+
+    def raw():
+        command.execute(["1", "2"])
+
+    def legacy():
+        parts = line.split()
+        command_class = plugin_manager.get_command(parts[0].lower())
+        command_class().execute(parts[1:])
+
+    def dispatched():
+        parts = line.split()
+        dispatcher.resolve(parts[0].lower())(parts[1:])
+
+    results = {}
+    for label, func in (("raw_execute", raw), ("legacy", legacy), ("dispatcher", dispatched)):
+        best = min(timeit.repeat(func, number=lines, repeat=5))
+        results[label] = best / lines * 1e9
+    results["legacy_overhead"] = results["legacy"] - results["raw_execute"]
+    results["dispatcher_overhead"] = results["dispatcher"] - results["raw_execute"]
+    return results
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    results = measure(lines)
+    for label, value in results.items():
+        print(f"{label:>20}: {value:8.1f} ns/line")
+    reduction = 1 - results["dispatcher_overhead"] / results["legacy_overhead"]
+    print(f"{'overhead cut':>20}: {reduction:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
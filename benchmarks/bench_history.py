@@ -0,0 +1,50 @@
+"""
+bench_history.py: Measures the session history: recording lines into the ring
+buffer and binary log, and replaying a whole log through 'replay'.
+
+A "day's log" defaults to 500_000 lines (roughly one command every 0.17s for
+24 hours). Recording is timed with the per-line flush the REPL uses.
+
+Usage: python -m benchmarks.bench_history [lines]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from app import history
+from app.commands.replay_command import ReplayCommand
+
+LINES = ("add 1 2", "subtract 9 4", "multiply 3 4", "divide 8 2", "divide 1 0")
+
+
+def measure(lines: int = 500_000) -> dict[str, float]:
+    """Returns seconds per recorded line and the total replay time for 'lines' logged lines."""
+    with tempfile.TemporaryDirectory() as workdir:
+        recorder = history.enable(log_path=os.path.join(workdir, "history.bin"))
+        try:
+            start = time.perf_counter()
+            for index in range(lines):
+                line = LINES[index % len(LINES)]
+                recorder.record(line, line, ok=index % len(LINES) != 4)
+            record_time = time.perf_counter() - start
+            log_size = os.path.getsize(recorder.log_path)
+
+            start = time.perf_counter()
+            ReplayCommand().execute([f"1..{lines}"])
+            replay_time = time.perf_counter() - start
+        finally:
+            history.disable()
+    return {"record_per_line": record_time / lines, "replay_seconds": replay_time, "log_bytes": log_size}
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    results = measure(lines)
+    print(f"{'record':>8}: {results['record_per_line'] * 1e6:8.2f} µs/line")
+    print(f"{'replay':>8}: {results['replay_seconds']:8.2f} s for {lines:,} lines "
+          f"({lines / results['replay_seconds']:,.0f} lines/s, log {results['log_bytes'] / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
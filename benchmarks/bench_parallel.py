@@ -0,0 +1,69 @@
+"""
+bench_parallel.py: Measures batch throughput of the sequential BatchRunner versus
+the ParallelRunner at 1, 2, 4, ... workers up to the CPU count, on a generated
+multi-million-line command file. Scaling should be close to linear until the
+workers outnumber the cores.
+
+Usage: python -m benchmarks.bench_parallel [lines] [chunk_size]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app.batch import BatchRunner
+from app.commands.plugin_manager import PluginManager
+from app.parallel import DEFAULT_CHUNK_SIZE, ParallelRunner
+
+
+def write_workload(path: str, lines: int, seed: int = 1) -> None:
+    """Writes 'lines' random arithmetic commands to 'path'."""
+    rng = random.Random(seed)
+    commands = ("add", "subtract", "multiply", "divide")
+    with open(path, "w", encoding="utf-8") as stream:
+        for _ in range(lines):
+            stream.write(f"{rng.choice(commands)} {rng.randint(1, 999)} {rng.randint(1, 999)}\n")
+
+
+def worker_counts() -> list[int]:
+    """1, 2, 4, ... up to (and including) the CPU count."""
+    cpus = os.cpu_count() or 1
+    counts = []
+    workers = 1
+    while workers < cpus:
+        counts.append(workers)
+        workers *= 2
+    return counts + [cpus]
+
+
+def measure(lines: int = 2_000_000, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict[str, float]:
+    """Returns lines per second for the sequential run and each worker count."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "commands.txt")
+        write_workload(path, lines)
+        with open(os.devnull, "w", encoding="utf-8") as out:
+            start = time.perf_counter()
+            with open(path, "r", buffering=1 << 16, encoding="utf-8") as stream:
+                BatchRunner(PluginManager()).run(stream, out)
+            results["sequential"] = lines / (time.perf_counter() - start)
+
+            for workers in worker_counts():
+                start = time.perf_counter()
+                ParallelRunner(workers, chunk_size).run(path, out)
+                results[f"{workers} workers"] = lines / (time.perf_counter() - start)
+    return results
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK_SIZE
+    results = measure(lines, chunk_size)
+    baseline = results["sequential"]
+    for label, rate in results.items():
+        print(f"{label:>12}: {rate:12,.0f} lines/s  speedup {rate / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
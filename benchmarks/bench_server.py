@@ -0,0 +1,61 @@
+"""
+bench_server.py: Load-tests the asyncio calculator server with local clients.
+Starts a CalculatorServer in-process (or targets one started with
+'python main.py --serve'), opens N concurrent connections that each pipeline M
+requests, and reports requests per second.
+
+Usage: python -m benchmarks.bench_server [clients] [requests] [HOST:PORT]
+"""
+import asyncio
+import sys
+import time
+from typing import Optional
+
+from app.commands.plugin_manager import PluginManager
+from app.server import CalculatorServer
+
+
+async def run_client(host: str, port: int, requests: int) -> None:
+    """Sends 'requests' pipelined commands and reads every reply."""
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readline()  # welcome banner
+    payload = "".join(f"add {i} {i}\n" for i in range(requests)).encode()
+    writer.write(payload)
+    writer.write(b"exit\n")
+    await writer.drain()
+    for _ in range(requests + 1):
+        await reader.readline()
+    writer.close()
+
+
+async def measure(clients: int = 50, requests: int = 2_000, address: Optional[str] = None) -> dict[str, float]:
+    """Returns total requests, elapsed seconds and requests per second."""
+    server = None
+    if address is None:
+        server = CalculatorServer(PluginManager())
+        listener = await server.start("127.0.0.1:0")
+        host, port = listener.sockets[0].getsockname()[:2]
+    else:
+        host, _, port = address.rpartition(":")
+        port = int(port)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, requests) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.shutdown()
+    total = clients * requests
+    return {"requests": total, "seconds": elapsed, "requests_per_second": total / elapsed}
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    address = sys.argv[3] if len(sys.argv) > 3 else None
+    results = asyncio.run(measure(clients, requests, address))
+    print(f"{results['requests']:,} requests from {clients} clients in {results['seconds']:.2f}s "
+          f"({results['requests_per_second']:,.0f} req/s)")
+
+
+if __name__ == "__main__":
+    main()
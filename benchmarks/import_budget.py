@@ -0,0 +1,117 @@
+"""
+import_budget.py: Enforces a startup budget for short-lived main.py runs.
+
+Runs 'python -X importtime main.py --batch -' on empty input and checks two things:
+- the summed import time stays within the budget (milliseconds), and
+- modules that only some modes or optional features need (asyncio,
+  multiprocessing, NumPy, logging.config, ...) are not imported at all.
+The first, untimed run warms the plugin manifest and logging caches, so the
+measured runs see a normal (cached) start.
+
+Usage: python -m benchmarks.import_budget [--budget-ms 60] [--runs 5]
+Exits with status 1 when the budget is exceeded or a deferred module was imported.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import NamedTuple, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = 60.0
+
+# Never needed to start a batch run; importing one of them is a regression
+DEFERRED_MODULES = (
+    "asyncio",
+    "concurrent.futures",
+    "multiprocessing",
+    "numpy",
+    "logging.config",
+    "configparser",
+    "dotenv",
+    "inspect",
+    "tempfile",
+    "app.app",
+    "app.server",
+    "app.calculator",
+    "app.expression",
+    "app.binfmt",
+    "app.history",
+    "app.profiling",
+    "app.log_pipeline",
+    "app.metrics",
+    "app.result_cache",
+    "app.commands.add_command",
+    "app.numeric",
+    "decimal",
+    "fractions",
+)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportProfile(NamedTuple):
+    """Parsed '-X importtime' output."""
+    total_us: int                  # sum of the self times of every import
+    modules: dict[str, int]        # module name -> cumulative time in µs
+
+
+def parse_importtime(stderr: str) -> ImportProfile:
+    """Parses the '-X importtime' lines out of a process's stderr."""
+    total = 0
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            total += int(self_us)
+            modules[name] = int(cumulative_us)
+    return ImportProfile(total, modules)
+
+
+def profile_startup(argv: tuple[str, ...] = ("--batch", "-"), cwd: str = REPO_ROOT) -> ImportProfile:
+    """Runs main.py (from 'cwd') once under -X importtime and returns its import profile."""
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(REPO_ROOT, "main.py"), *argv],
+        cwd=cwd, input=b"", stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env, check=True,
+    )
+    return parse_importtime(completed.stderr.decode("utf-8", "replace"))
+
+
+def check(runs: int = 5) -> tuple[float, list[str]]:
+    """
+    Returns (best total import time in ms, deferred modules that were imported).
+    The best of several runs is used to keep machine noise out of the verdict.
+    """
+    profile_startup()  # warm the caches
+    profiles = [profile_startup() for _ in range(runs)]
+    best_ms = min(profile.total_us for profile in profiles) / 1000
+    imported = sorted({name for profile in profiles for name in profile.modules if name in DEFERRED_MODULES})
+    return best_ms, imported
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check main.py's import-time budget.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Allowed total import time (default: %(default)s).")
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs; the best one counts (default: %(default)s).")
+    args = parser.parse_args(argv)
+
+    best_ms, imported = check(args.runs)
+    print(f"Import time: {best_ms:.1f}ms (budget {args.budget_ms:.1f}ms)")
+    failed = False
+    if best_ms > args.budget_ms:
+        print("FAIL: startup import time is over budget.")
+        failed = True
+    if imported:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(imported)}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+soak.py: Long-running soak test. Drives a synthetic workload (benchmarks.workload)
+through the dispatch path or the full REPL for a fixed time, and reports
+whether throughput, latency or memory drift while it runs.
+
+Targets:
+- dispatch:  Dispatcher.dispatch() per line, errors caught as in batch mode
+- app:       App.start() with input() fed from the workload and output discarded
+
+The run is cut into windows of '--window' seconds. For each window the harness
+records lines per second, p50/p99 latency, the process RSS and, with
+'--tracemalloc', the memory traced by tracemalloc (which slows every allocation
+down, so throughput numbers from such runs are not comparable). Lines are
+generated in chunks outside the timed region.
+
+The summary compares the first measured window (after '--warmup' windows) with
+the last one: sustained throughput (median over windows), latency drift (p50
+change, and slope per hour), RSS and traced memory growth (absolute and per
+hour) and, with tracemalloc, the source lines whose allocations grew most.
+'--max-rss-growth' and '--max-drift' turn the run into a check that exits 1.
+
+Usage:
+    python -m benchmarks.soak --duration 3600 --window 60
+    python -m benchmarks.soak --target app --duration 600 --skew 1.1 --cache --json soak.json
+"""
+# pylint: disable=import-outside-toplevel
+import argparse
+import builtins
+import contextlib
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Callable, NamedTuple, Optional
+
+from app.dispatcher import Dispatcher
+from benchmarks import workload
+
+TARGETS = ("dispatch", "app")
+DEFAULT_CHUNK = 10_000
+
+
+class Window(NamedTuple):
+    """Measurements for one window of the run."""
+    elapsed: float          # seconds since the start, at the end of the window
+    lines: int
+    errors: Optional[int]   # None for the 'app' target, which prints its errors
+    throughput: float       # lines per second of dispatch time
+    p50: float              # seconds
+    p99: float
+    rss: int                # bytes
+    traced: Optional[int]   # bytes traced by tracemalloc, when enabled
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable; 0 if unknown)."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class WindowRecorder:
+    """Collects per-line latencies and closes a Window every 'window' seconds."""
+
+    def __init__(self, window: float, trace: bool, clock: Callable[[], float] = time.perf_counter):
+        self.window = window
+        self.trace = trace
+        self.clock = clock
+        self.windows: list[Window] = []
+        self.snapshots: list = []
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.started = clock()
+        self.window_end = self.started + window
+
+    def close_window(self, now: float, count_errors: bool = True) -> None:
+        """Summarizes the current window, samples memory and starts the next one."""
+        latencies = sorted(self.latencies)
+        lines = len(latencies)
+        busy = sum(latencies)
+        p50 = _quantile(latencies, 0.50)
+        p99 = _quantile(latencies, 0.99)
+        # Drop this window's samples before measuring, so they do not look like a leak
+        del latencies
+        self.latencies = []
+        errors = self.errors if count_errors else None
+        self.errors = 0
+        gc.collect()
+        traced = None
+        if self.trace:
+            import tracemalloc
+            traced = tracemalloc.get_traced_memory()[0]
+            snapshot = tracemalloc.take_snapshot()
+            # Keep the first and the latest snapshot for the growth report
+            self.snapshots = [self.snapshots[0], snapshot] if self.snapshots else [snapshot]
+        self.windows.append(Window(
+            elapsed=now - self.started,
+            lines=lines,
+            errors=errors,
+            throughput=lines / busy if busy else 0.0,
+            p50=p50,
+            p99=p99,
+            rss=rss_bytes(),
+            traced=traced,
+        ))
+        # Memory sampling is not part of the next window
+        self.window_end = self.clock() + self.window
+
+    def generate(self, generator: workload.WorkloadGenerator, count: int) -> list[str]:
+        """Generates the next chunk of lines; the time it takes is not counted against the window."""
+        start = self.clock()
+        lines = generator.lines(count)
+        self.window_end += self.clock() - start
+        return lines
+
+
+def _quantile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def drive_dispatch(generator: workload.WorkloadGenerator, duration: float, recorder: WindowRecorder, chunk: int) -> None:
+    """Dispatches workload lines until 'duration' seconds have passed."""
+    from app.dispatcher import error_message
+
+    dispatch = Dispatcher().dispatch
+    clock = recorder.clock
+    deadline = recorder.started + duration
+    while True:
+        for line in recorder.generate(generator, chunk):
+            start = clock()
+            try:
+                dispatch(line)
+            except Exception as exc:  # pylint: disable=broad-except
+                error_message(exc)
+                recorder.errors += 1
+            end = clock()
+            recorder.latencies.append(end - start)
+            if end >= recorder.window_end:
+                recorder.close_window(end)
+                if end >= deadline:
+                    return
+
+
+def drive_app(generator: workload.WorkloadGenerator, duration: float, recorder: WindowRecorder, chunk: int) -> None:
+    """Runs App.start() with input() fed from the workload until 'duration' seconds have passed."""
+    from app import App, history
+
+    clock = recorder.clock
+    deadline = recorder.started + duration
+    pending: list[str] = []
+    previous: Optional[float] = None
+
+    def feed(_prompt: str) -> str:
+        nonlocal pending, previous
+        now = clock()
+        if previous is not None:
+            # Time since the previous line was handed out: parsing, dispatch and output
+            recorder.latencies.append(now - previous)
+            if now >= recorder.window_end:
+                recorder.close_window(now, count_errors=False)
+                if now >= deadline:
+                    return "exit"
+        if not pending:
+            pending = recorder.generate(generator, chunk)
+            pending.reverse()
+        line = pending.pop()
+        previous = clock()
+        return line
+
+    app_logger = logging.getLogger("app")
+    silencer = logging.NullHandler()
+    app_logger.addHandler(silencer)
+    original_input = builtins.input
+    builtins.input = feed
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink), \
+                contextlib.redirect_stderr(sink):
+            App.start()
+    finally:
+        builtins.input = original_input
+        app_logger.removeHandler(silencer)
+        history.disable()
+
+
+def run(
+    generator: workload.WorkloadGenerator,
+    duration: float,
+    target: str = "dispatch",
+    window: float = 60.0,
+    trace: bool = False,
+    chunk: int = DEFAULT_CHUNK,
+) -> WindowRecorder:
+    """Runs the soak test and returns the recorder holding its windows."""
+    if target not in TARGETS:
+        raise ValueError(f"Unknown soak target '{target}'. Expected one of: {', '.join(TARGETS)}.")
+    if trace:
+        import tracemalloc
+        tracemalloc.start()
+    try:
+        recorder = WindowRecorder(window, trace)
+        (drive_app if target == "app" else drive_dispatch)(generator, duration, recorder, chunk)
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return recorder
+
+
+def summarize(windows: list[Window], warmup: int = 1) -> dict[str, float]:
+    """
+    Compares the first measured window (after 'warmup') with the last.
+    Drift values are fractions (0.1 = 10 % slower); growth values are bytes.
+    """
+    measured = windows[warmup:] if len(windows) > warmup else windows[-1:]
+    first, last = measured[0], measured[-1]
+    hours = [window.elapsed / 3600 for window in measured]
+
+    def per_hour(values: list[float]) -> float:
+        if len(measured) < 2 or hours[0] == hours[-1]:
+            return 0.0
+        return statistics.linear_regression(hours, values).slope
+
+    summary = {
+        "windows": len(measured),
+        "lines": sum(window.lines for window in measured),
+        "throughput": statistics.median(window.throughput for window in measured),
+        "latency_drift": last.p50 / first.p50 - 1 if first.p50 else 0.0,
+        "p50_slope_per_hour": per_hour([window.p50 for window in measured]),
+        "p99_drift": last.p99 / first.p99 - 1 if first.p99 else 0.0,
+        "rss_growth": last.rss - first.rss,
+        "rss_growth_per_hour": per_hour([window.rss for window in measured]),
+    }
+    if last.traced is not None:
+        summary["traced_growth"] = last.traced - first.traced
+        summary["traced_growth_per_hour"] = per_hour([window.traced for window in measured])
+    return summary
+
+
+def top_growth(snapshots: list, limit: int = 5) -> list[str]:
+    """The source lines whose traced allocations grew most between the first and last snapshot."""
+    if len(snapshots) < 2:
+        return []
+    stats = snapshots[-1].compare_to(snapshots[0], "lineno")
+    return [str(stat) for stat in stats[:limit] if stat.size_diff > 0]
+
+
+def print_report(windows: list[Window], summary: dict, growth: list[str], out=sys.stdout) -> None:
+    out.write(f"{'elapsed':>9} {'lines':>9} {'lines/s':>11} {'p50 µs':>8} {'p99 µs':>8} {'RSS MB':>8} {'traced MB':>10}\n")
+    for window in windows:
+        traced = f"{window.traced / 1e6:10.2f}" if window.traced is not None else f"{'-':>10}"
+        out.write(
+            f"{window.elapsed:8.1f}s {window.lines:9,} {window.throughput:11,.0f} {window.p50 * 1e6:8.2f} "
+            f"{window.p99 * 1e6:8.2f} {window.rss / 1e6:8.1f} {traced}\n"
+        )
+    out.write(
+        f"\nsustained throughput: {summary['throughput']:,.0f} lines/s over {summary['lines']:,} lines\n"
+        f"latency drift:        p50 {summary['latency_drift']:+.1%}, p99 {summary['p99_drift']:+.1%} "
+        f"(p50 slope {summary['p50_slope_per_hour'] * 1e6:+.3f} µs/hour)\n"
+        f"RSS growth:           {summary['rss_growth'] / 1e6:+.2f} MB ({summary['rss_growth_per_hour'] / 1e6:+.2f} MB/hour)\n"
+    )
+    if "traced_growth" in summary:
+        out.write(
+            f"traced growth:        {summary['traced_growth'] / 1e6:+.3f} MB "
+            f"({summary['traced_growth_per_hour'] / 1e6:+.3f} MB/hour)\n"
+        )
+    for line in growth:
+        out.write(f"  {line}\n")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Soak-test the calculator with a synthetic workload.")
+    parser.add_argument("--target", choices=TARGETS, default="dispatch")
+    parser.add_argument("--duration", type=float, default=3600.0, help="Seconds to run (default 3600).")
+    parser.add_argument("--window", type=float, default=60.0, help="Seconds per measurement window (default 60).")
+    parser.add_argument("--warmup", type=int, default=1, help="Windows left out of the summary (default 1).")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also track Python allocations (slower).")
+    parser.add_argument("--cache", action="store_true", help="Enable the result cache (pair with --skew).")
+    parser.add_argument("--json", metavar="PATH", help="Also write windows and summary as JSON.")
+    parser.add_argument("--max-rss-growth", type=float, default=None, metavar="MB",
+                        help="Exit 1 if RSS grew by more than MB between the first and last window.")
+    parser.add_argument("--max-drift", type=float, default=None, metavar="FRACTION",
+                        help="Exit 1 if p50 latency drifted up by more than FRACTION (e.g. 0.2).")
+    workload.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    generator = workload.from_arguments(args)
+    if args.cache:
+        from app import result_cache
+        result_cache.enable()
+    recorder = run(generator, args.duration, args.target, args.window, args.tracemalloc)
+    summary = summarize(recorder.windows, args.warmup)
+    growth = top_growth(recorder.snapshots)
+    print_report(recorder.windows, summary, growth)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as stream:
+            json.dump({"windows": [window._asdict() for window in recorder.windows], "summary": summary,
+                       "top_growth": growth}, stream, indent=2)
+
+    failed = False
+    if args.max_rss_growth is not None and summary["rss_growth"] > args.max_rss_growth * 1e6:
+        print(f"FAIL: RSS grew by {summary['rss_growth'] / 1e6:.2f} MB (limit {args.max_rss_growth} MB)")
+        failed = True
+    if args.max_drift is not None and summary["latency_drift"] > args.max_drift:
+        print(f"FAIL: p50 latency drifted by {summary['latency_drift']:+.1%} (limit {args.max_drift:+.1%})")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
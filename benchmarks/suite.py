@@ -0,0 +1,263 @@
+"""
+suite.py: Performance regression suite for the calculator.
+
+Measures:
+- startup:   cold process start of main.py (batch mode on empty input)
+- discovery: PluginManager discovery time for 10/100/500 synthetic plugins,
+             without (cold) and with (warm) a plugin manifest
+- repl:      per-line cost of App.start() with stdin driven programmatically
+- dispatch:  per-line dispatch overhead (see bench_dispatch)
+- execute:   per-command execute() latency of the built-in commands
+- batch:     BatchRunner throughput in lines per second
+
+Results are JSON documents mapping metric names to {"value", "unit", "better"}.
+'--save' writes them as the baseline in benchmarks/baselines/; '--compare'
+re-measures and exits with status 1 if any metric is worse than the baseline by
+more than '--threshold' (a fraction, default 0.25). Everything runs offline.
+
+Usage:
+    python -m benchmarks.suite                  # measure and print
+    python -m benchmarks.suite --save           # record a new baseline
+    python -m benchmarks.suite --compare        # fail on regressions
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import uuid
+from typing import Callable, Optional
+
+from benchmarks import bench_dispatch
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, "default.json")
+DEFAULT_THRESHOLD = 0.25
+
+PLUGIN_TEMPLATE = '''
+from app.commands.command_interface import CommandInterface
+
+
+class Synthetic{index}Command(CommandInterface):
+    """
+    Synthetic command number {index}.
+    Usage: synth{index}
+    """
+
+    @property
+    def name(self) -> str:
+        return "synth{index}"
+
+    def execute(self, args: list[str]) -> str:
+        return "{index}"
+'''
+
+
+def metric(value: float, unit: str, better: str = "lower") -> dict:
+    """Builds one result entry; 'better' is "lower" or "higher"."""
+    return {"value": value, "unit": unit, "better": better}
+
+
+def best_of(func: Callable[[], None], repeat: int) -> float:
+    """Returns the fastest of 'repeat' timed runs of 'func', in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure_startup(repeat: int = 5) -> dict[str, dict]:
+    """Cold start of main.py in a fresh interpreter, up to the end of an empty batch run."""
+    command = [sys.executable, "main.py", "--batch", "-"]
+
+    def start():
+        subprocess.run(command, cwd=REPO_ROOT, input=b"", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return {"startup.main_py": metric(best_of(start, repeat), "s")}
+
+
+def measure_discovery(counts: tuple[int, ...] = (10, 100, 500), repeat: int = 5) -> dict[str, dict]:
+    """PluginManager construction time over synthetic plugin packages of growing size."""
+    from app.commands.plugin_manager import PluginManager  # pylint: disable=import-outside-toplevel
+
+    results = {}
+    root = tempfile.mkdtemp()
+    sys.path.insert(0, root)
+    try:
+        for count in counts:
+            package_name = f"bench_plugins_{uuid.uuid4().hex[:8]}"
+            package_dir = os.path.join(root, package_name)
+            os.mkdir(package_dir)
+            with open(os.path.join(package_dir, "__init__.py"), "w", encoding="utf-8"):
+                pass
+            for index in range(count):
+                with open(os.path.join(package_dir, f"synth{index}_command.py"), "w", encoding="utf-8") as plugin:
+                    plugin.write(PLUGIN_TEMPLATE.format(index=index))
+            manifest = os.path.join(root, f"{package_name}.manifest.json")
+
+            def cold():
+                if os.path.exists(manifest):
+                    os.remove(manifest)
+                PluginManager(package_name, package_dir, manifest)
+
+            def warm():
+                PluginManager(package_name, package_dir, manifest)
+
+            results[f"discovery.cold.{count}"] = metric(best_of(cold, repeat), "s")
+            warm()
+            results[f"discovery.warm.{count}"] = metric(best_of(warm, repeat), "s")
+    finally:
+        sys.path.remove(root)
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def measure_repl(lines: int = 20_000, repeat: int = 3) -> dict[str, dict]:
+    """Per-line cost of the REPL loop, fed from an in-memory stdin with stdout discarded."""
+    from app.app import App  # pylint: disable=import-outside-toplevel
+
+    script = "add 1 2\nmultiply 3 4\n" * (lines // 2) + "exit\n"
+    original_input = builtins.input
+
+    def session():
+        stdin = io.StringIO(script)
+        builtins.input = lambda prompt="": stdin.readline().rstrip("\n")
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                App.start()
+        finally:
+            builtins.input = original_input
+    return {"repl.per_line": metric(best_of(session, repeat) / lines, "s")}
+
+
+def measure_dispatch(lines: int = 200_000) -> dict[str, dict]:
+    """Dispatch overhead per line, from bench_dispatch."""
+    results = bench_dispatch.measure(lines)
+    return {
+        "dispatch.overhead": metric(results["dispatcher_overhead"] * 1e-9, "s"),
+        "dispatch.per_line": metric(results["dispatcher"] * 1e-9, "s"),
+    }
+
+
+def measure_execute(number: int = 100_000) -> dict[str, dict]:
+    """execute() latency of each built-in arithmetic command."""
+    from app.commands.plugin_manager import PluginManager  # pylint: disable=import-outside-toplevel
+
+    plugin_manager = PluginManager()
+    results = {}
+    for name in ("add", "subtract", "multiply", "divide"):
+        command = plugin_manager.get_command(name)()
+        args = ["3", "4"]
+        best = min(timeit.repeat(lambda: command.execute(args), number=number, repeat=5))
+        results[f"execute.{name}"] = metric(best / number, "s")
+    return results
+
+
+def measure_batch(lines: int = 200_000, repeat: int = 3) -> dict[str, dict]:
+    """BatchRunner throughput on an in-memory command stream."""
+    from app.batch import BatchRunner  # pylint: disable=import-outside-toplevel
+    from app.commands.plugin_manager import PluginManager  # pylint: disable=import-outside-toplevel
+
+    runner = BatchRunner(PluginManager(), on_error="skip")
+    script = "add 1 2\nsubtract 9 4\nmultiply 3 4\ndivide 8 2\n" * (lines // 4)
+
+    def run():
+        runner.run(io.StringIO(script), io.StringIO())
+    return {"batch.throughput": metric(lines / best_of(run, repeat), "lines/s", better="higher")}
+
+
+GROUPS: dict[str, Callable[[], dict[str, dict]]] = {
+    "startup": measure_startup,
+    "discovery": measure_discovery,
+    "repl": measure_repl,
+    "dispatch": measure_dispatch,
+    "execute": measure_execute,
+    "batch": measure_batch,
+}
+
+
+def run_suite(groups: Optional[list[str]] = None) -> dict:
+    """Runs the selected metric groups (all by default) and returns a results document."""
+    metrics = {}
+    for name in groups or GROUPS:
+        metrics.update(GROUPS[name]())
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "metrics": metrics,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[tuple[str, float, float, float, bool]]:
+    """
+    Compares two results documents metric by metric. Returns rows of
+    (name, baseline value, current value, relative change for the worse, regressed);
+    metrics missing from either document are skipped.
+    """
+    rows = []
+    for name, entry in current["metrics"].items():
+        reference = baseline["metrics"].get(name)
+        if reference is None or not reference["value"]:
+            continue
+        old, new = reference["value"], entry["value"]
+        change = (new - old) / old if entry.get("better", "lower") == "lower" else (old - new) / old
+        rows.append((name, old, new, change, change > threshold))
+    return rows
+
+
+def format_value(value: float, unit: str) -> str:
+    """Formats seconds with a readable unit; other units as plain numbers."""
+    if unit != "s":
+        return f"{value:,.0f} {unit}"
+    for scale, suffix in ((1.0, "s"), (1e-3, "ms"), (1e-6, "µs")):
+        if value >= scale:
+            return f"{value / scale:.2f}{suffix}"
+    return f"{value * 1e9:.0f}ns"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Calculator performance regression suite.")
+    parser.add_argument("--only", nargs="+", choices=list(GROUPS), help="Run only these metric groups.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (default: %(default)s).")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Fail if a metric regressed beyond the threshold.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative regression, e.g. 0.25 for 25%% (default: %(default)s).")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.only)
+    for name, entry in current["metrics"].items():
+        print(f"{name:>24}: {format_value(entry['value'], entry['unit'])}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as stream:
+            json.dump(current, stream, indent=2, sort_keys=True)
+            stream.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline, "r", encoding="utf-8") as stream:
+            baseline = json.load(stream)
+        rows = compare(baseline, current, args.threshold)
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}, positive change = worse):")
+        for name, old, new, change, regressed in rows:
+            unit = current["metrics"][name]["unit"]
+            status = "REGRESSED" if regressed else "ok"
+            print(f"{name:>24}: {format_value(old, unit):>14} -> {format_value(new, unit):>14} {change:+7.1%}  {status}")
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
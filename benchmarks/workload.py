@@ -0,0 +1,249 @@
+"""
+workload.py: Seeded generator of synthetic command streams, for load and soak
+tests (see benchmarks.soak).
+
+Every registered plugin can appear in the stream; operands are derived from
+its "Usage:" line, so third-party plugins are covered without configuration:
+each placeholder becomes a number, "[...]" parts are optional and "..." repeats.
+The session-control commands (CONTROL_COMMANDS: profile, replay, ...) have side
+effects and are left out of the default mix; an explicit mix ("add=3,divide=1")
+uses exactly the commands it lists.
+
+On top of that mix, a share of lines is invalid (unknown commands, non-numeric
+operands, wrong argument counts) and a share divides by zero. With 'skew' set,
+each command's operands are drawn from a fixed set of 'keys' operand tuples
+with Zipf-distributed popularity, so repeated lines exercise the result cache.
+
+The same seed always produces the same stream for the same set of plugins
+(and Faker version). Faker supplies the junk tokens in invalid lines; without
+it, random letters are used instead.
+
+Usage: python -m benchmarks.workload [count] [--seed N] [--mix add=3,divide=1] [--skew 1.2]
+"""
+import argparse
+import random
+import re
+import string
+import sys
+from typing import Iterator, Optional
+
+from app.commands.plugin_manager import PluginManager
+
+# Commands that switch session features (or the number type) on and off or re-run earlier lines
+CONTROL_COMMANDS = ("backend", "history", "memprofile", "menu", "profile", "replay", "stats")
+
+DEFAULT_INVALID_RATIO = 0.05
+DEFAULT_ZERO_DIVISION_RATIO = 0.02
+DEFAULT_KEYS = 1000
+
+# Upper bound on the extra operands a "..." placeholder expands to
+MAX_REPEAT = 8
+
+_OPTIONAL = re.compile(r"\[([^\[\]]*)\]")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parses "add=3,divide=1" into {"add": 3.0, "divide": 1.0}. Raises ValueError on bad input."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, separator, weight = item.partition("=")
+        try:
+            value = float(weight) if separator else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight in workload mix entry '{item}'.") from None
+        if value < 0:
+            raise ValueError(f"Negative weight in workload mix entry '{item}'.")
+        mix[name.strip().lower()] = value
+    return mix
+
+
+def usage_shape(usage: Optional[str], command_name: str) -> list[tuple[int, bool]]:
+    """
+    Reduces a usage string ("sum x [y ...] | @file | -") to operand slots for
+    its first form: (count of placeholders, optional?) groups, where a count of
+    -1 marks a repeatable group.
+    """
+    form = (usage or command_name).split("|")[0].split()
+    if form and form[0].lower() == command_name:
+        form = form[1:]
+    text = " ".join(form)
+    shape = []
+    position = 0
+    for match in _OPTIONAL.finditer(text):
+        shape.extend((1, False) for _ in text[position:match.start()].split())
+        inner = match.group(1).split()
+        repeat = "..." in inner
+        inner = [token for token in inner if token != "..."]
+        shape.append((-len(inner) if repeat else len(inner), True))
+        position = match.end()
+    shape.extend((1, False) for _ in text[position:].split())
+    return shape
+
+
+class WorkloadGenerator:
+    """
+    Reproducible stream of command lines. 'mix' maps command names to relative
+    weights (default: every command but the control commands, weight 1 each);
+    'invalid_ratio' and 'zero_division_ratio' are the shares of bad and
+    divide-by-zero lines, which come on top of the mix.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        mix: Optional[dict[str, float]] = None,
+        invalid_ratio: float = DEFAULT_INVALID_RATIO,
+        zero_division_ratio: float = DEFAULT_ZERO_DIVISION_RATIO,
+        skew: Optional[float] = None,
+        keys: int = DEFAULT_KEYS,
+        plugin_manager: Optional[PluginManager] = None,
+    ):
+        if invalid_ratio < 0 or zero_division_ratio < 0 or invalid_ratio + zero_division_ratio > 1:
+            raise ValueError("Invalid and divide-by-zero ratios must be non-negative and add up to at most 1.")
+        self.rng = random.Random(seed)
+        self.invalid_ratio = invalid_ratio
+        self.zero_division_ratio = zero_division_ratio
+        self.skew = skew
+        self.keys = keys
+        self._junk = _junk_source(seed)
+
+        mix = mix or {}
+        plugin_manager = plugin_manager or PluginManager.shared()
+        unknown = sorted(set(mix) - {info.name for info in plugin_manager.list_commands()})
+        if unknown:
+            raise ValueError(f"Unknown command in workload mix: {', '.join(unknown)}.")
+        self.shapes: dict[str, list[tuple[int, bool]]] = {}
+        weights = []
+        for info in sorted(plugin_manager.list_commands(), key=lambda info: info.name):
+            if mix:
+                weight = mix.get(info.name, 0.0)
+            else:
+                weight = 0.0 if info.name in CONTROL_COMMANDS else 1.0
+            if weight > 0:
+                self.shapes[info.name] = usage_shape(info.usage, info.name)
+                weights.append(weight)
+        if not self.shapes:
+            raise ValueError("The workload mix selects no commands.")
+        self.commands = list(self.shapes)
+        self._cum_weights = _cumulative(weights)
+        self._zero_divisor = zero_division_ratio > 0 and plugin_manager.get_command("divide") is not None
+
+        # Skewed mode: per-command pools of operand strings with Zipf popularity
+        self._pools: dict[str, list[str]] = {}
+        if skew is not None:
+            self._key_weights = _cumulative([1.0 / (rank + 1) ** skew for rank in range(keys)])
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            yield self.line()
+
+    def lines(self, count: int) -> list[str]:
+        """Returns the next 'count' lines of the stream."""
+        line = self.line
+        return [line() for _ in range(count)]
+
+    def line(self) -> str:
+        """Returns the next line of the stream."""
+        roll = self.rng.random()
+        if roll < self.invalid_ratio:
+            return self._invalid_line()
+        if self._zero_divisor and roll < self.invalid_ratio + self.zero_division_ratio:
+            return f"divide {self._number()} 0"
+        command = self.rng.choices(self.commands, cum_weights=self._cum_weights)[0]
+        if self.skew is None:
+            operands = self._operands(command)
+        else:
+            operands = self._skewed_operands(command)
+        return f"{command} {operands}" if operands else command
+
+    def _operands(self, command: str) -> str:
+        rng = self.rng
+        values = []
+        for count, optional in self.shapes[command]:
+            if optional and rng.random() < 0.5:
+                continue
+            if count < 0:
+                count = -count * rng.randint(1, MAX_REPEAT)
+            values.extend(self._number() for _ in range(count))
+        return " ".join(values)
+
+    def _skewed_operands(self, command: str) -> str:
+        pool = self._pools.get(command)
+        if pool is None:
+            pool = self._pools[command] = [self._operands(command) for _ in range(self.keys)]
+        return self.rng.choices(pool, cum_weights=self._key_weights)[0]
+
+    def _number(self) -> str:
+        rng = self.rng
+        if rng.random() < 0.5:
+            return str(rng.randint(-1000, 1000))
+        return f"{rng.uniform(-1000, 1000):.{rng.randint(1, 6)}f}"
+
+    def _invalid_line(self) -> str:
+        rng = self.rng
+        kind = rng.randrange(3)
+        if kind == 0:
+            # Unknown command
+            return f"{self._junk()} {self._number()}"
+        command = rng.choice(self.commands)
+        operands = self._operands(command).split()
+        if kind == 1 and operands:
+            # A non-numeric operand
+            operands[rng.randrange(len(operands))] = self._junk()
+        else:
+            # Wrong argument count: one too many for fixed-arity commands, none for the rest
+            operands = operands + [self._number()] if all(count > 0 for count, _ in self.shapes[command]) else []
+        return " ".join([command, *operands])
+
+
+def _cumulative(weights: list[float]) -> list[float]:
+    total = 0.0
+    cumulative = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def _junk_source(seed: int):
+    """Returns a function producing junk words: Faker words when installed, else random letters."""
+    try:
+        from faker import Faker  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        rng = random.Random(seed)
+        return lambda: "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+    fake = Faker()
+    fake.seed_instance(seed)
+    return fake.word
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Print a seeded synthetic command stream.")
+    parser.add_argument("count", nargs="?", type=int, default=1000)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    generator = from_arguments(args)
+    sys.stdout.write("\n".join(generator.lines(args.count)) + "\n")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the generator options, shared with benchmarks.soak."""
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default 0).")
+    parser.add_argument("--mix", type=parse_mix, default={}, metavar="CMD=WEIGHT,...",
+                        help="Commands to use, with relative weights (default: all but the control commands, equally).")
+    parser.add_argument("--invalid", type=float, default=DEFAULT_INVALID_RATIO, metavar="RATIO",
+                        help=f"Share of invalid lines (default {DEFAULT_INVALID_RATIO}).")
+    parser.add_argument("--zero-division", type=float, default=DEFAULT_ZERO_DIVISION_RATIO, metavar="RATIO",
+                        help=f"Share of divide-by-zero lines (default {DEFAULT_ZERO_DIVISION_RATIO}).")
+    parser.add_argument("--skew", type=float, default=None, metavar="S",
+                        help="Draw operands from a fixed key set with Zipf exponent S (e.g. 1.1).")
+    parser.add_argument("--keys", type=int, default=DEFAULT_KEYS, help=f"Key set size with --skew (default {DEFAULT_KEYS}).")
+
+
+def from_arguments(args: argparse.Namespace) -> WorkloadGenerator:
+    """Builds a generator from the options added by add_arguments()."""
+    return WorkloadGenerator(args.seed, args.mix, args.invalid, args.zero_division, args.skew, args.keys)
+
+
+if __name__ == "__main__":
+    main()
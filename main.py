@@ -1,40 +1,242 @@
 # main.py
+# Only what every launch needs is imported up front; each mode, optional
+# feature and dependency is imported when it is actually used, so short batch
+# runs do not pay for asyncio, multiprocessing, dotenv or logging.config.
+# pylint: disable=import-outside-toplevel
+import argparse
+import atexit
 import os
+import sys
 import logging
-import logging.config
-from dotenv import load_dotenv
 
-# Import your REPL app
-from app.app import App
+from app.batch import ERROR_POLICIES, ON_ERROR_REPORT
+from app.encoders import FORMATS
+from app.log_config import configure_logging, pipeline_requested
+from app.parallel import DEFAULT_CHUNK_SIZE
 
-def setup_logging():
+def find_dotenv_file():
+    # Same search as python-dotenv's find_dotenv(): from this file's directory upwards
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
 
-    if os.path.isfile("logging.conf"):
-        logging.config.fileConfig("logging.conf", disable_existing_loggers=False)
-        logging.info("Loaded logging configuration from logging.conf.")
+def setup_logging(console_to_stderr=False):
+
+    # Parsed logging.conf is cached in __pycache__/ and only re-read when it changes
+    pipeline_settings = configure_logging("logging.conf")
+    if pipeline_settings is not None:
+        message = "Loaded logging configuration from logging.conf."
     else:
         logging.basicConfig(
             level=logging.INFO,
             format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
         )
-        logging.info("No logging.conf found. Using basicConfig instead.")
+        message = "No logging.conf found. Using basicConfig instead."
+    if console_to_stderr:
+        move_console_logging_to_stderr()
+    # Optional background queue and success-message sampling ([app_logging] / LOG_* env vars)
+    if pipeline_requested(pipeline_settings or {}, os.environ):
+        from app.log_pipeline import configure_log_pipeline, load_pipeline_config
+        configure_log_pipeline(load_pipeline_config("logging.conf"))
+    logging.info(message)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive plugin-based calculator.")
+    parser.add_argument(
+        "--batch", metavar="FILE|-",
+        help="Run commands non-interactively from FILE, or from stdin when '-' is given."
+    )
+    parser.add_argument(
+        "--on-error", choices=ERROR_POLICIES, default=ON_ERROR_REPORT,
+        help="Batch mode error policy: stop at the first error, skip bad lines, "
+             "or report them on stderr (default)."
+    )
+    parser.add_argument(
+        "--format", choices=FORMATS, default=None, dest="output_format",
+        help="How results are written: human-readable text (default), JSON Lines, CSV "
+             "or raw numbers. Also set by OUTPUT_FORMAT."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="Batch mode: execute FILE on N worker processes (0 = one per CPU). "
+             "Results keep the input order. Default: 1."
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, metavar="BYTES",
+        help=f"Parallel batch mode: bytes of input handed to a worker at a time (default {DEFAULT_CHUNK_SIZE})."
+    )
+    parser.add_argument(
+        "--binary", nargs=2, metavar=("INPUT", "OUTPUT"),
+        help="Apply the command named in a binary operand file (packed float64 columns) "
+             "and write the results to OUTPUT in the same format."
+    )
+    parser.add_argument(
+        "--serve", nargs="?", const="127.0.0.1:7777", metavar="HOST:PORT|unix:PATH",
+        help="Serve calculator sessions over TCP or a Unix socket instead of the console (default 127.0.0.1:7777)."
+    )
+    parser.add_argument(
+        "--max-pipeline", type=int, default=None, metavar="N",
+        help="Server mode: unanswered requests read ahead per connection (default 128)."
+    )
+    args = parser.parse_args(argv)
+    if sum(1 for mode in (args.batch, args.serve, args.binary) if mode) > 1:
+        parser.error("--batch, --binary and --serve cannot be combined.")
+    if args.workers != 1 and (not args.batch or args.batch == "-"):
+        parser.error("--workers needs --batch with an input file (stdin cannot be split).")
+    return args
+
+def move_console_logging_to_stderr():
+    # In batch mode stdout carries results only
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and getattr(handler, "stream", None) is sys.stdout:
+            handler.setStream(sys.stderr)
+
+def run_batch(source, on_error, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, output_format="text"):
+    if workers != 1:
+        from app.parallel import ParallelRunner
+        runner = ParallelRunner(workers or None, chunk_size, on_error, output_format=output_format)
+    else:
+        from app.batch import BatchRunner
+        from app.encoders import get_encoder
+        runner = BatchRunner(on_error=on_error, encoder=get_encoder(output_format))
+    # One large buffered writer for all results instead of a flush per line
+    out = open(sys.stdout.fileno(), "w", buffering=1 << 16, closefd=False)
+    try:
+        if workers != 1:
+            stats = runner.run(source, out, sys.stderr)
+        elif source == "-":
+            stats = runner.run(sys.stdin, out, sys.stderr)
+        else:
+            with open(source, "r", buffering=1 << 16) as stream:
+                stats = runner.run(stream, out, sys.stderr)
+    finally:
+        out.close()
+    return 1 if stats.stopped else 0
+
+def run_server(address, max_pipeline=None):
+    import asyncio
+    import signal
+    from app.server import DEFAULT_MAX_PIPELINE, serve
+
+    max_pipeline = max_pipeline or DEFAULT_MAX_PIPELINE
+
+    async def serve_until_signalled():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        await serve(address, max_pipeline, stop)
+    asyncio.run(serve_until_signalled())
+    return 0
 
-def main():
-    # 1) Load environment variables
-    load_dotenv()  # loads from .env by default
+def main(argv=None):
+    args = parse_args(argv)
+
+    # 1) Load environment variables (python-dotenv is only imported if there is a .env file)
+    dotenv_path = find_dotenv_file()
+    if dotenv_path:
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path)
     env_name = os.getenv("ENV_NAME", "unknown-env")
+    output_format = args.output_format or os.getenv("OUTPUT_FORMAT", "text").lower()
+    if output_format not in FORMATS:
+        sys.exit(f"Unknown OUTPUT_FORMAT '{output_format}'. Expected one of: {', '.join(FORMATS)}.")
     log_level = os.getenv("LOG_LEVEL", "INFO")
 
     # 2) Configure logging
-    setup_logging()
+    setup_logging(console_to_stderr=bool(args.batch or args.serve or args.binary))
     logger = logging.getLogger(__name__)
     logger.setLevel(log_level)
 
     # 3) Log environment
     logger.info("Starting Calculator REPL in environment: %s", env_name)
 
-    # 4) Start the application
-    App.start()
+    # 4) Optionally hot-reload edited plugins while the session runs
+    if os.getenv("PLUGIN_HOT_RELOAD", "").lower() in ("1", "true", "yes"):
+        from app.commands.plugin_manager import PluginManager
+        PluginManager.shared().start_watcher(float(os.getenv("PLUGIN_RELOAD_INTERVAL", "1.0")))
+
+    # 5) Optionally collect per-command metrics, with a periodic Prometheus dump
+    if os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes"):
+        from app import metrics
+        collected = metrics.enable()
+        if os.getenv("METRICS_FILE"):
+            exporter = metrics.PrometheusFileExporter(
+                collected, os.getenv("METRICS_FILE"), float(os.getenv("METRICS_INTERVAL", "15"))
+            )
+            exporter.start()
+            atexit.register(exporter.stop)
+
+    # 6) Optionally memoize pure commands in a bounded LRU cache
+    if os.getenv("RESULT_CACHE_ENABLED", "").lower() in ("1", "true", "yes"):
+        from app import result_cache
+        ttl = os.getenv("RESULT_CACHE_TTL")
+        result_cache.enable(int(os.getenv("RESULT_CACHE_SIZE", "1024")), float(ttl) if ttl else None)
+
+    # 7) Optionally profile commands from the start (also switchable with 'profile on' / 'memprofile on')
+    cpu_profiling = os.getenv("PROFILE_ENABLED", "").lower() in ("1", "true", "yes")
+    memory_profiling = os.getenv("MEMPROFILE_ENABLED", "").lower() in ("1", "true", "yes")
+    if cpu_profiling or memory_profiling or os.getenv("PROFILE_DIR"):
+        from app import profiling
+        if os.getenv("PROFILE_DIR"):
+            profiling.set_directory(os.getenv("PROFILE_DIR"))
+        if cpu_profiling:
+            profiling.start_cpu()
+        if memory_profiling:
+            profiling.start_memory()
+
+    # 8) Numeric backend of the arithmetic commands (float unless configured; see app.numeric)
+    if os.getenv("NUMERIC_BACKEND") or os.getenv("DECIMAL_PRECISION") or os.getenv("DECIMAL_ROUNDING"):
+        from app import numeric
+        precision = os.getenv("DECIMAL_PRECISION")
+        try:
+            numeric.configure(
+                os.getenv("NUMERIC_BACKEND", "decimal"),
+                int(precision) if precision else None,
+                os.getenv("DECIMAL_ROUNDING") or None,
+            )
+        except ValueError as exc:
+            sys.exit(f"Invalid numeric backend settings: {exc}")
+
+    # 9) Run plugins that declare themselves thread- or process-bound on worker pools, with deadlines
+    from app import scheduler
+    timeout = os.getenv("COMMAND_TIMEOUT")
+    scheduler.enable(
+        int(os.getenv("COMMAND_WORKERS", str(scheduler.DEFAULT_WORKERS))),
+        (float(timeout) or None) if timeout else scheduler.DEFAULT_TIMEOUT,
+    )
+
+    # 10) Start the application
+    try:
+        if args.batch:
+            sys.exit(run_batch(args.batch, args.on_error, args.workers, args.chunk_size, output_format))
+        if args.binary:
+            from app.binfmt import run_binary
+            try:
+                stats = run_binary(*args.binary)
+            except (ValueError, OSError) as exc:
+                logger.error("Binary run failed: %s", exc)
+                sys.exit(f"Error: {exc}")
+            logger.info("Binary run finished: %d rows, %d failed.", stats.rows, stats.failed)
+            sys.exit(0)
+        if args.serve:
+            sys.exit(run_server(args.serve, args.max_pipeline))
+        # Interactive session: history ring size and optional persistent binary log
+        if os.getenv("HISTORY_FILE") or os.getenv("HISTORY_SIZE"):
+            from app import history
+            history.enable(int(os.getenv("HISTORY_SIZE", str(history.DEFAULT_CAPACITY))), os.getenv("HISTORY_FILE") or None)
+        from app.app import App
+        App.start(output_format)
+    finally:
+        # Also reached through sys.exit(); stops the worker pools
+        scheduler.disable()
+
 
 if __name__ == "__main__":
     main()
@@ -153,6 +153,19 @@ def test_app_start_exit_command(capfd, monkeypatch):
     assert "Welcome to the Interactive Calculator. Type 'exit' to exit." in out
     assert "Exiting the interactive calculator..." in out
 
+def test_app_start_stops_only_its_own_scheduler(monkeypatch):
+    """The REPL runs pooled commands on a scheduler for as long as it runs, unless one is already active."""
+    from app import scheduler
+    monkeypatch.setattr('builtins.input', lambda _: 'exit')
+    App.start()
+    assert scheduler.active() is None
+    started = scheduler.enable()
+    try:
+        App.start()
+        assert scheduler.active() is started
+    finally:
+        scheduler.disable()
+
 def test_app_start_unknown_command(capfd, monkeypatch):
     """Test how the REPL handles an unknown command before exiting."""
     # Simulate user entering an unknown command followed by 'exit'
@@ -165,3 +178,13 @@ def test_app_start_unknown_command(capfd, monkeypatch):
     assert "Welcome to the Interactive Calculator. Type 'exit' to exit." in out
     assert "Unknown command. Type 'menu' to see available commands, or 'exit' to quit." in out
     assert "Exiting the interactive calculator..." in out
+
+def test_app_nested_and_infix_expressions(capfd, monkeypatch):
+    """Expressions are evaluated through the expression engine with the REPL's error handling."""
+    inputs = iter(["add 1 (multiply 2 (divide 9 3))", "1 + 2*3", "(1 + ", "exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    App.start()
+    out, err = capfd.readouterr()
+    assert "add 1 (multiply 2 (divide 9 3)) = 7.0" in out
+    assert "1 + 2*3 = 7.0" in out
+    assert "Error: Invalid expression" in out
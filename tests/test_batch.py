@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from app.batch import BatchRunner, iter_command_lines
+
+
+def test_iter_command_lines_skips_blank_and_stops_at_exit():
+    stream = io.StringIO("add 1 2\n\n  \nmultiply 2 3\nexit\nadd 9 9\n")
+    assert list(iter_command_lines(stream)) == [(1, "add 1 2"), (4, "multiply 2 3")]
+
+
+def test_batch_runner_writes_results_without_banner():
+    out = io.StringIO()
+    stats = BatchRunner().run(io.StringIO("add 1 2\nsubtract 9 4\n"), out)
+    assert out.getvalue() == "1.0 + 2.0 = 3.0\n9.0 - 4.0 = 5.0\n"
+    assert (stats.processed, stats.succeeded, stats.failed, stats.stopped) == (2, 2, 0, False)
+
+
+def test_batch_runner_report_policy_writes_errors_with_line_numbers():
+    out, err = io.StringIO(), io.StringIO()
+    stats = BatchRunner(on_error="report").run(
+        io.StringIO("divide 1 0\nbogus 1\nadd abc 1\nadd 1 1\n"), out, err
+    )
+    assert out.getvalue() == "1.0 + 1.0 = 2.0\n"
+    assert err.getvalue().splitlines() == [
+        "line 1: Error: Cannot divide by zero.",
+        "line 2: Unknown command. Type 'menu' to see available commands, or 'exit' to quit.",
+        "line 3: Error: Invalid numeric input for add command.",
+    ]
+    assert stats.failed == 3
+
+
+def test_batch_runner_skip_policy_drops_bad_lines():
+    out, err = io.StringIO(), io.StringIO()
+    stats = BatchRunner(on_error="skip").run(io.StringIO("divide 1 0\nadd 1 1\n"), out, err)
+    assert out.getvalue() == "1.0 + 1.0 = 2.0\n"
+    assert err.getvalue() == ""
+    assert stats.failed == 1 and not stats.stopped
+
+
+def test_batch_runner_stop_policy_aborts_on_first_error():
+    out, err = io.StringIO(), io.StringIO()
+    stats = BatchRunner(on_error="stop").run(io.StringIO("add 1 1\ndivide 1 0\nadd 2 2\n"), out, err)
+    assert out.getvalue() == "1.0 + 1.0 = 2.0\n"
+    assert err.getvalue() == "line 2: Error: Cannot divide by zero.\n"
+    assert stats.stopped and stats.processed == 2
+
+
+def test_batch_runner_flushes_in_chunks():
+    class CountingWriter(io.StringIO):
+        writes = 0
+
+        def write(self, s):
+            CountingWriter.writes += 1
+            return super().write(s)
+
+    out = CountingWriter()
+    BatchRunner(flush_every=100).run(io.StringIO("add 1 1\n" * 250), out)
+    assert out.getvalue().count("\n") == 250
+    assert CountingWriter.writes == 3
+
+
+def test_batch_runner_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        BatchRunner(on_error="ignore")
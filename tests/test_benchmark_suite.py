@@ -0,0 +1,22 @@
+from benchmarks.suite import compare, format_value, metric
+
+
+def results(**values):
+    return {"metrics": {name: metric(value, *spec) for name, (value, *spec) in values.items()}}
+
+
+def test_compare_flags_regressions_in_both_directions():
+    baseline = results(latency=(1.0, "s"), throughput=(100.0, "lines/s", "higher"), startup=(1.0, "s"))
+    current = results(latency=(1.3, "s"), throughput=(70.0, "lines/s", "higher"), startup=(0.5, "s"), new=(1.0, "s"))
+    rows = {name: (round(change, 2), regressed) for name, _, _, change, regressed in compare(baseline, current, 0.25)}
+    assert rows == {"latency": (0.3, True), "throughput": (0.3, True), "startup": (-0.5, False)}
+
+
+def test_compare_threshold_is_configurable():
+    baseline, current = results(latency=(1.0, "s")), results(latency=(1.3, "s"))
+    assert not compare(baseline, current, threshold=0.5)[0][4]
+
+
+def test_format_value():
+    assert format_value(0.0000025, "s") == "2.50µs"
+    assert format_value(1234567, "lines/s") == "1,234,567 lines/s"
@@ -0,0 +1,111 @@
+import math
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import binfmt, vectorized
+from app.commands.command_interface import CommandInterface
+from app.commands.menu_command import MenuCommand
+from app.commands.plugin_manager import PluginManager
+from benchmarks import import_budget
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Runs each test against the NumPy kernels (when installed) and the pure-Python fallback."""
+    if request.param == "numpy":
+        if vectorized.load_numpy() is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(vectorized, "load_numpy", lambda: None)
+    return request.param
+
+
+def test_header_round_trip():
+    header = binfmt.decode_header(binfmt.encode_header("divide", 2, 3) + bytes(48))
+    assert header == binfmt.BinaryHeader("divide", 2, 3, 32)
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"", "too short"),
+    (b"NOTCALC!" + bytes(16), "bad magic"),
+    (binfmt.encode_header("add", 2, 10), "truncated"),
+])
+def test_decode_header_rejects_bad_files(data, message):
+    with pytest.raises(ValueError, match=message):
+        binfmt.decode_header(data)
+
+
+def test_run_binary_writes_values_and_mask(tmp_path, backend):
+    source, target = tmp_path / "in.bin", tmp_path / "out.bin"
+    binfmt.write_columns(str(source), "divide", [10, 1, 9, 8, 6], [2, 0, 3, 4, 0])
+    stats = binfmt.run_binary(str(source), str(target), PluginManager(), block_rows=2)
+    header, (values, mask) = binfmt.read_columns(str(target))
+    assert stats == binfmt.BinaryStats(5, 2)
+    assert (header.command, header.columns, header.rows) == ("divide", 2, 5)
+    assert mask == [0.0, 1.0, 0.0, 0.0, 1.0]
+    assert [values[0], values[2], values[3]] == [5.0, 3.0, 2.0]
+    assert math.isnan(values[1]) and math.isnan(values[4])
+
+
+def test_run_binary_resolves_aliases_and_empty_files(tmp_path):
+    source, target = tmp_path / "in.bin", tmp_path / "out.bin"
+    binfmt.write_columns(str(source), "*", [1.5, 2], [2, 2])
+    binfmt.run_binary(str(source), str(target), PluginManager())
+    assert binfmt.read_columns(str(target))[1] == [[3.0, 4.0], [0.0, 0.0]]
+
+    binfmt.write_columns(str(source), "add", [], [])
+    assert binfmt.run_binary(str(source), str(target), PluginManager()) == binfmt.BinaryStats(0, 0)
+
+
+def test_batch_function_falls_back_to_compute_and_rejects_other_commands():
+    class Square(CommandInterface):
+        name = "square"
+
+        def execute(self, args):
+            return str(self.compute(float(args[0])))
+
+        def compute(self, x):
+            return x * x
+
+    values, mask = binfmt.batch_function(Square())([1.0, 3.0])
+    assert (values, mask) == ([1.0, 9.0], [False, False])
+
+    with pytest.raises(ValueError, match="does not support binary operands"):
+        binfmt.batch_function(MenuCommand())
+
+
+def test_run_binary_unknown_command(tmp_path):
+    source = tmp_path / "in.bin"
+    binfmt.write_columns(str(source), "bogus", [1.0])
+    with pytest.raises(ValueError, match="Unknown command 'bogus'"):
+        binfmt.run_binary(str(source), str(tmp_path / "out.bin"), PluginManager())
+
+
+def test_run_binary_reports_command_and_file_errors(tmp_path, backend):
+    source, target = tmp_path / "in.bin", tmp_path / "out.bin"
+    binfmt.write_columns(str(source), "divide", [1.0, 2.0], [1.0, 2.0], [3.0, 4.0])
+    with pytest.raises(ValueError, match="Invalid number of operand columns for divide command"):
+        binfmt.run_binary(str(source), str(target), PluginManager(), block_rows=1)
+
+    binfmt.write_columns(str(source), "divide", [1.0] * 10, [2.0] * 10)
+    source.write_bytes(source.read_bytes()[:-12])
+    with pytest.raises(ValueError, match="truncated column data"):
+        binfmt.run_binary(str(source), str(target), PluginManager())
+    source.write_bytes(b"")
+    with pytest.raises(ValueError, match="too short for a header"):
+        binfmt.run_binary(str(source), str(target), PluginManager())
+
+
+def test_main_exits_with_the_error_message(tmp_path):
+    source = tmp_path / "in.bin"
+    binfmt.write_columns(str(source), "divide", [1.0], [1.0], [1.0])
+    main = os.path.join(import_budget.REPO_ROOT, "main.py")
+    done = subprocess.run(
+        [sys.executable, main, "--binary", str(source), str(tmp_path / "out.bin")],
+        cwd=tmp_path, capture_output=True, text=True, check=False,
+    )
+    assert done.returncode == 1
+    assert done.stderr.splitlines()[-1] == "Error: Invalid number of operand columns for divide command. Usage: divide <num1> <num2>."
@@ -0,0 +1,57 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app import CalculationResult, Calculator, numeric
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import UnknownCommandError
+
+
+@pytest.fixture
+def calculator():
+    return Calculator(PluginManager())
+
+
+def test_evaluate_returns_raw_numbers(calculator):
+    assert calculator.evaluate("add", 1.5, 2) == CalculationResult(3.5)
+    assert calculator.evaluate("divide", 1, 4).value == 0.25
+    assert calculator.evaluate("*", 3, 4).unwrap() == 12
+
+
+def test_evaluate_returns_errors_as_values(calculator):
+    result = calculator.evaluate("divide", 1, 0)
+    assert not result.ok and isinstance(result.error, ZeroDivisionError)
+    with pytest.raises(ZeroDivisionError):
+        result.unwrap()
+    assert isinstance(calculator.evaluate("bogus", 1).error, UnknownCommandError)
+    assert "no numeric form" in str(calculator.evaluate("menu").error)
+    assert "Invalid arguments for add command" in str(calculator.evaluate("add", 1).error)
+
+
+def test_evaluate_never_goes_through_strings(calculator, monkeypatch):
+    command_class = type(calculator.command("add"))
+    monkeypatch.setattr(command_class, "execute", lambda self, args: pytest.fail("execute() called"))
+    assert calculator.evaluate("add", 2, 2).value == 4
+
+
+def test_evaluate_many_keeps_order_and_isolates_failures(calculator):
+    results = calculator.evaluate_many("divide", [(1, 2), (1, 0), (9, 3)])
+    assert [result.value for result in results] == [0.5, None, 3.0]
+    assert [result.ok for result in results] == [True, False, True]
+    assert all(not result.ok for result in calculator.evaluate_many("bogus", [(1, 2), (3, 4)]))
+
+
+def test_evaluate_uses_the_active_numeric_backend(calculator):
+    numeric.configure("decimal", 5, "half_up")
+    try:
+        assert calculator.evaluate("divide", 2, 3).value == Decimal("0.66667")
+        assert calculator.evaluate("add", 0.1, 0.2).value == Decimal("0.3")
+        assert [r.value for r in calculator.evaluate_many("multiply", [(1.1, 3), (Decimal("2.5"), "2")])] == [
+            Decimal("3.3"), Decimal("5.0"),
+        ]
+        assert isinstance(calculator.evaluate("add", "x", 1).error, ValueError)
+        numeric.configure("fraction")
+        assert calculator.evaluate("divide", 1, 3).value == Fraction(1, 3)
+    finally:
+        numeric.configure()
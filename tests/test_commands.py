@@ -4,7 +4,7 @@ from app.commands.subtract_command import SubtractCommand
 from app.commands.multiply_command import MultiplyCommand
 from app.commands.divide_command import DivideCommand
 from app.commands.menu_command import MenuCommand
-from app.commands.plugin_manager import PluginManager
+from app.commands.plugin_manager import CommandInfo, PluginManager
 
 def test_add_command_success():
     cmd = AddCommand()
@@ -80,27 +80,30 @@ def test_divide_command_zero_division():
 def test_menu_command_success(monkeypatch):
     """
     Test that the menu command returns available commands.
-    We'll monkeypatch the plugin manager so it returns a known set of commands.
+    We'll monkeypatch the shared registry's listing so it returns a known set of commands.
     """
-    # Possibly patch PluginManager to avoid scanning the actual filesystem
-    original_init = PluginManager.__init__
-    
-    def mock_init(self):
-        self._commands = {
-            "add": AddCommand,
-            "subtract": SubtractCommand,
-            "menu": MenuCommand
-        }
-
-    monkeypatch.setattr(PluginManager, "__init__", mock_init)
+    listing = (
+        CommandInfo("add", "add x y", "add_command", "AddCommand"),
+        CommandInfo("menu", "menu", "menu_command", "MenuCommand"),
+        CommandInfo("subtract", "subtract x y", "subtract_command", "SubtractCommand"),
+    )
+    monkeypatch.setattr(PluginManager, "list_commands", lambda self: listing)
 
     cmd = MenuCommand()
     result = cmd.execute([])
     # The commands are "add", "subtract", "menu" (sorted: add, menu, subtract)
     assert "add, menu, subtract" in result
+    assert "  subtract x y" in result
 
-    # revert PluginManager.__init__ so other tests aren't affected
-    monkeypatch.setattr(PluginManager, "__init__", original_init)
+def test_menu_command_uses_shared_registry(monkeypatch):
+    """The menu must not rebuild the PluginManager on every call."""
+    PluginManager.shared()
+    constructed = []
+    original_init = PluginManager.__init__
+    monkeypatch.setattr(PluginManager, "__init__", lambda self, *a, **kw: constructed.append(1) or original_init(self, *a, **kw))
+    MenuCommand().execute([])
+    MenuCommand().execute([])
+    assert constructed == []
 
 def test_menu_command_with_args():
     cmd = MenuCommand()
@@ -0,0 +1,60 @@
+import pytest
+
+from app.commands.add_command import AddCommand
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import Dispatcher, UnknownCommandError, error_message
+
+
+def test_dispatch_folds_case_and_resolves_aliases():
+    dispatcher = Dispatcher()
+    assert dispatcher.dispatch("ADD 1 2") == "1.0 + 2.0 = 3.0"
+    assert dispatcher.dispatch("+ 1 2") == "1.0 + 2.0 = 3.0"
+    assert dispatcher.dispatch("/ 9 3") == "9.0 / 3.0 = 3.0"
+    assert dispatcher.dispatch("   ") is None
+
+
+def test_stateless_commands_reuse_one_instance():
+    dispatcher = Dispatcher()
+    handler = dispatcher.resolve("add")
+    assert isinstance(handler.__self__, AddCommand)
+    assert dispatcher.resolve("Add") is handler
+    assert dispatcher.resolve("+") is handler
+
+
+def test_stateful_commands_get_a_new_instance_per_call(monkeypatch):
+    instances = []
+
+    class CountingCommand:
+        def __init__(self):
+            instances.append(self)
+
+        def execute(self, args):
+            return str(len(instances))
+
+    monkeypatch.setattr(PluginManager, "get_command", lambda self, name: CountingCommand if name == "count" else None)
+    dispatcher = Dispatcher(PluginManager())
+    assert dispatcher.execute("count", []) == "1"
+    assert dispatcher.execute("count", []) == "2"
+
+
+def test_unknown_command_raises():
+    with pytest.raises(UnknownCommandError):
+        Dispatcher().dispatch("bogus 1 2")
+
+
+def test_table_is_rebuilt_after_plugins_change():
+    pm = PluginManager()
+    dispatcher = Dispatcher(pm)
+    handler = dispatcher.resolve("add")
+    pm.generation += 1
+    assert dispatcher.resolve("add") is not handler
+
+
+@pytest.mark.parametrize("exc, message", [
+    (UnknownCommandError("x"), "Unknown command. Type 'menu' to see available commands, or 'exit' to quit."),
+    (ValueError("bad"), "Error: bad"),
+    (ZeroDivisionError(), "Error: Cannot divide by zero."),
+    (RuntimeError("boom"), "Unexpected error: boom"),
+])
+def test_error_message(exc, message):
+    assert error_message(exc) == message
@@ -0,0 +1,120 @@
+import io
+import json
+
+import pytest
+
+from app import App, history, numeric
+from app.batch import BatchRunner
+from app.commands.add_command import AddCommand
+from app.commands.sum_command import SumCommand
+from app.dispatcher import Dispatcher
+from app.encoders import ResultWriter, encode, get_encoder
+from app.results import CommandResult
+
+
+def test_command_result_formats_lazily_and_equals_its_text():
+    result = AddCommand().execute(["3", "4"])
+    assert isinstance(result, CommandResult)
+    assert (result.command, result.operands, result.value) == ("add", (3.0, 4.0), 7.0)
+    assert result == "3.0 + 4.0 = 7.0"
+    assert str(result) == "3.0 + 4.0 = 7.0"
+    assert hash(result) == hash("3.0 + 4.0 = 7.0")
+    assert float(result) == 7.0
+
+
+def test_aggregate_result_keeps_only_the_count():
+    result = SumCommand().execute(["1", "2", "3"])
+    assert result.operands is None and result.count == 3
+    assert result.as_dict() == {"command": "sum", "count": 3, "value": 6.0}
+    assert str(result) == "sum of 3 values = 6.0"
+
+
+def test_expression_result_escapes_percent_signs():
+    assert str(Dispatcher().dispatch("1 + 2*3")) == "1 + 2*3 = 7.0"
+    assert str(CommandResult("expression", (), 1.0, "50%% off = %s")) == "50% off = 1.0"
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("text", "1.0 / 4.0 = 0.25"),
+    ("raw", "0.25"),
+    ("jsonl", '{"command": "divide", "operands": [1.0, 4.0], "value": 0.25}'),
+    ("csv", "divide,0.25,1.0,4.0"),
+])
+def test_encoders(name, expected):
+    assert encode(Dispatcher().dispatch("divide 1 4"), name) == expected
+
+
+@pytest.mark.parametrize("backend, line, expected", [
+    ("float", "divide 1 4", ["1.0 / 4.0 = 0.25", "0.25",
+                             '{"command": "divide", "operands": [1.0, 4.0], "value": 0.25}', "divide,0.25,1.0,4.0"]),
+    ("decimal", "add 0.10 0.20", ["0.10 + 0.20 = 0.30", "0.30",
+                                  '{"command": "add", "operands": ["0.10", "0.20"], "value": "0.30"}', "add,0.30,0.10,0.20"]),
+    ("fraction", "divide 1 3", ["1 / 3 = 1/3", "1/3",
+                                '{"command": "divide", "operands": ["1", "3"], "value": "1/3"}', "divide,1/3,1,3"]),
+    ("decimal", "sum 0.1 0.2", ["sum of 2 values = 0.3", "0.3",
+                                '{"command": "sum", "count": 2, "value": "0.3"}', "sum,0.3"]),
+    ("fraction", "1/2 + 1/3", ["1/2 + 1/3 = 5/6", "5/6",
+                               '{"command": "expression", "operands": [], "value": "5/6"}', "expression,5/6"]),
+])
+def test_encoders_under_each_backend(backend, line, expected):
+    numeric.configure(backend)
+    try:
+        output = Dispatcher().dispatch(line)
+        encoded = [encode(output, name) for name in ("text", "raw", "jsonl", "csv")]
+    finally:
+        numeric.configure()
+    assert encoded == expected
+    # Exact values survive a JSON round trip
+    assert str(json.loads(encoded[2])["value"]) == expected[1]
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("text", 'menu, "help"'),
+    ("raw", 'menu, "help"'),
+    ("jsonl", '{"output": "menu, \\"help\\""}'),
+    ("csv", '"menu, ""help"""'),
+])
+def test_plain_string_outputs_stay_supported(name, expected):
+    assert get_encoder(name).encode('menu, "help"') == expected
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown output format 'xml'"):
+        get_encoder("xml")
+
+
+def test_writer_emits_csv_header_once():
+    stream = io.StringIO()
+    writer = ResultWriter(stream, get_encoder("csv"))
+    writer.write(Dispatcher().dispatch("add 1 2"))
+    writer.write_many([Dispatcher().dispatch("multiply 2 3"), "note"])
+    assert stream.getvalue() == "command,value,operands\nadd,3.0,1.0,2.0\nmultiply,6.0,2.0,3.0\nnote\n"
+
+
+def test_batch_runner_jsonl():
+    out = io.StringIO()
+    BatchRunner(encoder=get_encoder("jsonl")).run(io.StringIO("add 1 2\nsum 1 2\n"), out)
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {"command": "add", "operands": [1.0, 2.0], "value": 3.0},
+        {"command": "sum", "count": 2, "value": 3.0},
+    ]
+
+
+def test_repl_raw_format(capfd, monkeypatch):
+    inputs = iter(["multiply 3 4", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    try:
+        App.start("raw")
+    finally:
+        history.disable()
+    out, _ = capfd.readouterr()
+    assert "12.0\n" in out and "3.0 * 4.0" not in out
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("raw", "[nan 2.0]"),
+    ("jsonl", '{"command": "divide", "operands": [[2.0, 4.0], [0.0, 2.0]], "value": [null, 2.0], "errors": [0]}'),
+    ("csv", "divide,[nan 2.0],[2.0 4.0],[0.0 2.0]"),
+])
+def test_vector_results_keep_every_element(name, expected):
+    assert encode(Dispatcher().dispatch("divide 2,4 0,2"), name) == expected
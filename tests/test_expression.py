@@ -0,0 +1,65 @@
+import pytest
+
+from app.commands.divide_command import DivideCommand
+from app.dispatcher import Dispatcher
+from app.expression import Call, ExpressionEngine, Number, parse
+
+
+def test_parse_prefix_and_infix_forms():
+    assert parse("add 1 (multiply 2 3)") == Call("add", (Number(1.0), Call("multiply", (Number(2.0), Number(3.0)))))
+    assert parse("1 + 2*3") == Call("add", (Number(1.0), Call("multiply", (Number(2.0), Number(3.0)))))
+    assert parse("-(4 - 1)") == Call("subtract", (Number(0.0), Call("subtract", (Number(4.0), Number(1.0)))))
+    assert parse("subtract 5 -3") == Call("subtract", (Number(5.0), Number(-3.0)))
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("add 1 (multiply 2 (divide 9 3))", 7.0),
+    ("1 + 2*3", 7.0),
+    ("(1 + 2) * 3", 9.0),
+    ("10 / 4 - 0.5", 2.0),
+    ("2 * (add 1 (3 - 1))", 6.0),
+    ("1e3 / -10", -100.0),
+])
+def test_evaluate(source, expected):
+    assert ExpressionEngine().evaluate(source) == expected
+
+
+@pytest.mark.parametrize("source, message", [
+    ("(1 + 2", "unexpected end of input"),
+    ("1 + ", "unexpected end of input"),
+    ("1 $ 2", "unexpected '$'"),
+    ("bogus 1 2", "Unknown command 'bogus'"),
+    ("add 1 2 3", "Invalid number of arguments for add"),
+    ("menu", "cannot be used inside an expression"),
+])
+def test_invalid_expressions_raise_value_error(source, message):
+    with pytest.raises(ValueError) as exc:
+        ExpressionEngine().evaluate(source)
+    assert message in str(exc.value)
+
+
+def test_constant_folding_and_plan_cache(monkeypatch):
+    engine = ExpressionEngine()
+    assert engine.fold(parse("add 1 (multiply 2 3)")) == Number(7.0)
+    plan = engine.compile("1 + 2*3")
+    assert engine.compile("1 + 2*3") is plan
+
+    # Folded plans never call back into the plugins
+    calls = []
+    monkeypatch.setattr(DivideCommand, "compute", lambda self, x, y: calls.append((x, y)) or x / y)
+    assert plan() == 7.0
+    assert calls == []
+
+
+def test_division_by_zero_is_not_folded_and_raises_at_evaluation():
+    engine = ExpressionEngine()
+    assert engine.fold(parse("1 / 0")) == Call("divide", (Number(1.0), Number(0.0)))
+    with pytest.raises(ZeroDivisionError):
+        engine.evaluate("add 1 (divide 1 0)")
+
+
+def test_dispatcher_routes_expressions():
+    dispatcher = Dispatcher()
+    assert dispatcher.dispatch("add 1 (multiply 2 (divide 9 3))") == "add 1 (multiply 2 (divide 9 3)) = 7.0"
+    assert dispatcher.dispatch("1 + 2*3") == "1 + 2*3 = 7.0"
+    assert dispatcher.dispatch("add 1 2") == "1.0 + 2.0 = 3.0"
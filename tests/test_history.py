@@ -0,0 +1,171 @@
+import pytest
+
+from app import App, history
+from app.commands.history_command import HistoryCommand
+from app.commands import replay_command
+from app.commands.replay_command import ReplayCommand, parse_range
+from app.results import CommandResult
+from app.session import Session, activate
+from app.variables import Workspace
+
+
+@pytest.fixture
+def recorder():
+    yield history.enable(capacity=3)
+    history.disable()
+
+
+@pytest.fixture
+def logged(tmp_path):
+    log_path = str(tmp_path / "history.bin")
+    yield history.enable(capacity=2, log_path=log_path)
+    history.disable()
+
+
+def test_ring_keeps_the_last_entries(recorder):
+    for index in range(5):
+        recorder.record(f"add {index} 1", f"{index}.0 + 1.0 = {index + 1}.0")
+    assert len(recorder) == 5
+    assert [entry.seq for entry in recorder.entries()] == [3, 4, 5]
+    assert [entry.line for entry in recorder.tail(2)] == ["add 3 1", "add 4 1"]
+
+
+def test_outputs_are_formatted_when_read(recorder):
+    result = CommandResult("add", (1.0, 2.0), 3.0, "%s + %s = %s")
+    recorder.record("add 1 2", result)
+    recorder.record("menu", None)
+    # The ring holds the result itself; entries() hands out its text
+    assert recorder._ring[0].output is result  # pylint: disable=protected-access
+    assert [entry.output for entry in recorder.entries()] == ["1.0 + 2.0 = 3.0", ""]
+
+
+def test_log_persists_across_sessions(logged):
+    logged.record("add 1 2", "1.0 + 2.0 = 3.0")
+    logged.record("divide 1 0", "Error: Cannot divide by zero.", ok=False)
+    logged.close()
+    entries = list(history.read_log(logged.log_path))
+    assert [(entry.seq, entry.line, entry.ok) for entry in entries] == [(1, "add 1 2", True), (2, "divide 1 0", False)]
+
+    later = history.History(capacity=2, log_path=logged.log_path)
+    later.record("multiply 2 3", "2.0 * 3.0 = 6.0")
+    later.record("subtract 5 1", "5.0 - 1.0 = 4.0")
+    later.record("add 0 0", "0.0 + 0.0 = 0.0")
+    assert len(later) == 5
+    # Entries 1-3 have left the ring and are read back from the log
+    assert [entry.line for entry in later.entries(2, 4)] == ["divide 1 0", "multiply 2 3", "subtract 5 1"]
+    later.close()
+
+
+def test_truncated_record_ends_the_log(logged):
+    logged.record("add 1 2", "1.0 + 2.0 = 3.0")
+    logged.record("add 3 4", "3.0 + 4.0 = 7.0")
+    logged.close()
+    with open(logged.log_path, "rb+") as stream:
+        stream.truncate(stream.seek(0, 2) - 3)
+    assert [entry.line for entry in history.read_log(logged.log_path)] == ["add 1 2"]
+    assert history.count_records(logged.log_path) == 1
+
+
+def test_appending_after_a_crash_drops_the_partial_record(logged):
+    logged.record("add 1 2", "1.0 + 2.0 = 3.0")
+    logged.record("add 3 4", "3.0 + 4.0 = 7.0")
+    logged.close()
+    with open(logged.log_path, "rb+") as stream:
+        stream.truncate(stream.seek(0, 2) - 3)
+
+    later = history.History(capacity=2, log_path=logged.log_path)
+    later.record("multiply 2 3", "2.0 * 3.0 = 6.0")
+    later.record("subtract 5 1", "5.0 - 1.0 = 4.0")
+    later.close()
+    entries = list(history.read_log(logged.log_path))
+    assert [(entry.seq, entry.line) for entry in entries] == [(1, "add 1 2"), (2, "multiply 2 3"), (3, "subtract 5 1")]
+    assert history.count_records(logged.log_path) == 3
+
+
+def test_read_log_rejects_other_files(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"hello")
+    with pytest.raises(ValueError, match="Not a calculator history log"):
+        list(history.read_log(str(path)))
+
+
+def test_history_command(recorder):
+    assert HistoryCommand().execute([]) == "History is empty."
+    recorder.record("add 1 2", "1.0 + 2.0 = 3.0")
+    recorder.record("bogus", "Unknown command.", ok=False)
+    assert HistoryCommand().execute([]) == "    1  add 1 2\n    2  bogus  (failed)"
+    assert HistoryCommand().execute(["1"]) == "    2  bogus  (failed)"
+    with pytest.raises(ValueError, match="Invalid count"):
+        HistoryCommand().execute(["zero"])
+
+
+@pytest.mark.parametrize("text, expected", [("2", (2, 2)), ("2..5", (2, 5)), ("3..", (3, None))])
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "a..b", "5..2", "0..", "-1"])
+def test_parse_range_rejects_bad_ranges(text):
+    with pytest.raises(ValueError, match="Invalid range for replay command"):
+        parse_range(text)
+
+
+def test_replay_reruns_entries(recorder):
+    recorder.record("add 1 2", "1.0 + 2.0 = 3.0")
+    recorder.record("history", "    1  add 1 2")
+    recorder.record("divide 1 0", "Error: Cannot divide by zero.", ok=False)
+    assert ReplayCommand().execute(["1..3"]) == "1.0 + 2.0 = 3.0\nError: Cannot divide by zero."
+    with pytest.raises(ValueError, match="No history entries in range 7..9"):
+        ReplayCommand().execute(["7..9"])
+
+
+def test_replay_runs_in_the_session_workspace(recorder):
+    workspace = Workspace()
+    recorder.record("rate = divide 5 100", "rate = 0.05")
+    recorder.record("total = multiply rate 2000", "total = 100.0")
+    recorder.record("rate * 2", "rate * 2 = 0.1")
+    with activate(Session(workspace, recorder)):
+        assert ReplayCommand().execute(["1..3"]) == "rate = 0.05\ntotal = 100.0\nrate * 2 = 0.1"
+    assert workspace.value("total") == 100.0
+    # Outside a session, the range runs in a workspace of its own
+    assert ReplayCommand().execute(["1..3"]).endswith("rate * 2 = 0.1")
+
+
+def test_replay_caps_its_output(recorder, monkeypatch):
+    monkeypatch.setattr(replay_command, "MAX_SHOWN_OUTPUTS", 2)
+    for index in range(3):
+        recorder.record(f"add {index} 1", "")
+    assert ReplayCommand().execute(["1.."]) == "0.0 + 1.0 = 1.0\n1.0 + 1.0 = 2.0\n... 1 more outputs not shown."
+
+
+def test_replay_without_history():
+    history.disable()
+    with pytest.raises(ValueError, match="History is not enabled"):
+        ReplayCommand().execute(["1"])
+
+
+def test_repl_keeps_the_configured_history(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "history.bin")
+    configured = history.enable(capacity=5, log_path=log_path)
+    inputs = iter(["add 1 2", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    try:
+        App.start()
+        assert history.active() is configured
+        assert [entry.line for entry in history.read_log(log_path)] == ["add 1 2"]
+    finally:
+        history.disable()
+
+
+def test_repl_records_and_replays(capfd, monkeypatch):
+    inputs = iter(["add 1 2", "nope", "replay 1", "history", "x = 4", "replay 5", "x", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    try:
+        App.start()
+        out, _ = capfd.readouterr()
+        assert out.count("1.0 + 2.0 = 3.0") == 2
+        assert "    2  nope  (failed)\n    3  replay 1\n" in out
+        # The replayed assignment defines 'x' in the REPL's own workspace
+        assert out.count("x = 4.0") == 3
+    finally:
+        history.disable()
@@ -0,0 +1,139 @@
+import logging
+import logging.config
+import os
+
+import pytest
+
+from app import log_config
+from benchmarks import import_budget
+
+CONFIG = """
+[loggers]
+keys=root,audit
+
+[handlers]
+keys=console,file
+
+[formatters]
+keys=simple
+
+[logger_root]
+level=INFO
+handlers=console,file
+
+[logger_audit]
+level=WARNING
+handlers=console
+qualname=calc.audit
+propagate=0
+
+[handler_console]
+class=StreamHandler
+level=DEBUG
+formatter=simple
+args=(sys.stderr,)
+
+[handler_file]
+class=logging.handlers.WatchedFileHandler
+level=INFO
+formatter=simple
+args=('{log_path}', 'a')
+
+[formatter_simple]
+format=%(asctime)s - %(name)s - %(message)s
+datefmt=%H:%M:%S
+
+[app_logging]
+sample_every=10
+"""
+
+
+@pytest.fixture
+def clean_logging():
+    root = logging.getLogger()
+    saved = (root.level, list(root.handlers))
+    yield
+    for logger in (root, logging.getLogger("calc.audit")):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+    root.setLevel(saved[0])
+    for handler in saved[1]:
+        root.addHandler(handler)
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "logging.conf"
+    path.write_text(CONFIG.format(log_path=tmp_path / "app.log"))
+    return str(path)
+
+
+def describe():
+    """Comparable summary of the configured logging tree."""
+    def handlers(logger):
+        return [(type(h).__name__, h.name, h.level, h.formatter._fmt, h.formatter.datefmt) for h in logger.handlers]
+    audit = logging.getLogger("calc.audit")
+    root = logging.getLogger()
+    return handlers(root), root.level, handlers(audit), audit.level, audit.propagate
+
+
+def test_cached_config_matches_file_config(config_path, clean_logging):
+    logging.config.fileConfig(config_path, disable_existing_loggers=False)
+    expected = describe()
+
+    assert log_config.configure_logging(config_path) == {"sample_every": "10"}  # miss: fileConfig + cache write
+    assert os.path.exists(log_config.cache_path_for(config_path))
+    spec, _ = log_config.parse_config(config_path)
+    log_config.apply_spec(spec)
+    assert describe() == expected
+
+
+def test_apply_spec_closes_the_handlers_it_replaces(config_path, clean_logging):
+    spec, _ = log_config.parse_config(config_path)
+    log_config.apply_spec(spec)
+    replaced = [handler for handler in logging.getLogger().handlers if isinstance(handler, logging.FileHandler)]
+    assert replaced and not replaced[0].stream.closed
+
+    log_config.apply_spec(spec)
+    assert replaced[0].stream is None  # FileHandler.close() drops its stream
+    assert replaced[0] not in logging.getLogger().handlers
+
+
+def test_cache_is_used_until_the_file_changes(config_path, clean_logging, monkeypatch):
+    log_config.configure_logging(config_path)
+    calls = []
+    monkeypatch.setattr(logging.config, "fileConfig", lambda *args, **kwargs: calls.append(args))
+
+    log_config.configure_logging(config_path)
+    assert not calls
+
+    with open(config_path, "a", encoding="utf-8") as stream:
+        stream.write("\n# edited\n")
+    log_config.configure_logging(config_path)
+    assert len(calls) == 1
+
+
+def test_missing_config_returns_none(tmp_path):
+    assert log_config.configure_logging(str(tmp_path / "missing.conf")) is None
+
+
+def test_pipeline_requested():
+    assert not log_config.pipeline_requested({"queue": "false", "sample_every": "1"}, {})
+    assert log_config.pipeline_requested({"sample_every": "5"}, {})
+    assert log_config.pipeline_requested({}, {"LOG_QUEUE": "1"})
+
+
+def test_parse_importtime():
+    profile = import_budget.parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   json.decoder\n"
+        "import time:        50 |        150 | json\n"
+    )
+    assert profile == import_budget.ImportProfile(150, {"json.decoder": 100, "json": 150})
+
+
+def test_batch_startup_skips_deferred_modules(tmp_path):
+    profile = import_budget.profile_startup(cwd=str(tmp_path))
+    assert "app.batch" in profile.modules
+    assert not set(import_budget.DEFERRED_MODULES) & set(profile.modules)
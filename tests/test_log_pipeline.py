@@ -0,0 +1,116 @@
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+from app.log_pipeline import (
+    BoundedQueueHandler,
+    CommandSampler,
+    PipelineConfig,
+    human_count,
+    install_queue_logging,
+    load_pipeline_config,
+)
+
+
+def make_record(level=logging.INFO, command="add"):
+    record = logging.LogRecord("app.app", level, __file__, 0, "msg", (), None)
+    if command is not None:
+        record.command = command
+    return record
+
+
+def test_load_pipeline_config_reads_conf_and_env(tmp_path):
+    conf = tmp_path / "logging.conf"
+    conf.write_text("[app_logging]\nqueue=true\nqueue_size=50\nsample_every=10\n")
+    config = load_pipeline_config(str(conf), environ={"LOG_SAMPLE_EVERY": "100", "LOG_RATE_LIMIT": "5"})
+    assert config == PipelineConfig(queue=True, queue_size=50, sample_every=100, rate_limit=5.0, summary_interval=60.0)
+    assert load_pipeline_config(str(tmp_path / "missing.conf"), environ={}) == PipelineConfig()
+    with pytest.raises(ValueError):
+        load_pipeline_config(None, environ={"LOG_QUEUE_SIZE": "lots"})
+
+
+def test_sampler_keeps_one_in_n_per_command_but_never_warnings():
+    sampler = CommandSampler(sample_every=3, summary_interval=0)
+    kept = [sampler.filter(make_record()) for _ in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampler.filter(make_record(command="divide"))
+    assert all(sampler.filter(make_record(level=logging.WARNING)) for _ in range(5))
+    assert all(sampler.filter(make_record(level=logging.ERROR)) for _ in range(5))
+    assert sampler.filter(make_record(command=None))
+
+
+def test_sampler_rate_limit_and_summary(caplog):
+    now = [0.0]
+    sampler = CommandSampler(rate_limit=2, summary_interval=10, clock=lambda: now[0])
+    kept = [sampler.filter(make_record()) for _ in range(5)]
+    assert kept == [True, True, False, False, False]
+
+    now[0] = 11.0
+    with caplog.at_level(logging.INFO, logger="app.log_pipeline"):
+        sampler.filter(make_record())
+    assert "Command 'add' executed 6 times in the last 11s (3 logged)." in caplog.text
+
+
+def test_sampler_timer_summarises_a_quiet_session(caplog):
+    sampler = CommandSampler(sample_every=10, summary_interval=0.05)
+    with caplog.at_level(logging.INFO, logger="app.log_pipeline"):
+        sampler.start()
+        try:
+            for _ in range(3):
+                sampler.filter(make_record())
+            # No further records: the summary comes from the timer
+            for _ in range(100):
+                if "executed 3 times" in caplog.text:
+                    break
+                time.sleep(0.01)
+        finally:
+            sampler.stop()
+    assert "Command 'add' executed 3 times" in caplog.text
+    assert "(1 logged)" in caplog.text
+
+
+def test_bounded_queue_handler_drops_info_but_waits_for_warnings():
+    record_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(record_queue)
+    for _ in range(3):
+        handler.emit(make_record())
+    assert record_queue.qsize() == 2 and handler.dropped == 1
+
+    threading.Timer(0.05, record_queue.get).start()
+    handler.emit(make_record(level=logging.ERROR))
+    # The error waited for space instead of being dropped
+    assert [record_queue.get_nowait().levelno for _ in range(2)] == [logging.INFO, logging.ERROR]
+
+    # The drop notice follows once the queue has room again
+    handler.emit(make_record())
+    record_queue.get_nowait()
+    assert "dropped 1" in record_queue.get_nowait().getMessage()
+    assert handler.dropped == 0
+
+
+def test_install_queue_logging_forwards_to_original_handlers():
+    root = logging.getLogger("test_log_pipeline_root")
+    root.propagate = False
+    records = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    root.addHandler(ListHandler())
+    listener = install_queue_logging(100, root=root)
+    try:
+        assert isinstance(root.handlers[0], BoundedQueueHandler)
+        root.warning("hello %s", "queue")
+    finally:
+        listener.stop()
+    assert records == ["hello queue"]
+
+
+def test_human_count():
+    assert human_count(999) == "999"
+    assert human_count(1200) == "1.2K"
+    assert human_count(1_200_000) == "1.2M"
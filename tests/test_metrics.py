@@ -0,0 +1,90 @@
+import pytest
+
+from app import metrics
+from app.commands.stats_command import StatsCommand
+from app.dispatcher import Dispatcher, middleware
+
+
+@pytest.fixture
+def enabled_metrics():
+    collected = metrics.enable()
+    yield collected
+    metrics.disable()
+
+
+def test_disabled_metrics_leave_handlers_unwrapped():
+    assert metrics.active() is None
+    handler = Dispatcher().resolve("add")
+    assert handler.__name__ == "execute"
+    assert StatsCommand().execute([]) == "Metrics are disabled. Set METRICS_ENABLED=1 to collect them."
+
+
+def test_metrics_count_calls_errors_and_latency(enabled_metrics):
+    dispatcher = Dispatcher()
+    dispatcher.dispatch("add 1 2")
+    dispatcher.dispatch("+ 3 4")
+    for line in ("divide 1 0", "add x 1"):
+        with pytest.raises((ZeroDivisionError, ValueError)):
+            dispatcher.dispatch(line)
+
+    snapshot = enabled_metrics.snapshot()
+    assert snapshot["add"].calls == 3
+    assert snapshot["add"].errors == {"ValueError": 1, "ZeroDivisionError": 0, "unexpected": 0}
+    assert snapshot["divide"].errors["ZeroDivisionError"] == 1
+    assert snapshot["add"].latency.count == 3
+    assert 0 < snapshot["add"].latency.quantile(0.5) <= snapshot["add"].latency.quantile(0.99)
+
+
+def test_enabling_metrics_rebinds_existing_dispatchers():
+    dispatcher = Dispatcher()
+    plain = dispatcher.resolve("add")
+    collected = metrics.enable()
+    try:
+        dispatcher.dispatch("add 1 1")
+        assert dispatcher.resolve("add") is not plain
+        assert collected.snapshot()["add"].calls == 1
+    finally:
+        metrics.disable()
+    assert dispatcher.resolve("add").__name__ == "execute"
+    assert len(middleware) == 0
+
+
+def test_histogram_quantiles():
+    histogram = metrics.LatencyHistogram()
+    for _ in range(98):
+        histogram.record(1e-6)
+    histogram.record(1e-3)
+    histogram.record(100.0)
+    assert histogram.quantile(0.5) == pytest.approx(1e-6)
+    assert 1e-3 <= histogram.quantile(0.99) < 2e-3
+    assert histogram.quantile(1.0) == float("inf")
+    assert metrics.LatencyHistogram().quantile(0.5) == 0.0
+
+
+def test_stats_command_output(enabled_metrics):
+    Dispatcher().dispatch("multiply 2 3")
+    text = StatsCommand().execute([])
+    assert "multiply: calls=1 errors: none p50=" in text
+    prometheus = StatsCommand().execute(["prometheus"])
+    assert 'calculator_command_calls_total{command="multiply"} 1' in prometheus
+    assert 'calculator_command_latency_seconds_bucket{command="multiply",le="+Inf"} 1' in prometheus
+    assert StatsCommand().execute(["reset"]) == "Statistics reset."
+    assert StatsCommand().execute([]) == "No commands executed yet."
+    with pytest.raises(ValueError):
+        StatsCommand().execute(["bogus"])
+
+
+def test_prometheus_exporter_writes_file(enabled_metrics, tmp_path):
+    Dispatcher().dispatch("subtract 5 1")
+    path = tmp_path / "metrics.prom"
+    exporter = metrics.PrometheusFileExporter(enabled_metrics, str(path), interval=60)
+    exporter.start()
+    exporter.stop()
+    assert 'calculator_command_calls_total{command="subtract"} 1' in path.read_text()
+
+
+def test_format_seconds():
+    assert metrics.format_seconds(2.5) == "2.5s"
+    assert metrics.format_seconds(0.0015) == "1.5ms"
+    assert metrics.format_seconds(0.0000012) == "1.2µs"
+    assert metrics.format_seconds(5e-8) == "50ns"
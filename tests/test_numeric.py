@@ -0,0 +1,169 @@
+import io
+import os
+import subprocess
+import sys
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app import numeric, result_cache
+from app.batch import BatchRunner
+from app.dispatcher import Dispatcher
+from app.session import Session, activate
+from app.variables import Workspace
+from benchmarks import import_budget
+
+
+@pytest.fixture(autouse=True)
+def float_backend():
+    """Every test starts, and leaves the process, on the float backend."""
+    numeric.configure()
+    yield
+    numeric.configure()
+
+
+@pytest.mark.parametrize("backend, line, expected", [
+    ("float", "add 0.1 0.2", "0.1 + 0.2 = 0.30000000000000004"),
+    ("decimal", "add 0.1 0.2", "0.1 + 0.2 = 0.3"),
+    ("decimal", "multiply 1.10 3", "1.10 * 3 = 3.30"),
+    ("decimal", "divide 1 3", "1 / 3 = 0.3333333333333333333333333333"),
+    ("fraction", "divide 1 3", "1 / 3 = 1/3"),
+    ("fraction", "subtract 1/2 1/3", "1/2 - 1/3 = 1/6"),
+])
+def test_arithmetic_commands_use_the_active_backend(backend, line, expected):
+    numeric.configure(backend)
+    assert str(Dispatcher().dispatch(line)) == expected
+
+
+def test_decimal_context():
+    numeric.configure("decimal", 5, "half_up")
+    result = Dispatcher().dispatch("divide 2 3")
+    assert result.value == Decimal("0.66667") and str(result) == "2 / 3 = 0.66667"
+    numeric.configure("decimal", 5, "ROUND_DOWN")
+    assert str(Dispatcher().dispatch("divide 2 3")) == "2 / 3 = 0.66666"
+    with pytest.raises(ValueError, match="Calculation failed under the decimal context"):
+        Dispatcher().dispatch("multiply 1e999999 1e999999")
+
+
+@pytest.mark.parametrize("backend", numeric.NAMES)
+def test_errors_are_the_same_under_every_backend(backend):
+    numeric.configure(backend)
+    dispatcher = Dispatcher()
+    with pytest.raises(ZeroDivisionError):
+        dispatcher.dispatch("divide 1 0")
+    with pytest.raises(ValueError, match="Invalid numeric input for add command"):
+        dispatcher.dispatch("add 1 x")
+    with pytest.raises(ValueError, match="Invalid number of arguments for add command"):
+        dispatcher.dispatch("add 1 2 3")
+    # Vector operands stay on float64
+    assert str(dispatcher.dispatch("add 1,2 1")) == "[1.0, 2.0] + 1.0 = [2.0, 3.0]"
+
+
+def test_expressions_pipelines_and_variables():
+    dispatcher = Dispatcher()
+    assert dispatcher.dispatch("0.1 + 0.2 * 3").value == pytest.approx(0.7)
+    numeric.configure("decimal")
+    # Cached plans of the float backend are not reused
+    assert dispatcher.dispatch("0.1 + 0.2 * 3").value == Decimal("0.7")
+    assert dispatcher.dispatch("-0.1 + 0.3").value == Decimal("0.2")
+    assert str(dispatcher.dispatch("add 0.1 0.2 | multiply _ 10")) == "add 0.1 0.2 | multiply _ 10 = 3.0"
+    numeric.configure("fraction")
+    assert dispatcher.dispatch("add 1 2 | divide 1 _").value == Fraction(1, 3)
+
+    workspace = Workspace()
+    workspace.assign("third", ["divide", "1", "3"])
+    handler, _, args = workspace.resolve_line("multiply third 3")
+    assert str(handler(args)) == "1/3 * 3 = 1"
+
+
+def test_backend_command():
+    dispatcher = Dispatcher()
+    assert dispatcher.dispatch("backend") == "Numeric backend: float"
+    assert dispatcher.dispatch("backend decimal 40 half_up") == "Numeric backend set to decimal (precision 40, ROUND_HALF_UP)."
+    assert numeric.active().spec() == ("decimal", 40, "ROUND_HALF_UP")
+    assert dispatcher.dispatch("backend fraction") == "Numeric backend set to fraction."
+    for line, message in [
+        ("backend complex", "Unknown numeric backend 'complex'"),
+        ("backend decimal 0", "Decimal precision must be at least 1"),
+        ("backend decimal x", "Invalid decimal precision 'x'"),
+        ("backend decimal 10 sideways", "Unknown rounding mode 'ROUND_SIDEWAYS'"),
+        ("backend float 10", "Invalid arguments for backend command"),
+    ]:
+        with pytest.raises(ValueError, match=message):
+            dispatcher.dispatch(line)
+    assert numeric.active().name == "fraction"
+
+
+def test_result_cache_keys_carry_the_backend(tmp_path):
+    cache = result_cache.enable()
+    try:
+        dispatcher = Dispatcher()
+        assert str(dispatcher.dispatch("add 0.1 0.2")) == "0.1 + 0.2 = 0.30000000000000004"
+        numeric.configure("decimal")
+        assert str(dispatcher.dispatch("add 0.10 0.20")) == "0.10 + 0.20 = 0.30"
+        assert str(dispatcher.dispatch("add 0.1 0.2")) == "0.1 + 0.2 = 0.3"
+        numeric.configure("decimal", 2)
+        assert str(dispatcher.dispatch("divide 1 3")) == "1 / 3 = 0.33"
+        numeric.configure()
+        assert str(dispatcher.dispatch("add 0.1 0.2")) == "0.1 + 0.2 = 0.30000000000000004"
+        assert cache.hits == 1
+        # Files are read on every call, whatever the backend
+        numeric.configure("fraction")
+        numbers = tmp_path / "numbers.txt"
+        numbers.write_text("1/2 1/3\n")
+        assert str(dispatcher.dispatch(f"sum @{numbers}")) == "sum of 2 values = 5/6"
+        numbers.write_text("1/2\n")
+        assert str(dispatcher.dispatch(f"sum @{numbers}")) == "sum of 1 values = 1/2"
+    finally:
+        result_cache.disable()
+
+
+@pytest.mark.parametrize("backend, expected", [
+    ("float", ["sum of 2 values = 0.30000000000000004", "mean of 3 values = 0.19999999999999998",
+               "var of 4 values = 1.6666666666666667", "max of 2 values = 0.2"]),
+    ("decimal", ["sum of 2 values = 0.3", "mean of 3 values = 0.2",
+                 "var of 4 values = 1.666666666666666666666666667", "max of 2 values = 0.2"]),
+    ("fraction", ["sum of 2 values = 3/10", "mean of 3 values = 1/5",
+                  "var of 4 values = 5/3", "max of 2 values = 1/5"]),
+])
+def test_aggregates_use_the_active_backend(backend, expected, tmp_path):
+    numeric.configure(backend)
+    dispatcher = Dispatcher()
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("1 2\n3 4\n")
+    lines = ["sum 0.1 0.2", "mean 0.1 0.2 0.3", f"var @{numbers}", "max 0.1 0.2"]
+    assert [str(dispatcher.dispatch(line)) for line in lines] == expected
+
+
+def test_backend_command_switches_only_the_current_session():
+    dispatcher = Dispatcher()
+    decimal_session, float_session = Session(), Session()
+    with activate(decimal_session):
+        assert dispatcher.dispatch("backend decimal 5") == "Numeric backend set to decimal (precision 5, ROUND_HALF_EVEN)."
+        assert str(dispatcher.dispatch("divide 2 3")) == "2 / 3 = 0.66667"
+        assert str(dispatcher.dispatch("1 / 3 + 0.1")) == "1 / 3 + 0.1 = 0.43333"
+    with activate(float_session):
+        assert dispatcher.dispatch("backend") == "Numeric backend: float"
+        assert str(dispatcher.dispatch("1 / 3 + 0.1")) == "1 / 3 + 0.1 = 0.43333333333333335"
+    assert numeric.active() is numeric.FLOAT
+    with activate(decimal_session):
+        assert str(dispatcher.dispatch("sum 0.1 0.2")) == "sum of 2 values = 0.3"
+
+
+def test_batch_output_per_backend():
+    numeric.configure("decimal", 10)
+    out, err = io.StringIO(), io.StringIO()
+    BatchRunner().run(io.StringIO("add 0.1 0.2\ndivide 1 3\ndivide 1 0\n"), out, err)
+    assert out.getvalue() == "0.1 + 0.2 = 0.3\n1 / 3 = 0.3333333333\n"
+    assert err.getvalue() == "line 3: Error: Cannot divide by zero.\n"
+
+
+def test_backend_from_the_environment(tmp_path):
+    command = [sys.executable, os.path.join(import_budget.REPO_ROOT, "main.py"), "--batch", "-"]
+    env = {**os.environ, "NUMERIC_BACKEND": "decimal", "DECIMAL_PRECISION": "6"}
+    done = subprocess.run(command, cwd=tmp_path, input="divide 2 3\n", env=env, capture_output=True, text=True, check=False)
+    assert done.stdout == "2 / 3 = 0.666667\n"
+    env["NUMERIC_BACKEND"] = "posit"
+    done = subprocess.run(command, cwd=tmp_path, input="", env=env, capture_output=True, text=True, check=False)
+    assert done.returncode == 1 and "Unknown numeric backend 'posit'" in done.stderr
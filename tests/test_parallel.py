@@ -0,0 +1,91 @@
+import io
+
+import pytest
+
+from app.batch import BatchRunner
+from app.commands.plugin_manager import PluginManager
+from app.parallel import ParallelRunner, run_chunk, split_ranges
+
+LINES = (
+    "add 1 2\n"
+    "\n"
+    "multiply 3 4\n"
+    "divide 1 0\n"
+    "subtract 10 4\n"
+    "bogus 1\n"
+    "add 2.5 2.5\n"
+)
+
+
+def write_commands(tmp_path, text):
+    path = tmp_path / "commands.txt"
+    path.write_text(text)
+    return str(path)
+
+
+def sequential(text, on_error="report"):
+    out, err = io.StringIO(), io.StringIO()
+    stats = BatchRunner(on_error=on_error).run(io.StringIO(text), out, err)
+    return out.getvalue(), err.getvalue(), stats
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 20, 1 << 20])
+def test_split_ranges_cover_file_on_line_boundaries(tmp_path, chunk_size):
+    text = LINES * 5 + "add 1 1"  # no trailing newline
+    path = write_commands(tmp_path, text)
+    ranges = list(split_ranges(path, chunk_size))
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(text)
+    data = text.encode()
+    for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end == next_start
+        assert data[end - 1:end] == b"\n"
+
+
+def test_run_chunk_numbers_lines_within_the_chunk(tmp_path):
+    path = write_commands(tmp_path, LINES)
+    runner = BatchRunner(PluginManager())
+    chunk = run_chunk(path, 0, len(LINES), runner)
+    assert chunk.line_count == 7
+    assert chunk.output.splitlines() == ["1.0 + 2.0 = 3.0", "3.0 * 4.0 = 12.0", "10.0 - 4.0 = 6.0", "2.5 + 2.5 = 5.0"]
+    assert [(lineno, offset) for lineno, offset, _ in chunk.errors] == [(4, 33), (6, 50)]
+    assert (chunk.processed, chunk.succeeded, chunk.failed) == (6, 4, 2)
+
+
+def test_errors_follow_multi_line_outputs(tmp_path):
+    # One stream for results and errors, so the interleaving is visible
+    text = "menu\nbogus 1\nadd 1 2\nmenu\ndivide 1 0\n" * 3
+    path = write_commands(tmp_path, text)
+    combined = io.StringIO()
+    ParallelRunner(workers=2, chunk_size=16).run(path, combined, combined)
+    expected = io.StringIO()
+    BatchRunner().run(io.StringIO(text), expected, expected)
+    assert combined.getvalue() == expected.getvalue()
+    assert "\nline 2: Unknown command." in combined.getvalue()
+
+
+@pytest.mark.parametrize("on_error", ["report", "skip", "stop"])
+def test_parallel_run_matches_sequential_run(tmp_path, on_error):
+    text = LINES * 20
+    path = write_commands(tmp_path, text)
+    out, err = io.StringIO(), io.StringIO()
+    stats = ParallelRunner(workers=2, chunk_size=64, on_error=on_error, max_pending=3).run(path, out, err)
+    assert (out.getvalue(), err.getvalue(), stats) == sequential(text, on_error)
+
+
+def test_parallel_run_stops_at_exit_line(tmp_path):
+    text = LINES * 3 + "exit\n" + LINES * 3
+    path = write_commands(tmp_path, text)
+    out = io.StringIO()
+    stats = ParallelRunner(workers=2, chunk_size=32).run(path, out, io.StringIO())
+    expected_out, _, expected_stats = sequential(text)
+    assert out.getvalue() == expected_out
+    assert stats == expected_stats
+
+
+def test_parallel_runner_rejects_stdin_and_bad_settings(tmp_path):
+    with pytest.raises(ValueError):
+        ParallelRunner(workers=2).run("-", io.StringIO())
+    with pytest.raises(ValueError):
+        ParallelRunner(on_error="ignore")
+    with pytest.raises(ValueError):
+        ParallelRunner(chunk_size=0)
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from app import App, history
+from app.batch import BatchRunner
+from app.dispatcher import Dispatcher
+from app.pipeline import PipelineEngine, StageError, split_stages
+from app.variables import Workspace
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("multiply 3 4 | add 1 | divide _ 2", 6.5),
+    ("add 1 2 | divide 1 _", 1 / 3),
+    ("add 1 2 | subtract _ _", 0.0),
+    ("sum 1 2 3|mean _ 4", 5.0),
+    ("+ 1 2 | * 10", 30.0),
+])
+def test_stages_pass_raw_results(line, expected):
+    assert PipelineEngine().evaluate(line) == pytest.approx(expected)
+
+
+def test_dispatch_formats_only_the_final_result():
+    result = Dispatcher().dispatch("multiply 3 4 | add 1 | divide _ 2")
+    assert (result.command, result.value) == ("pipeline", 6.5)
+    assert str(result) == "multiply 3 4 | add 1 | divide _ 2 = 6.5"
+
+
+def test_plans_are_compiled_once_per_line():
+    engine = PipelineEngine()
+    assert engine.compile("add 1 2 | add 3") is engine.compile("add 1 2 | add 3")
+
+
+@pytest.mark.parametrize("line, message", [
+    ("add 1 2 | divide _ 0 | add 1", "Stage 2 (divide): Cannot divide by zero."),
+    ("add 1 2 | menu", "Stage 2 (menu): The 'menu' command cannot be used in a pipeline."),
+    ("add 1 2 | nope 3", "Stage 2 (nope): Unknown command 'nope'."),
+    ("divide _ 2 | add 1", "Stage 1 (divide): '_' needs a previous stage"),
+    ("add 1 2 | add x", "Stage 2 (add): Invalid numeric input 'x'."),
+    ("add 1 2 | add 1 2", "Stage 2 (add): Invalid number of arguments for add command."),
+    ("add 1 2 | | add 3", "Stage 2 of the pipeline is empty."),
+])
+def test_stage_errors(line, message):
+    with pytest.raises(ValueError) as exc:
+        Dispatcher().dispatch(line)
+    assert str(exc.value).startswith(message)
+
+
+def test_stage_error_keeps_the_stage():
+    with pytest.raises(StageError) as exc:
+        PipelineEngine().evaluate("add 1 1 | add 1 | divide 1 _ | divide _ 0")
+    assert (exc.value.index, exc.value.command_name) == (4, "divide")
+    assert split_stages("a 1|b  2 ") == [["a", "1"], ["b", "2"]]
+
+
+def test_batch_pipelines_and_errors():
+    out, err = io.StringIO(), io.StringIO()
+    BatchRunner().run(io.StringIO("multiply 3 4 | add 1\nadd 1 1 | divide _ 0\n"), out, err)
+    assert out.getvalue() == "multiply 3 4 | add 1 = 13.0\n"
+    assert err.getvalue() == "line 2: Error: Stage 2 (divide): Cannot divide by zero.\n"
+
+
+def test_repl_pipeline_with_variables(capfd, monkeypatch):
+    workspace = Workspace()
+    workspace.assign("rate", ["divide", "5", "100"])
+    handler, command_name, args = workspace.resolve_line("multiply rate 200 | add 1")
+    assert command_name == "pipeline" and str(handler(args)) == "multiply 0.05 200 | add 1 = 11.0"
+
+    inputs = iter(["add 2 3 | multiply _ _", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    try:
+        App.start()
+    finally:
+        history.disable()
+    out, _ = capfd.readouterr()
+    assert "add 2 3 | multiply _ _ = 25.0\n" in out
@@ -0,0 +1,202 @@
+import json
+import os
+import sys
+import time
+import uuid
+
+import pytest
+
+from app.commands.plugin_manager import CommandInfo, PluginManager, scan_source
+
+PLUGIN_TEMPLATE = '''
+from app.commands.command_interface import CommandInterface
+
+
+class Synthetic{index}Command(CommandInterface):
+    """
+    Synthetic command number {index}.
+    Usage: synth{index}
+    """
+
+    @property
+    def name(self) -> str:
+        return "synth{index}"
+
+    def execute(self, args: list[str]) -> str:
+        return "{index}"
+'''
+
+
+def make_plugin_package(root, count):
+    """Creates an importable package with 'count' synthetic command plugins."""
+    package_name = f"synthetic_plugins_{uuid.uuid4().hex[:8]}"
+    package_dir = root / package_name
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    for index in range(count):
+        (package_dir / f"synth{index}_command.py").write_text(PLUGIN_TEMPLATE.format(index=index))
+    return package_name, package_dir
+
+
+def imported_plugins(package_name):
+    return [name for name in sys.modules if name.startswith(f"{package_name}.")]
+
+
+@pytest.fixture
+def plugin_root(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return tmp_path
+
+
+def test_discovers_builtin_commands():
+    pm = PluginManager()
+    assert {"add", "subtract", "multiply", "divide", "menu"} <= set(pm._commands)
+    assert pm.get_command("add").__name__ == "AddCommand"
+    assert pm.get_command("nope") is None
+
+
+def test_plugins_are_imported_only_on_first_lookup(plugin_root):
+    package_name, package_dir = make_plugin_package(plugin_root, 5)
+    pm = PluginManager(package_name, str(package_dir))
+    assert len(pm._commands) == 5
+    assert imported_plugins(package_name) == []
+
+    command_class = pm.get_command("synth3")
+    assert command_class().execute([]) == "3"
+    assert imported_plugins(package_name) == [f"{package_name}.synth3_command"]
+
+
+def test_manifest_is_written_and_reused(plugin_root, monkeypatch):
+    package_name, package_dir = make_plugin_package(plugin_root, 3)
+    PluginManager(package_name, str(package_dir))
+    manifest_path = package_dir / "__pycache__" / "plugin_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    assert manifest["modules"]["synth1_command"]["commands"] == {
+        "synth1": {"class": "Synthetic1Command", "usage": "synth1", "aliases": []}
+    }
+
+    # A warm manifest must not rescan any module
+    scanned = []
+    original = PluginManager._scan_module
+    monkeypatch.setattr(PluginManager, "_scan_module", lambda self, name: scanned.append(name) or original(self, name))
+    PluginManager(package_name, str(package_dir))
+    assert scanned == []
+
+
+def test_stale_manifest_is_rebuilt_incrementally(plugin_root, monkeypatch):
+    package_name, package_dir = make_plugin_package(plugin_root, 3)
+    PluginManager(package_name, str(package_dir))
+
+    plugin = package_dir / "synth1_command.py"
+    plugin.write_text(plugin.read_text().replace('return "synth1"', 'return "renamed"'))
+    stat = plugin.stat()
+    os.utime(plugin, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (package_dir / "synth2_command.py").unlink()
+
+    scanned = []
+    original = PluginManager._scan_module
+    monkeypatch.setattr(PluginManager, "_scan_module", lambda self, name: scanned.append(name) or original(self, name))
+    pm = PluginManager(package_name, str(package_dir))
+    assert scanned == ["synth1_command"]
+    assert sorted(pm._commands) == ["renamed", "synth0"]
+
+
+def test_dynamic_plugins_fall_back_to_import(plugin_root):
+    package_name, package_dir = make_plugin_package(plugin_root, 1)
+    (package_dir / "dynamic_command.py").write_text(
+        "from app.commands.command_interface import CommandInterface\n"
+        "class DynamicCommand(CommandInterface):\n"
+        "    @property\n"
+        "    def name(self) -> str:\n"
+        "        return 'dyn' + 'amic'\n"
+        "    def execute(self, args):\n"
+        "        return 'ok'\n"
+    )
+    pm = PluginManager(package_name, str(package_dir))
+    assert pm.get_command("dynamic")().execute([]) == "ok"
+
+
+def test_scan_source_resolves_literal_names():
+    source = b"class A(CommandInterface):\n    name = 'a'\nclass Helper:\n    pass\n"
+    assert scan_source(source) == {"a": {"class": "A", "usage": None, "aliases": []}}
+    assert scan_source(b"class B(AddCommand):\n    pass\n") is None
+
+
+def test_list_commands_is_sorted_and_cached(plugin_root):
+    package_name, package_dir = make_plugin_package(plugin_root, 3)
+    pm = PluginManager(package_name, str(package_dir))
+    listing = pm.list_commands()
+    assert [info.name for info in listing] == ["synth0", "synth1", "synth2"]
+    assert listing[1] == CommandInfo("synth1", "synth1", "synth1_command", "Synthetic1Command")
+    assert pm.list_commands() is listing
+    assert pm.command_names() == ["synth0", "synth1", "synth2"]
+
+
+def test_shared_returns_one_instance():
+    PluginManager.reset_shared()
+    try:
+        assert PluginManager.shared() is PluginManager.shared()
+    finally:
+        PluginManager.reset_shared()
+
+
+def test_refresh_reloads_only_changed_modules(plugin_root):
+    package_name, package_dir = make_plugin_package(plugin_root, 3)
+    pm = PluginManager(package_name, str(package_dir))
+    assert pm.get_command("synth1")().execute([]) == "1"
+    assert pm.get_command("synth0")().execute([]) == "0"
+    untouched = sys.modules[f"{package_name}.synth0_command"]
+    listing = pm.list_commands()
+    assert pm.refresh() == []
+
+    plugin = package_dir / "synth1_command.py"
+    plugin.write_text(plugin.read_text().replace('return "1"', 'return "one"'))
+    stat = plugin.stat()
+    os.utime(plugin, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (package_dir / "extra_command.py").write_text(PLUGIN_TEMPLATE.format(index=9))
+
+    assert pm.refresh() == ["extra_command", "synth1_command"]
+    assert pm.get_command("synth1")().execute([]) == "one"
+    assert pm.get_command("synth9")().execute([]) == "9"
+    assert sys.modules[f"{package_name}.synth0_command"] is untouched
+    assert pm.list_commands() is not listing
+    assert "synth9" in pm.command_names()
+
+
+def test_watcher_picks_up_new_plugins(plugin_root):
+    package_name, package_dir = make_plugin_package(plugin_root, 1)
+    pm = PluginManager(package_name, str(package_dir))
+    pm.start_watcher(interval=0.01)
+    try:
+        (package_dir / "late_command.py").write_text(PLUGIN_TEMPLATE.format(index=7))
+        deadline = time.monotonic() + 5
+        while pm.get_command("synth7") is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pm.get_command("synth7") is not None
+    finally:
+        pm.stop_watcher()
+
+
+@pytest.mark.slow
+def test_startup_with_200_plugins_costs_no_more_than_with_5(plugin_root):
+    """
+    Target: with a warm manifest, constructing a PluginManager imports no plugin
+    module, so startup with 200 plugins stays within a small constant of 5.
+    """
+    small_name, small_dir = make_plugin_package(plugin_root, 5)
+    large_name, large_dir = make_plugin_package(plugin_root, 200)
+    PluginManager(small_name, str(small_dir))
+    PluginManager(large_name, str(large_dir))
+
+    def best_of(package_name, package_dir, runs=20):
+        best = float("inf")
+        for _ in range(runs):
+            start = time.perf_counter()
+            PluginManager(package_name, str(package_dir))
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    small, large = best_of(small_name, small_dir), best_of(large_name, large_dir)
+    assert imported_plugins(large_name) == []
+    # Only a stat() and a manifest entry per plugin remain; importing 200 modules took ~100x longer
+    assert large < small + 0.02
@@ -0,0 +1,81 @@
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from app import profiling
+from app.commands.memprofile_command import MemprofileCommand
+from app.commands.profile_command import ProfileCommand
+from app.dispatcher import Dispatcher
+
+
+@pytest.fixture(autouse=True)
+def stopped_profilers():
+    yield
+    profiling.stop_cpu()
+    profiling.stop_memory()
+
+
+def test_profilers_off_leave_handlers_unwrapped():
+    assert profiling.cpu_active() is None and profiling.memory_active() is None
+    assert Dispatcher().resolve("add").__name__ == "execute"
+    assert ProfileCommand().execute([]) == "CPU profiling is off."
+    assert MemprofileCommand().execute(["status"]) == "Memory profiling is off."
+
+
+def test_profile_on_off_writes_pstats_per_command(tmp_path):
+    dispatcher = Dispatcher()
+    assert ProfileCommand().execute(["on", str(tmp_path)]) == f"CPU profiling on. Profiles will be written to {tmp_path}."
+    for _ in range(3):
+        dispatcher.dispatch("add 1 2")
+    dispatcher.dispatch("divide 8 2")
+    assert ProfileCommand().execute(["status"]) == "CPU profiling is on (4 command calls profiled)."
+
+    output = ProfileCommand().execute(["off"])
+    assert output.startswith("CPU profiling off.\n  add: 3 calls, ")
+    assert "  divide: 1 calls, " in output
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 2 and files[0].startswith("cpu-add-") and files[0].endswith(".pstats")
+    stats = pstats.Stats(str(tmp_path / files[0]))
+    assert any(function[2] == "execute" for function in stats.stats)
+    # Off again: nothing wraps dispatch any more
+    assert profiling.cpu_active() is None
+    assert Dispatcher().resolve("add").__name__ == "execute"
+
+
+def test_memprofile_reports_per_command_allocations(tmp_path):
+    was_tracing = tracemalloc.is_tracing()
+    MemprofileCommand().execute(["on", str(tmp_path)])
+    Dispatcher().dispatch("sum " + " ".join(["1"] * 5000))
+    output = MemprofileCommand().execute(["off"])
+    assert "  sum: 1 calls, net " in output
+    peak = int(output.split("peak ")[1].split(" bytes")[0].replace(",", ""))
+    assert peak > 0
+    snapshot_path = output.rsplit("Snapshot written to ", 1)[1]
+    assert os.path.dirname(snapshot_path) == str(tmp_path)
+    assert tracemalloc.Snapshot.load(snapshot_path).traces is not None
+    assert tracemalloc.is_tracing() == was_tracing
+
+
+def test_switches_are_not_profiled(tmp_path):
+    profiler = profiling.start_cpu(str(tmp_path))
+    Dispatcher().dispatch("profile status")
+    assert "profile" not in profiler.calls
+
+
+def test_profile_command_errors():
+    with pytest.raises(ValueError, match="Usage: profile on"):
+        ProfileCommand().execute(["sideways"])
+    with pytest.raises(ValueError, match="CPU profiling is not on"):
+        ProfileCommand().execute(["off"])
+    with pytest.raises(ValueError, match="Memory profiling is not on"):
+        MemprofileCommand().execute(["off"])
+
+
+def test_default_directory_is_configurable(tmp_path):
+    profiling.set_directory(str(tmp_path / "out"))
+    try:
+        assert profiling.start_cpu().directory == str(tmp_path / "out")
+    finally:
+        profiling.set_directory(profiling.DEFAULT_DIRECTORY)
@@ -0,0 +1,114 @@
+import io
+import math
+import statistics
+
+import pytest
+
+from app import reducers, vectorized
+from app.commands.count_command import CountCommand
+from app.commands.max_command import MaxCommand
+from app.commands.mean_command import MeanCommand
+from app.commands.min_command import MinCommand
+from app.commands.sum_command import SumCommand
+from app.commands.var_command import VarCommand
+from app.commands.plugin_manager import PluginManager
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Runs each test with NumPy blocks (when installed) and with plain float lists."""
+    if request.param == "numpy":
+        if vectorized.load_numpy() is None:
+            pytest.skip("NumPy is not installed")
+        monkeypatch.setattr(reducers, "VECTOR_THRESHOLD", 1)
+    else:
+        monkeypatch.setattr(vectorized, "load_numpy", lambda: None)
+    return request.param
+
+
+def test_neumaier_sum_keeps_small_terms():
+    running = reducers.NeumaierSum()
+    for value in (1e100, 1.0, -1e100):
+        running.add(value)
+    assert running.value == 1.0
+
+
+def test_total_is_compensated_across_blocks(backend):
+    blocks = [reducers.as_block([1e100]), reducers.as_block([1.0]), reducers.as_block([-1e100])]
+    assert reducers.total(blocks) == (1.0, 3)
+
+
+def test_sum_of_many_tenths_is_exact(backend):
+    assert SumCommand().execute(["0.1"] * 10) == "sum of 10 values = 1.0"
+
+
+def test_variance_matches_statistics(backend, monkeypatch):
+    monkeypatch.setattr(reducers, "BLOCK_SIZE", 7)
+    data = [1e9 + (i * 37 % 101) / 7 for i in range(100)]
+    stream = io.StringIO("\n".join(" ".join(map(str, data[i:i + 3])) for i in range(0, 100, 3)))
+    value, count = reducers.variance(reducers.iter_stream_blocks(stream, "var"))
+    assert count == 100
+    assert value == pytest.approx(statistics.variance(data), rel=1e-9)
+
+
+def test_stream_blocks_are_bounded(monkeypatch):
+    monkeypatch.setattr(reducers, "BLOCK_SIZE", 4)
+    blocks = list(reducers.iter_stream_blocks(io.StringIO("1 2 3\n4 5\n6\n7 8 9 10\n"), "sum"))
+    assert [len(block) for block in blocks] == [5, 5]
+    assert reducers.total(blocks) == (55.0, 10)
+
+
+@pytest.mark.parametrize("command, expected", [
+    (SumCommand(), "sum of 4 values = 10.0"),
+    (MeanCommand(), "mean of 4 values = 2.5"),
+    (MinCommand(), "min of 4 values = -1.0"),
+    (MaxCommand(), "max of 4 values = 6.0"),
+    (CountCommand(), "count = 4"),
+])
+def test_aggregate_commands_inline(backend, command, expected):
+    assert command.execute(["3", "-1", "2", "6"]) == expected
+
+
+def test_var_command_inline(backend):
+    assert VarCommand().execute(["2", "4", "4", "4", "5", "5", "7", "9"]) == f"var of 8 values = {32 / 7}"
+
+
+def test_operands_from_file_and_stdin(tmp_path, monkeypatch):
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("1 2\n3\n\n4\n", encoding="utf-8")
+    monkeypatch.setattr("sys.stdin", io.StringIO("10 20\n"))
+    assert SumCommand().execute(["100", f"@{numbers}", "-"]) == "sum of 7 values = 140.0"
+
+
+def test_missing_file_is_reported(tmp_path):
+    with pytest.raises(ValueError, match="Cannot read numbers for mean command from"):
+        MeanCommand().execute([f"@{tmp_path / 'missing.txt'}"])
+
+
+@pytest.mark.parametrize("command, args, message", [
+    (SumCommand(), [], "Invalid number of arguments for sum command"),
+    (MaxCommand(), ["1", "x"], "Invalid numeric input for max command"),
+    (VarCommand(), ["1"], "The var command needs at least two numbers"),
+])
+def test_aggregate_command_errors(command, args, message):
+    with pytest.raises(ValueError, match=message):
+        command.execute(args)
+
+
+def test_empty_stream_needs_a_number(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n"))
+    with pytest.raises(ValueError, match="The min command needs at least one number"):
+        MinCommand().execute(["-"])
+
+
+def test_compute_handles_large_inputs(backend):
+    values = [float(i) for i in range(10_000)]
+    assert SumCommand().compute(*values) == math.fsum(values)
+    assert MeanCommand().compute(*values) == 4999.5
+    assert MaxCommand().compute(*values) == 9999.0
+    assert VarCommand().compute(*values) == pytest.approx(statistics.variance(values))
+
+
+def test_aggregate_commands_are_discovered():
+    pm = PluginManager()
+    assert {"sum", "mean", "min", "max", "var", "count"} <= set(pm._commands)
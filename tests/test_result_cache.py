@@ -0,0 +1,86 @@
+import pytest
+
+from app import metrics, result_cache
+from app.commands.command_interface import CommandInterface
+from app.dispatcher import Dispatcher
+from app.result_cache import ResultCache
+
+
+@pytest.fixture
+def cache():
+    active = result_cache.enable(maxsize=2)
+    yield active
+    result_cache.disable()
+
+
+def test_lru_eviction_and_counters():
+    lru = ResultCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    lru.put("c", 3)  # evicts "b", the least recently used
+    assert lru.get("b") is None
+    assert lru.stats() == {"size": 2, "hits": 1, "misses": 1, "evictions": 1}
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=0)
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    lru = ResultCache(maxsize=4, ttl=10, clock=lambda: now[0])
+    lru.put("a", 1)
+    now[0] = 9.9
+    assert lru.get("a") == 1
+    now[0] = 10.0
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_dispatcher_serves_normalized_repeats_from_cache(cache):
+    dispatcher = Dispatcher()
+    assert dispatcher.dispatch("add 1 2") == "1.0 + 2.0 = 3.0"
+    assert dispatcher.dispatch("add 1.0 2.00") == "1.0 + 2.0 = 3.0"
+    assert dispatcher.dispatch("+ 1 2") == "1.0 + 2.0 = 3.0"
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_errors_and_non_numeric_args_are_not_cached(cache):
+    dispatcher = Dispatcher()
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            dispatcher.dispatch("divide 1 0")
+        with pytest.raises(ValueError):
+            dispatcher.dispatch("add x 1")
+    assert len(cache) == 0
+
+
+def test_stateful_commands_are_never_cached(cache):
+    dispatcher = Dispatcher()
+    dispatcher.dispatch("menu")
+    dispatcher.dispatch("menu")
+    assert cache.stats()["misses"] == 0
+    assert not getattr(CommandInterface, "cacheable")
+
+
+def test_cache_hits_still_show_in_metrics(cache):
+    collected = metrics.enable()
+    try:
+        dispatcher = Dispatcher()
+        dispatcher.dispatch("multiply 2 2")
+        dispatcher.dispatch("multiply 2 2")
+        assert collected.snapshot()["multiply"].calls == 2
+        assert "Result cache: size=1/2 hits=1 misses=1 evictions=0" in dispatcher.dispatch("stats")
+    finally:
+        metrics.disable()
+
+
+def test_signed_zeros_and_non_finite_operands(cache):
+    dispatcher = Dispatcher()
+    assert dispatcher.dispatch("multiply -0 5") == "-0.0 * 5.0 = -0.0"
+    assert dispatcher.dispatch("multiply 0 5") == "0.0 * 5.0 = 0.0"
+    assert (cache.hits, cache.misses) == (0, 2)
+    cache.clear()
+    for _ in range(3):
+        dispatcher.dispatch("add nan 1")
+        dispatcher.dispatch("add inf 1")
+    assert len(cache) == 0
@@ -0,0 +1,139 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from app import numeric, scheduler
+from app.batch import BatchRunner
+from app.commands.add_command import AddCommand
+from app.commands.command_interface import CommandInterface
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import Dispatcher, error_message
+from app.session import Session, activate
+
+
+class SleepCommand(CommandInterface):
+    """
+    I/O-bound test command: sleeps for the given seconds, giving up when cancelled.
+    Usage: sleep seconds
+    """
+
+    execution = "thread"
+    timeout = 0.2
+    finished = threading.Event()
+
+    @property
+    def name(self) -> str:
+        return "sleep"
+
+    def execute(self, args: list[str]) -> str:
+        deadline = time.monotonic() + float(args[0])
+        while time.monotonic() < deadline:
+            if scheduler.cancelled():
+                SleepCommand.finished.set()
+                return "cancelled"
+            time.sleep(0.01)
+        return f"slept {args[0]} in {threading.current_thread().name}"
+
+
+class SpinCommand(CommandInterface):
+    """
+    CPU-bound test command: reports its process id, or spins for the given seconds.
+    Usage: spin [seconds]
+    """
+
+    execution = "process"
+    timeout = 0.5
+
+    @property
+    def name(self) -> str:
+        return "spin"
+
+    def execute(self, args: list[str]) -> str:
+        if args and args[0] == "fail":
+            raise ValueError("Spin failed.")
+        deadline = time.monotonic() + float(args[0] if args else 0)
+        while time.monotonic() < deadline:
+            pass
+        return str(os.getpid())
+
+
+COMMANDS = {"sleep": SleepCommand, "spin": SpinCommand}
+
+
+@pytest.fixture
+def active_scheduler(monkeypatch):
+    original = PluginManager.get_command
+    monkeypatch.setattr(
+        PluginManager, "get_command", lambda self, name: COMMANDS.get(name) or original(self, name)
+    )
+    yield scheduler.enable(max_workers=2)
+    scheduler.disable()
+
+
+def test_inline_commands_are_not_wrapped(active_scheduler):
+    assert Dispatcher().resolve("add").__name__ == "execute"
+    assert active_scheduler.instrument("add", AddCommand, AddCommand().execute).__name__ == "execute"
+
+
+def test_thread_command_runs_on_a_worker(active_scheduler):
+    assert Dispatcher().dispatch("sleep 0.01") == "slept 0.01 in command-worker-1"
+
+
+def test_thread_command_deadline_and_cancellation(active_scheduler):
+    SleepCommand.finished.clear()
+    started = time.monotonic()
+    with pytest.raises(scheduler.CommandTimeoutError) as exc:
+        Dispatcher().dispatch("sleep 5")
+    assert time.monotonic() - started < 2
+    assert error_message(exc.value) == "Error: Command 'sleep' timed out after 0.2 seconds."
+    assert active_scheduler.timeouts == {"sleep": 1}
+    # The abandoned call saw the cancellation and stopped early
+    assert SleepCommand.finished.wait(2)
+
+
+def test_thread_command_runs_in_the_callers_session(active_scheduler):
+    handler = active_scheduler.instrument("backend", SleepCommand, lambda args: numeric.active().name)
+    with activate(Session(backend=numeric.create("fraction"))):
+        assert handler([]) == "fraction"
+    assert handler([]) == "float"
+
+
+def test_process_command_runs_in_another_process(active_scheduler):
+    dispatcher = Dispatcher()
+    assert dispatcher.dispatch("spin") != str(os.getpid())
+    with pytest.raises(ValueError, match="Spin failed."):
+        dispatcher.dispatch("spin fail")
+
+
+def test_process_command_is_terminated_at_its_deadline(active_scheduler):
+    dispatcher = Dispatcher()
+    with pytest.raises(scheduler.CommandTimeoutError):
+        dispatcher.dispatch("spin 10")
+    # A fresh pool serves the next call
+    assert dispatcher.dispatch("spin").isdigit()
+
+
+def test_timeouts_are_reported_like_other_errors(active_scheduler):
+    out, err = io.StringIO(), io.StringIO()
+    BatchRunner().run(io.StringIO("sleep 5\nadd 1 2\n"), out, err)
+    assert out.getvalue() == "1.0 + 2.0 = 3.0\n"
+    assert "Error: Command 'sleep' timed out after 0.2 seconds." in err.getvalue()
+
+
+def test_unknown_execution_mode():
+    class OddCommand(SleepCommand):
+        execution = "gpu"
+
+    handler = scheduler.Scheduler().instrument("odd", OddCommand, OddCommand().execute)
+    with pytest.raises(ValueError, match="unknown execution mode 'gpu'"):
+        handler(["1"])
+
+
+def test_disabled_scheduler_runs_everything_inline(monkeypatch):
+    monkeypatch.setattr(PluginManager, "get_command", lambda self, name: COMMANDS.get(name))
+    scheduler.disable()
+    assert scheduler.active() is None
+    assert Dispatcher().dispatch("sleep 0") == f"slept 0 in {threading.current_thread().name}"
@@ -0,0 +1,216 @@
+import asyncio
+import time
+
+import pytest
+
+from app import scheduler
+from app.commands.command_interface import CommandInterface
+from app.commands.plugin_manager import PluginManager
+from app.dispatcher import UNKNOWN_COMMAND_MESSAGE
+from app.server import (
+    EXIT_MESSAGE,
+    SHUTDOWN_MESSAGE,
+    WELCOME_MESSAGE,
+    CalculatorServer,
+    parse_address,
+)
+
+
+class NapCommand(CommandInterface):
+    """
+    Slow I/O-bound test command, run on a worker thread.
+    Usage: nap seconds
+    """
+
+    execution = "thread"
+
+    @property
+    def name(self) -> str:
+        return "nap"
+
+    def execute(self, args: list[str]) -> str:
+        time.sleep(float(args[0]))
+        return f"napped {args[0]}"
+
+
+async def start_server(**kwargs):
+    server = CalculatorServer(PluginManager(), **kwargs)
+    listener = await server.start("127.0.0.1:0")
+    port = listener.sockets[0].getsockname()[1]
+    return server, port
+
+
+async def read_lines(reader, count):
+    return [(await reader.readline()).decode().rstrip("\n") for _ in range(count)]
+
+
+def test_parse_address():
+    assert parse_address("localhost:9000") == ("tcp", ("localhost", 9000))
+    assert parse_address(":9000") == ("tcp", ("127.0.0.1", 9000))
+    assert parse_address("unix:/tmp/calc.sock") == ("unix", "/tmp/calc.sock")
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_respond_matches_repl_messages():
+    server = CalculatorServer(PluginManager())
+    assert server.respond("add 2 3") == ("2.0 + 3.0 = 5.0", False)
+    assert server.respond("divide 1 0") == ("Error: Cannot divide by zero.", False)
+    assert server.respond("add a 1") == ("Error: Invalid numeric input for add command.", False)
+    assert server.respond("bogus") == (UNKNOWN_COMMAND_MESSAGE, False)
+    assert server.respond("EXIT") == (EXIT_MESSAGE, True)
+
+
+def test_sessions_cannot_use_the_server_stdin_or_files(tmp_path, monkeypatch):
+    numbers = tmp_path / "numbers.txt"
+    numbers.write_text("1 2 3\n", encoding="utf-8")
+    # Never read: a session that did would block on the server's stdin
+    monkeypatch.setattr("sys.stdin", None)
+    server = CalculatorServer(PluginManager())
+    assert server.respond(f"sum @{numbers}") == (
+        "Error: Reading numbers for sum command from '-' or '@file' is not available over the network.", False
+    )
+    assert server.respond("mean 1 -")[0].startswith("Error: Reading numbers for mean command")
+    assert server.respond(f"profile on {tmp_path}") == (
+        "Error: Choosing the profile directory is not available over the network.", False
+    )
+    assert server.respond(f"memprofile on {tmp_path}")[0].startswith("Error: Choosing the memprofile directory")
+    assert server.respond("profile status") == ("CPU profiling is off.", False)
+    assert server.respond("sum 1 2 3") == ("sum of 3 values = 6.0", False)
+    assert list(tmp_path.iterdir()) == [numbers]
+
+
+def test_session_answers_pipelined_requests_in_order():
+    async def scenario():
+        server, port = await start_server(max_pipeline=4)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        requests = [f"add {i} 1" for i in range(50)]
+        writer.write(("\n".join(requests) + "\n\nexit\n").encode())
+        await writer.drain()
+        lines = await read_lines(reader, 52)
+        assert await reader.read() == b""  # closed after exit
+        writer.close()
+        await server.shutdown()
+        return lines
+
+    lines = asyncio.run(scenario())
+    assert lines[0] == WELCOME_MESSAGE
+    assert lines[1:51] == [f"{float(i)} + 1.0 = {i + 1.0}" for i in range(50)]
+    assert lines[51] == EXIT_MESSAGE
+
+
+def test_sessions_share_one_server_concurrently():
+    async def client(port, value):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"multiply {value} 2\nexit\n".encode())
+        lines = await read_lines(reader, 3)
+        writer.close()
+        return lines[1]
+
+    async def scenario():
+        server, port = await start_server()
+        results = await asyncio.gather(*(client(port, value) for value in range(20)))
+        await server.shutdown()
+        return results
+
+    assert asyncio.run(scenario()) == [f"{float(value)} * 2.0 = {value * 2.0}" for value in range(20)]
+
+
+def test_sessions_have_their_own_variables_and_history():
+    async def client(port, value):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"rate = divide {value} 100\nmultiply rate 10\nhistory\nexit\n".encode())
+        lines = await read_lines(reader, 6)
+        writer.close()
+        return lines[1:5]
+
+    async def scenario():
+        server, port = await start_server()
+        results = await asyncio.gather(client(port, 5), client(port, 7))
+        await server.shutdown()
+        return results
+
+    first, second = asyncio.run(scenario())
+    assert first == ["rate = 0.05", "0.05 * 10.0 = 0.5", "    1  rate = divide 5 100", "    2  multiply rate 10"]
+    assert second[:2] == ["rate = 0.07", "0.07 * 10.0 = 0.7000000000000001"]
+    assert second[2:] == ["    1  rate = divide 7 100", "    2  multiply rate 10"]
+
+
+def test_sessions_have_their_own_numeric_backend():
+    async def client(port, lines):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(("\n".join(lines) + "\nexit\n").encode())
+        replies = await read_lines(reader, len(lines) + 2)
+        writer.close()
+        return replies[1:-1]
+
+    async def scenario():
+        server, port = await start_server()
+        exact = await client(port, ["backend decimal", "add 0.1 0.2", "sum 0.1 0.2"])
+        other = await client(port, ["backend", "add 0.1 0.2"])
+        await server.shutdown()
+        return exact, other
+
+    exact, other = asyncio.run(scenario())
+    assert exact[1:] == ["0.1 + 0.2 = 0.3", "sum of 2 values = 0.3"]
+    assert other == ["Numeric backend: float", "0.1 + 0.2 = 0.30000000000000004"]
+
+
+def test_pooled_commands_do_not_block_other_sessions(monkeypatch):
+    original = PluginManager.get_command
+    monkeypatch.setattr(PluginManager, "get_command", lambda self, name: NapCommand if name == "nap" else original(self, name))
+
+    async def client(port, line, finished):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{line}\nexit\n".encode())
+        lines = await read_lines(reader, 3)
+        writer.close()
+        finished.append(lines[1])
+
+    async def scenario():
+        server, port = await start_server()
+        finished = []
+        slow = asyncio.create_task(client(port, "nap 0.5", finished))
+        await asyncio.sleep(0.1)
+        started = time.monotonic()
+        await client(port, "add 1 2", finished)
+        elapsed = time.monotonic() - started
+        await slow
+        await server.shutdown()
+        return finished, elapsed
+
+    scheduler.enable()
+    try:
+        finished, elapsed = asyncio.run(scenario())
+    finally:
+        scheduler.disable()
+    assert finished == ["1.0 + 2.0 = 3.0", "napped 0.5"]
+    assert elapsed < 0.3
+
+
+def test_line_limit_closes_the_connection():
+    async def scenario():
+        server, port = await start_server(line_limit=128)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"add " + b"1" * 1000 + b" 1\n")
+        lines = await read_lines(reader, 2)
+        assert await reader.read() == b""
+        writer.close()
+        await server.shutdown()
+        return lines
+
+    assert asyncio.run(scenario())[1] == "Error: Line too long (limit 128 bytes)."
+
+
+def test_shutdown_notifies_idle_sessions():
+    async def scenario():
+        server, port = await start_server()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"add 1 1\n")
+        first = await read_lines(reader, 2)
+        await server.shutdown(timeout=2)
+        rest = (await reader.read()).decode().splitlines()
+        writer.close()
+        return first + rest
+
+    assert asyncio.run(scenario()) == [WELCOME_MESSAGE, "1.0 + 1.0 = 2.0", SHUTDOWN_MESSAGE]
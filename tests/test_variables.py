@@ -0,0 +1,137 @@
+import pytest
+
+from app import App, history, numeric
+from app.variables import Workspace
+
+
+@pytest.fixture
+def workspace():
+    return Workspace()
+
+
+def run(workspace, line):
+    handler, _, args = workspace.resolve_line(line)
+    return handler(args)
+
+
+def test_assignment_and_lookup(workspace):
+    assert run(workspace, "rate = divide 5 100") == "rate = 0.05"
+    assert run(workspace, "base = 2000") == "base = 2000.0"
+    assert run(workspace, "total = multiply rate base") == "total = 100.0"
+    assert run(workspace, "total") == "total = 100.0"
+    assert run(workspace, "add total 1") == "100.0 + 1.0 = 101.0"
+    assert run(workspace, "add rate (multiply 2 total)") == "add rate (multiply 2 total) = 200.05"
+
+
+def test_lines_starting_with_a_variable_are_expressions(workspace):
+    run(workspace, "rate = divide 5 100")
+    run(workspace, "base = 2000")
+    assert run(workspace, "rate * 2") == "rate * 2 = 0.1"
+    assert run(workspace, "base*rate - 1") == "base*rate - 1 = 99.0"
+    assert run(workspace, "rate + (multiply base 2)") == "rate + (multiply base 2) = 4000.05"
+    with pytest.raises(ValueError):
+        run(workspace, "rate 2")
+
+
+@pytest.mark.parametrize("backend, expected", [
+    ("fraction", ["2 / x = 6", "x * x = 1/9", "-x + 1 = 2/3", "1/3 * 3 = 1"]),
+    ("decimal", ["2 / x = 6.000000000000000000000000001", "x * x = 0.1111111111111111111111111111",
+                 "-x + 1 = 0.6666666666666666666666666667", "0.3333333333333333333333333333 * 3 = 0.9999999999999999999999999999"]),
+])
+def test_variables_in_expressions_keep_their_exact_values(backend, expected):
+    numeric.configure(backend)
+    try:
+        workspace = Workspace()
+        run(workspace, "x = divide 1 3")
+        results = [str(run(workspace, line)) for line in ("2 / x", "x * x", "-x + 1", "multiply x 3")]
+    finally:
+        numeric.configure()
+    assert results == expected
+
+
+def test_non_finite_variables_in_expressions(workspace):
+    assert run(workspace, "big = multiply 1e200 1e200") == "big = inf"
+    assert run(workspace, "big * 2") == "big * 2 = inf"
+    assert run(workspace, "1 - big") == "1 - big = -inf"
+    assert str(run(workspace, "big - big")) == "big - big = nan"
+    assert run(workspace, "add big 1") == "inf + 1.0 = inf"
+
+
+def test_reassignment_recomputes_only_what_is_read(workspace):
+    run(workspace, "a = 1")
+    run(workspace, "b = add a 1")
+    run(workspace, "c = multiply b 10")
+    run(workspace, "unrelated = 5")
+    run(workspace, "d = add unrelated 1")
+    computed = workspace.computations
+
+    assert run(workspace, "a = 2") == "a = 2.0"
+    # Only 'a' itself is computed; b and c are stale until read
+    assert workspace.computations == computed + 1
+    assert run(workspace, "c") == "c = 30.0"
+    assert workspace.computations == computed + 3
+    # Fresh cells are served from their cached values
+    assert run(workspace, "c") == "c = 30.0"
+    assert run(workspace, "d") == "d = 6.0"
+    assert workspace.computations == computed + 3
+
+
+def test_redefinition_rewires_dependencies(workspace):
+    run(workspace, "a = 1")
+    run(workspace, "b = 10")
+    run(workspace, "c = add a 1")
+    run(workspace, "c = add b 1")
+    run(workspace, "a = 5")
+    computed = workspace.computations
+    assert run(workspace, "c") == "c = 11.0"
+    assert workspace.computations == computed
+
+
+def test_plugins_with_variadic_compute_take_part(workspace):
+    run(workspace, "x = 4")
+    assert run(workspace, "s = sum x 1 2 3") == "s = 10.0"
+    run(workspace, "x = 0")
+    assert run(workspace, "s") == "s = 6.0"
+
+
+@pytest.mark.parametrize("line, message", [
+    ("y = add missing 1", "Unknown variable 'missing'"),
+    ("add = 3", "'add' is a command name"),
+    ("y = menu", "has no numeric form"),
+    ("y = nosuchcommand 1", "Unknown command 'nosuchcommand'"),
+    ("y =", "Missing value for variable 'y'"),
+])
+def test_assignment_errors(workspace, line, message):
+    with pytest.raises(ValueError, match=message):
+        run(workspace, line)
+
+
+def test_cycles_are_rejected(workspace):
+    run(workspace, "a = 1")
+    run(workspace, "b = add a 1")
+    with pytest.raises(ValueError, match="Circular reference: a -> b -> a"):
+        run(workspace, "a = add b 1")
+    assert run(workspace, "a") == "a = 1.0"
+
+
+def test_failed_recomputation_surfaces_on_read(workspace):
+    run(workspace, "d = 2")
+    run(workspace, "q = divide 1 d")
+    run(workspace, "d = 0")
+    with pytest.raises(ZeroDivisionError):
+        run(workspace, "q")
+    run(workspace, "d = 4")
+    assert run(workspace, "q") == "q = 0.25"
+
+
+def test_repl_variables(capfd, monkeypatch):
+    inputs = iter(["rate = divide 5 100", "total = multiply rate 2000", "rate = divide 7 100", "total", "exit"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    try:
+        App.start()
+    finally:
+        history.disable()
+    out, _ = capfd.readouterr()
+    assert "rate = 0.05\n" in out
+    assert "total = 100.0\n" in out
+    assert "total = 140.0\n" in out
@@ -0,0 +1,108 @@
+import math
+
+import pytest
+
+from app import vectorized
+from app.commands.add_command import AddCommand
+from app.commands.subtract_command import SubtractCommand
+from app.commands.multiply_command import MultiplyCommand
+from app.commands.divide_command import DivideCommand
+from app.commands.menu_command import MenuCommand
+from app.commands.command_interface import CommandInterface
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Runs each test against the NumPy kernels (when installed) and the pure-Python fallback."""
+    if request.param == "numpy":
+        if vectorized.load_numpy() is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(vectorized, "load_numpy", lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize("command, expected", [
+    (AddCommand(), [5.0, 7.0, 9.0]),
+    (SubtractCommand(), [-3.0, -3.0, -3.0]),
+    (MultiplyCommand(), [4.0, 10.0, 18.0]),
+])
+def test_arithmetic_execute_batch(backend, command, expected):
+    result = command.execute_batch([1, 2, "3"], [4.0, "5", 6])
+    assert list(result.values) == expected
+    assert not any(result.mask)
+
+
+def test_divide_execute_batch_masks_zero_divisors(backend):
+    result = DivideCommand().execute_batch([10, 1, 9], [2, 0, 3])
+    assert list(result.mask) == [False, True, False]
+    assert result.values[0] == 5.0 and result.values[2] == 3.0
+    assert math.isnan(result.values[1])
+
+
+def test_execute_batch_invalid_input(backend):
+    with pytest.raises(ValueError) as exc:
+        AddCommand().execute_batch(["abc"], [1])
+    assert "Invalid numeric input" in str(exc.value)
+    with pytest.raises(ValueError):
+        AddCommand().execute_batch([1, 2], [1])
+    with pytest.raises(ValueError):
+        AddCommand().execute_batch([1])
+
+
+def test_default_execute_batch_falls_back_to_execute():
+    class PowerCommand(CommandInterface):
+        @property
+        def name(self) -> str:
+            return "power"
+
+        def execute(self, args: list[str]) -> str:
+            if float(args[0]) == 0 and float(args[1]) < 0:
+                raise ZeroDivisionError("0 cannot be raised to a negative power.")
+            return f"{float(args[0]) ** float(args[1])}"
+
+    result = PowerCommand().execute_batch([2, 0, 3], [3, -1, 2])
+    assert result.values == ["8.0", None, "9.0"]
+    assert result.mask == [False, True, False]
+
+
+def test_default_execute_batch_rejects_ragged_columns():
+    with pytest.raises(ValueError):
+        MenuCommand().execute_batch([1, 2], [1])
+
+
+@pytest.mark.parametrize("command, args, expected", [
+    (MultiplyCommand, ["1,2,3", "10"], "[1.0, 2.0, 3.0] * 10.0 = [10.0, 20.0, 30.0]"),
+    (AddCommand, ["[1", "2", "3]", "[4", "5", "6]"], "[1.0, 2.0, 3.0] + [4.0, 5.0, 6.0] = [5.0, 7.0, 9.0]"),
+    (SubtractCommand, ["[5]", "[1,2,3]"], "[5.0] - [1.0, 2.0, 3.0] = [4.0, 3.0, 2.0]"),
+    (DivideCommand, ["6", "1,2,3"], "6.0 / [1.0, 2.0, 3.0] = [6.0, 3.0, 2.0]"),
+])
+def test_vector_operands_broadcast(backend, command, args, expected):
+    assert str(command().execute(args)) == expected
+
+
+def test_vector_divide_reports_zero_divisors_per_element(backend):
+    result = DivideCommand().execute(["[1 2 3]", "0,2,0"])
+    assert str(result) == "[1.0, 2.0, 3.0] / [0.0, 2.0, 0.0] = [error, 1.0, error] (2 divisions by zero at indices 0, 2)"
+    assert result.errors == [0, 2] and math.isnan(result.value[0])
+    assert result.as_dict() == {
+        "command": "divide", "operands": [[1.0, 2.0, 3.0], [0.0, 2.0, 0.0]], "value": [None, 1.0, None], "errors": [0, 2],
+    }
+
+
+def test_long_vectors_print_compactly(backend):
+    result = AddCommand().execute([",".join(map(str, range(100))), "1"])
+    assert str(result).endswith("= [1.0, 2.0, 3.0, ..., 98.0, 99.0, 100.0] (100 values)")
+    assert len(result.value) == 100 and result.value_text().count(" ") == 99
+
+
+@pytest.mark.parametrize("args, message", [
+    (["[1,2]", "[1 2 3]"], r"could not be broadcast together \(lengths 2 and 3\)"),
+    (["[1 2", "3"], "Invalid vector literal"),
+    (["[]", "3"], "Invalid vector literal"),
+    (["1,x", "3"], "Invalid numeric input"),
+    (["1,2"], "Invalid number of arguments"),
+])
+def test_vector_operand_errors(backend, args, message):
+    with pytest.raises(ValueError, match=message):
+        AddCommand().execute(args)
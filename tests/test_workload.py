@@ -0,0 +1,57 @@
+from collections import Counter
+
+import pytest
+
+from benchmarks import soak
+from benchmarks.workload import CONTROL_COMMANDS, WorkloadGenerator, parse_mix, usage_shape
+
+
+def test_streams_are_reproducible_per_seed():
+    assert WorkloadGenerator(seed=7).lines(500) == WorkloadGenerator(seed=7).lines(500)
+    assert WorkloadGenerator(seed=7).lines(500) != WorkloadGenerator(seed=8).lines(500)
+
+
+def test_mix_covers_plugins_but_not_control_commands():
+    generator = WorkloadGenerator(seed=1)
+    assert "add" in generator.commands and "sum" in generator.commands
+    assert not set(CONTROL_COMMANDS) & set(generator.commands)
+    assert "stats" in WorkloadGenerator(mix={"stats": 1}).commands
+
+
+def test_ratios_of_commands_invalid_lines_and_zero_divisions():
+    generator = WorkloadGenerator(seed=2, mix=parse_mix("add=3,multiply=1"), invalid_ratio=0.1, zero_division_ratio=0.1)
+    lines = generator.lines(20_000)
+    zero_divisions = sum(1 for line in lines if line.startswith("divide ") and line.endswith(" 0"))
+    assert 0.08 < zero_divisions / len(lines) < 0.12
+    commands = Counter(line.split()[0] for line in lines if len(line.split()) == 3 and line.split()[0] in ("add", "multiply"))
+    assert 2.5 < commands["add"] / commands["multiply"] < 3.5
+
+
+def test_skew_repeats_hot_operands():
+    lines = WorkloadGenerator(seed=3, mix={"add": 1}, invalid_ratio=0, zero_division_ratio=0, skew=1.2).lines(5000)
+    assert lines[0].startswith("add ")
+    assert Counter(lines).most_common(1)[0][1] > 250
+    assert len(set(WorkloadGenerator(seed=3, mix={"add": 1}, invalid_ratio=0).lines(5000))) > 4900
+
+
+def test_usage_shapes():
+    assert usage_shape("add x y", "add") == [(1, False), (1, False)]
+    assert usage_shape("sum x [y ...] | @file | -", "sum") == [(1, False), (-1, True)]
+    assert usage_shape(None, "menu") == []
+
+
+def test_bad_configuration():
+    with pytest.raises(ValueError, match="Unknown command in workload mix: nope"):
+        WorkloadGenerator(mix={"nope": 1})
+    with pytest.raises(ValueError, match="Invalid weight"):
+        parse_mix("add=lots")
+
+
+@pytest.mark.parametrize("target", soak.TARGETS)
+def test_short_soak_run(target):
+    recorder = soak.run(WorkloadGenerator(seed=4), duration=0.3, target=target, window=0.1, chunk=500)
+    assert len(recorder.windows) >= 2
+    assert all(window.lines > 0 and window.rss >= 0 for window in recorder.windows)
+    assert (recorder.windows[0].errors is None) == (target == "app")
+    summary = soak.summarize(recorder.windows)
+    assert summary["throughput"] > 0 and "traced_growth" not in summary